@@ -64,6 +64,36 @@ class Database:
             conn.commit()
             return cursor.rowcount > 0
 
+    def add_many(self, vehicles):
+        """
+        批量添加车牌，整批在同一个事务中用 executemany 写入，已存在的车牌被跳过。
+        :param vehicles: 可迭代对象，元素为 (plate, note)
+        :return: 实际新增的车牌数量
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO vehicles (plate, note) VALUES (?, ?)',
+                vehicles
+            )
+            conn.commit()
+            return conn.total_changes - before
+
+    def remove_many(self, plates):
+        """
+        批量删除车牌，整批在同一个事务中完成。
+        :param plates: 车牌号的可迭代对象
+        :return: 实际删除的车牌数量
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            before = conn.total_changes
+            conn.executemany(
+                'DELETE FROM vehicles WHERE plate = ?',
+                ((plate,) for plate in plates)
+            )
+            conn.commit()
+            return conn.total_changes - before
+
     def check_vehicle(self, plate):
         """
         检查车牌是否在白名单中。
@@ -83,4 +113,34 @@ class Database:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT plate, note FROM vehicles')
-            return cursor.fetchall()
\ No newline at end of file
+            return cursor.fetchall()
+
+    def list_page(self, after=None, limit=100, prefix=None):
+        """
+        按车牌号顺序分页查询（键集分页），可按前缀过滤，均走主键索引。
+        :param after: 上一页最后一个车牌号，None 表示第一页
+        :param limit: 每页条数
+        :param prefix: 车牌号前缀，None 表示不过滤
+        :return: (rows, total)，rows 为 (plate, note) 列表，total 为满足过滤条件的总数
+        """
+        where, params = [], []
+        if prefix:
+            where.append('plate >= ? AND plate < ?')
+            params += [prefix, prefix + '\U0010ffff']
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            sql = 'SELECT COUNT(*) FROM vehicles'
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            cursor.execute(sql, params)
+            total = cursor.fetchone()[0]
+
+            if after is not None:
+                where.append('plate > ?')
+                params.append(after)
+            sql = 'SELECT plate, note FROM vehicles'
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            sql += ' ORDER BY plate LIMIT ?'
+            cursor.execute(sql, params + [limit])
+            return cursor.fetchall(), total
\ No newline at end of file
@@ -1,13 +1,17 @@
+import csv
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 from database import Database   # 绝对导入
 
 class ManageWindow:
     """车牌管理窗口：可添加、删除、查看白名单车牌。"""
 
+    PAGE_SIZE = 100   # 每次从数据库加载的行数，滚动到底部时再加载下一页
+
     def __init__(self, parent, db):
         self.parent = parent
         self.db = db
+        self.next_after = None   # 下一页的起点车牌号，None 表示已加载完
         self.create_widgets()
         self.refresh_list()
 
@@ -27,6 +31,12 @@ class ManageWindow:
         self.add_btn = tk.Button(add_frame, text="添加", command=self.add_vehicle)
         self.add_btn.grid(row=0, column=4, padx=5)
 
+        tk.Label(add_frame, text="搜索前缀:").grid(row=0, column=5, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.refresh_list())
+        self.entry_search = tk.Entry(add_frame, width=12, textvariable=self.search_var)
+        self.entry_search.grid(row=0, column=6, padx=5)
+
         # 列表区域
         list_frame = tk.Frame(self.parent)
         list_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -41,7 +51,8 @@ class ManageWindow:
 
         scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
         scrollbar.pack(side='right', fill='y')
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = scrollbar
+        self.tree.configure(yscrollcommand=self.on_scroll)
 
         # 删除和刷新按钮
         btn_frame = tk.Frame(self.parent)
@@ -53,15 +64,36 @@ class ManageWindow:
         self.refresh_btn = tk.Button(btn_frame, text="刷新列表", command=self.refresh_list)
         self.refresh_btn.pack(side='left', padx=5)
 
+        self.import_btn = tk.Button(btn_frame, text="批量导入", command=self.import_vehicles)
+        self.import_btn.pack(side='left', padx=5)
+
+        self.total_label = tk.Label(btn_frame, text="")
+        self.total_label.pack(side='left', padx=5)
+
     def refresh_list(self):
-        """从数据库重新加载数据并刷新列表"""
+        """清空列表并从数据库重新加载第一页"""
         # 清空现有项
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        # 获取所有车牌
-        vehicles = self.db.list_all()
+        self.tree.delete(*self.tree.get_children())
+        self.next_after = None
+        self.load_page()
+
+    def load_page(self):
+        """加载下一页车牌并追加到列表末尾"""
+        prefix = self.search_var.get().strip() or None
+        vehicles, total = self.db.list_page(
+            after=self.next_after, limit=self.PAGE_SIZE, prefix=prefix
+        )
         for plate, note in vehicles:
             self.tree.insert('', 'end', values=(plate, note))
+        self.next_after = vehicles[-1][0] if len(vehicles) == self.PAGE_SIZE else None
+        shown = len(self.tree.get_children())
+        self.total_label.config(text=f"共 {total} 条，已显示 {shown} 条")
+
+    def on_scroll(self, first, last):
+        """列表滚动回调：同步滚动条，接近底部时加载下一页"""
+        self.scrollbar.set(first, last)
+        if self.next_after is not None and float(last) > 0.9:
+            self.load_page()
 
     def add_vehicle(self):
         """添加新车牌"""
@@ -78,6 +110,24 @@ class ManageWindow:
         else:
             messagebox.showerror("失败", f"车牌 {plate} 已存在")
 
+    def import_vehicles(self):
+        """从 CSV 文件（每行：车牌号,备注）批量导入，一个事务完成"""
+        path = filedialog.askopenfilename(
+            title="选择 CSV 文件",
+            filetypes=[("CSV 文件", "*.csv"), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = [
+                (row[0].strip(), row[1].strip() if len(row) > 1 else '')
+                for row in csv.reader(f)
+                if row and row[0].strip() and row[0].strip() not in ('plate', '车牌号')
+            ]
+        added = self.db.add_many(rows)
+        messagebox.showinfo("导入完成", f"新增 {added} 条，跳过 {len(rows) - added} 条")
+        self.refresh_list()
+
     def delete_vehicle(self):
         """删除选中的车牌"""
         selected = self.tree.selection()
@@ -0,0 +1,121 @@
+"""
+检测后端基准：在保存的帧上比较各后端的启动耗时、每帧耗时和内存占用（RSS）。
+每个后端在独立的子进程中运行，导入的库和模型互不影响内存统计；只使用 CPU，x86 上同样可以运行。
+用法：python bench_detect.py 帧目录 [后端 ...]
+例如：python bench_detect.py ./frames ultralytics onnxruntime opencv
+帧目录中的 .jpg / .png（摄像头采集的整帧）按文件名顺序读取；配置了 DETECT_ROI 时先裁出检测区域。
+"""
+import os
+import sys
+import glob
+import json
+import time
+import resource
+import subprocess
+
+import cv2
+import numpy as np
+
+import config
+from utils.image_utils import RegionOfInterest
+
+
+def rss_mb():
+    """当前进程的常驻内存（MB）"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_frames(directory):
+    """按文件名顺序读取目录中的图片"""
+    paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png')))
+    frames = [cv2.imread(p) for p in paths]
+    return [f for f in frames if f is not None]
+
+
+def worker(backend, directory):
+    """子进程：加载一个后端并逐帧检测，以 JSON 输出结果"""
+    frames = load_frames(directory)
+    if not frames:
+        raise SystemExit(f"目录中没有图片: {directory}")
+    if config.DETECT_ROI is not None:
+        roi = RegionOfInterest(config.DETECT_ROI, frames[0].shape[1], frames[0].shape[0])
+        frames = [roi.crop(f) for f in frames]
+    base_rss = rss_mb()
+
+    # 启动耗时：导入后端依赖 + 加载模型
+    start = time.perf_counter()
+    from detectors import create_detector
+    model_path = config.YOLO_MODEL if backend == 'ultralytics' else config.ONNX_MODEL
+    detector = create_detector(backend, model_path, input_size=config.YOLO_INPUT_SIZE,
+                               iou_threshold=config.NMS_IOU_THRESHOLD, threads=config.DETECTOR_THREADS)
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detector.detect(frames[0], config.CONFIDENCE_THRESHOLD)
+    first = time.perf_counter() - start
+
+    samples = []
+    detections = 0
+    for frame in frames:
+        start = time.perf_counter()
+        detections += len(detector.detect(frame, config.CONFIDENCE_THRESHOLD))
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+
+    print(json.dumps({
+        'backend': backend,
+        'frames': len(frames),
+        'startup_s': startup,
+        'first_ms': first * 1000,
+        'avg_ms': float(np.mean(samples)),
+        'p50_ms': samples[len(samples) // 2],
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        'detections': detections,
+        'rss_mb': rss_mb(),
+        'model_rss_mb': rss_mb() - base_rss
+    }))
+
+
+def main():
+    if len(sys.argv) >= 4 and sys.argv[1] == '--worker':
+        worker(sys.argv[2], sys.argv[3])
+        return
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    from detectors import BACKENDS
+    directory = os.path.abspath(sys.argv[1])
+    backends = sys.argv[2:] or BACKENDS
+
+    print(f"{'后端':<12}{'启动(s)':>9}{'首帧(ms)':>10}{'平均(ms)':>10}{'p50(ms)':>9}"
+          f"{'p99(ms)':>9}{'RSS(MB)':>9}{'模型(MB)':>10}{'检出数':>8}")
+    frames = 0
+    for backend in backends:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', backend, directory],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            error = (proc.stderr.strip().splitlines() or ['未知错误'])[-1]
+            print(f"{backend:<12}失败: {error}")
+            continue
+        r = json.loads(lines[-1])
+        frames = r['frames']
+        print(f"{backend:<12}{r['startup_s']:>9.2f}{r['first_ms']:>10.1f}{r['avg_ms']:>10.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['rss_mb']:>9.0f}{r['model_rss_mb']:>10.0f}"
+              f"{r['detections']:>8}")
+    print(f"帧数: {frames}，输入尺寸: {config.YOLO_INPUT_SIZE}，"
+          f"线程数: {config.DETECTOR_THREADS}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+上传编码基准：比较不同缩放高度和 JPEG 质量下的图片大小、编码耗时和识别准确率。
+识别使用门卫电脑端的 EasyOCR 识别器（../windows_pc/recognition），需要在装有 easyocr 的电脑上运行；
+未安装时只统计大小和耗时。
+用法：python bench_encode.py 裁剪图目录
+裁剪图文件名以车牌号开头，下划线后为任意后缀，例如 京A12345_001.jpg；
+比较时只看字母和数字（识别器会去掉汉字）。
+"""
+import os
+import re
+import sys
+import glob
+import time
+
+import cv2
+import numpy as np
+
+import config
+from utils.encoding import AdaptiveJpegEncoder
+
+HEIGHTS = (None, 128, 96, 64)
+QUALITIES = (90, 75, 60, 45)
+
+
+def normalize(plate):
+    """只保留大写字母和数字"""
+    return re.sub(r'[^A-Z0-9]', '', (plate or '').upper())
+
+
+def load_crops(directory):
+    """读取裁剪图及其标注（文件名中第一个下划线之前的部分）"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png'))):
+        image = cv2.imread(path)
+        if image is not None:
+            label = os.path.splitext(os.path.basename(path))[0].split('_')[0]
+            samples.append((image, normalize(label)))
+    return samples
+
+
+def load_recognizer():
+    """加载门卫电脑端的识别器，失败返回 None"""
+    windows_pc = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'windows_pc')
+    sys.path.append(windows_pc)
+    # 识别器用到门卫电脑端 utils 包中的 plate_grammar，而 utils 已是树莓派端的包（两边的模块不重名），
+    # 把门卫电脑端的目录并入其搜索路径
+    import utils
+    utils.__path__.append(os.path.join(windows_pc, 'utils'))
+    try:
+        from recognition import EasyOCRPlateRecognizer
+    except ImportError as e:
+        print(f"未加载识别器（{e}），只统计大小和耗时")
+        return None
+    return EasyOCRPlateRecognizer(gpu=False)
+
+
+def evaluate(samples, recognizer, encoder):
+    """按编码器设置处理所有样本，返回 (平均字节数, 平均编码毫秒, 准确率或 None)"""
+    total_bytes = 0
+    total_time = 0.0
+    correct = 0
+    for image, label in samples:
+        start = time.perf_counter()
+        data = encoder.encode(encoder.resize(image))
+        total_time += time.perf_counter() - start
+        total_bytes += data.nbytes
+        if recognizer is not None:
+            decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            plate = recognizer.recognize_best(decoded)
+            correct += normalize(plate) == label
+    n = len(samples)
+    accuracy = correct / n if recognizer is not None else None
+    return total_bytes / n, total_time / n * 1000, accuracy
+
+
+def report(name, result):
+    size, ms, accuracy = result
+    acc = f"{accuracy:7.1%}" if accuracy is not None else "      -"
+    print(f"{name:<22}{size / 1024:>8.1f}KB{ms:>9.2f}ms{acc:>9}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    samples = load_crops(sys.argv[1])
+    if not samples:
+        print("目录中没有图片")
+        return
+    recognizer = load_recognizer()
+
+    print(f"样本数: {len(samples)}")
+    print(f"{'设置':<22}{'平均大小':>10}{'编码耗时':>11}{'准确率':>8}")
+    for height in HEIGHTS:
+        for quality in QUALITIES:
+            encoder = AdaptiveJpegEncoder(max_height=height, byte_budget=None, quality=quality)
+            report(f"高度={height or '原图'} 质量={quality}", evaluate(samples, recognizer, encoder))
+
+    # 当前配置（自适应质量）
+    encoder = AdaptiveJpegEncoder(
+        max_height=config.UPLOAD_MAX_HEIGHT,
+        byte_budget=config.UPLOAD_BYTE_BUDGET,
+        quality=config.UPLOAD_JPEG_QUALITY,
+        min_quality=config.UPLOAD_MIN_QUALITY
+    )
+    report("当前配置（自适应）", evaluate(samples, recognizer, encoder))
+    print(f"当前配置编码统计: {encoder.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,31 @@ import os
 PC_IP = "192.168.1.100"      # ⚠️ 【请根据实际情况修改】
 PC_PORT = 5000
 PC_URL = f"http://{PC_IP}:{PC_PORT}/api/recognize"
+PC_BATCH_URL = f"http://{PC_IP}:{PC_PORT}/api/recognize_batch"
+BATCH_UPLOAD = True           # 同一帧的多个车牌合并为一次请求上传
+LANE_ID = 'lane1'             # 本摄像头对应的车道编号，门卫电脑按车道分别计算冷却时间
+
+# ===== 上传图片编码 =====
+UPLOAD_MAX_HEIGHT = 96        # 裁剪图缩小到的最大高度（像素），识别模型只用到约 64 像素高的文字行；None 表示不缩放
+UPLOAD_JPEG_QUALITY = 90      # 最高 JPEG 质量
+UPLOAD_MIN_QUALITY = 50       # 最低 JPEG 质量
+UPLOAD_BYTE_BUDGET = 12 * 1024  # 单张图片的目标大小（字节），超出时降低质量；None 表示固定使用最高质量
+
+# ===== 上传重试与熔断 =====
+UPLOAD_TIMEOUT = 5            # 单次请求超时（秒）
+UPLOAD_RETRIES = 2            # 失败后的最大重试次数
+UPLOAD_BACKOFF_BASE = 0.2     # 指数退避的基础间隔（秒），实际等待在 [0, base*2^n] 内随机
+UPLOAD_BACKOFF_MAX = 2.0      # 单次退避的最长等待（秒）
+BREAKER_FAILURE_THRESHOLD = 5 # 连续失败多少次后熔断
+BREAKER_RESET_TIMEOUT = 15    # 熔断持续时间（秒），之后放行一次试探请求
+
+# ===== 离线暂存 =====
+# 门卫电脑不可达时，车牌图片暂存到本地 SQLite，恢复后在后台分批补传
+OFFLINE_QUEUE_PATH = './offline/queue.db'
+OFFLINE_QUEUE_MAX_ITEMS = 2000      # 最多暂存的图片数，超出时丢弃最旧的
+OFFLINE_QUEUE_MAX_AGE = 24 * 3600   # 最长暂存时间（秒），过期的图片直接丢弃
+OFFLINE_DRAIN_BATCH = 8             # 每次补传的图片数
+OFFLINE_DRAIN_INTERVAL = 2          # 队列为空或门卫电脑仍不可达时的检查间隔（秒）
 
 # ===== 摄像头配置 =====
 # 摄像头类型: 'usb' 或 'csi'
@@ -15,12 +40,48 @@ CAMERA_TYPE = 'usb'          # 【USB摄像头用0，CSI摄像头用picamera2】
 USB_CAMERA_ID = 0             # 多个USB摄像头时修改索引
 FRAME_WIDTH = 640             # 采集宽度
 FRAME_HEIGHT = 480            # 采集高度
-FRAME_SKIP = 3                # 跳帧处理（每3帧处理1帧）
+FRAME_SKIP = 3                # 跳帧处理（每3帧处理1帧；开启运动门控时见下方配置）
+
+# ===== 运动门控 =====
+# 车道无变化时只做廉价的运动检测，不运行 YOLO；有运动时加快处理
+MOTION_GATING = True
+MOTION_ROI = None             # 运动检测区域 (x1, y1, x2, y2)，原图像素坐标；None 时使用 DETECT_ROI 的外接矩形
+MOTION_WIDTH = 160            # 运动检测前把画面缩小到的宽度
+MOTION_THRESHOLD = 25         # 与背景的灰度差超过该值的像素视为变化
+MOTION_MIN_RATIO = 0.01       # ROI 内变化像素占比达到该值视为有运动
+MOTION_HOLD = 3               # 运动停止后继续运行 YOLO 的时间（秒）；之后仍有车辆在等门卫电脑结论（等待投票、车道冷却）时按空闲跳帧继续运行
+MOTION_ACTIVE_FRAME_SKIP = 1  # 活动状态跳帧（1 表示每帧都检测）
+MOTION_IDLE_FRAME_SKIP = 6    # 空闲状态跳帧（只做运动检测）
+
+# ===== 流水线配置 =====
+UPLOAD_QUEUE_SIZE = 4         # 待上传队列长度，满时丢弃最旧的检测结果
+STATS_INTERVAL = 10           # 统计信息（各阶段耗时、丢弃计数）输出间隔（秒）
+
+# ===== 车牌跟踪 =====
+# 把相邻帧的检测框关联为同一辆车，每辆车只上传清晰度最高的裁剪图
+TRACKING = True
+TRACK_IOU_THRESHOLD = 0.3     # 检测框与轨迹预测位置的最小交并比
+TRACK_MAX_MISSED = 5          # 连续多少个处理帧未匹配则结束轨迹
+TRACK_MIN_HITS = 2            # 轨迹连续匹配多少帧后首次上传（未达到就结束的轨迹在结束时补传）
+TRACK_IMPROVE_RATIO = 1.5     # 清晰度评分超过上次上传的多少倍才再次上传
+TRACK_MAX_UPLOADS = 3         # 每条轨迹最多上传次数（门卫电脑回复等待投票或车道冷却中的不计入）
 
 # ===== YOLO 模型配置 =====
+# 推理后端：'ultralytics'（PyTorch，加载 YOLO_MODEL）、
+#          'onnxruntime' 或 'opencv'（加载导出的 ONNX_MODEL，不依赖 PyTorch，树莓派上更快）
+# 导出 ONNX：yolo export model=yolov8n.pt format=onnx imgsz=320（imgsz 与 YOLO_INPUT_SIZE 一致）
+DETECTOR_BACKEND = 'ultralytics'
 # 模型路径（如果使用默认预训练模型，会自动下载）
 YOLO_MODEL = 'yolov8n.pt'     # 可选 yolov8n.pt, yolov8s.pt
+ONNX_MODEL = 'yolov8n.onnx'   # 导出的 ONNX 模型路径
+DETECTOR_THREADS = 4          # ONNX 推理线程数（树莓派 4/5 为 4 核）
 CONFIDENCE_THRESHOLD = 0.5    # 检测置信度阈值
+NMS_IOU_THRESHOLD = 0.45      # ONNX 后端非极大值抑制的交并比阈值
+YOLO_INPUT_SIZE = 320         # 推理输入长边（像素），检测区域等比缩放后补边到 32 的倍数（ONNX 后端补边为正方形）；
+                              # None 表示交给 ultralytics 自行缩放
+# 检测区域：车牌只会出现在画面中固定的一块，只对该区域做推理
+# 矩形 (x1, y1, x2, y2) 或多边形 [(x1, y1), (x2, y2), ...]，原图像素坐标；None 表示整幅画面
+DETECT_ROI = None             # 例如 (0, 160, 640, 400)
 
 # ===== 调试模式 =====
 DEBUG = True                  # 是否打印调试信息
@@ -7,19 +7,21 @@ import requests
 import time
 import os
 import sys
+import threading
 from pathlib import Path
 import logging
 from datetime import datetime
 
 # 导入配置
 import config
-
-# 尝试导入YOLO（ultralytics）
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("请先安装 ultralytics: pip install ultralytics")
-    sys.exit(1)
+from utils.image_utils import dhash, RegionOfInterest
+from utils.pipeline import LatestFrame, DropOldestQueue, StageTimer
+from utils.http_client import create_session, backoff_delay, CircuitBreaker, LatencyHistogram
+from utils.offline_queue import OfflineQueue
+from utils.tracker import PlateTracker
+from utils.motion import MotionDetector
+from utils.encoding import AdaptiveJpegEncoder
+from detectors import create_detector
 
 # 根据摄像头类型导入相应库
 if config.CAMERA_TYPE == 'csi':
@@ -52,10 +54,22 @@ class PlateDetector:
         """初始化摄像头和YOLO模型"""
         logger.info("初始化车牌检测系统...")
 
-        # 1. 初始化YOLO模型
+        # 1. 初始化YOLO模型（按 DETECTOR_BACKEND 选择推理后端）
+        model_path = config.YOLO_MODEL if config.DETECTOR_BACKEND == 'ultralytics' else config.ONNX_MODEL
         try:
-            self.model = YOLO(config.YOLO_MODEL)
-            logger.info(f"YOLO模型加载成功: {config.YOLO_MODEL}")
+            start = time.perf_counter()
+            self.detector = create_detector(
+                config.DETECTOR_BACKEND,
+                model_path,
+                input_size=config.YOLO_INPUT_SIZE,
+                iou_threshold=config.NMS_IOU_THRESHOLD,
+                threads=config.DETECTOR_THREADS
+            )
+            logger.info(f"YOLO模型加载成功: {model_path}（{config.DETECTOR_BACKEND}，"
+                        f"{time.perf_counter() - start:.2f}s）")
+        except ImportError as e:
+            logger.error(f"检测后端 {config.DETECTOR_BACKEND} 依赖未安装: {e}")
+            sys.exit(1)
         except Exception as e:
             logger.error(f"YOLO模型加载失败: {e}")
             sys.exit(1)
@@ -75,6 +89,63 @@ class PlateDetector:
         self.frame_count = 0
         self.detect_count = 0
         self.upload_count = 0
+        self.timer = StageTimer()
+        self.upload_latency = LatencyHistogram()
+        self.breaker_skips = 0
+
+        # 编码：缩小到识别所需高度，按字节预算选择 JPEG 质量
+        self.encoder = AdaptiveJpegEncoder(
+            max_height=config.UPLOAD_MAX_HEIGHT,
+            byte_budget=config.UPLOAD_BYTE_BUDGET,
+            quality=config.UPLOAD_JPEG_QUALITY,
+            min_quality=config.UPLOAD_MIN_QUALITY
+        )
+
+        # 上传：长连接会话 + 熔断器
+        self.session = create_session()
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=config.BREAKER_RESET_TIMEOUT
+        )
+
+        # 离线暂存：上传失败的图片保存在本地，门卫电脑恢复后补传
+        self.offline_queue = OfflineQueue(
+            config.OFFLINE_QUEUE_PATH,
+            max_items=config.OFFLINE_QUEUE_MAX_ITEMS,
+            max_age=config.OFFLINE_QUEUE_MAX_AGE
+        )
+        self._drain_mark = (time.monotonic(), 0)   # 上次统计时的 (时刻, 已补传数)，用于计算补传速率
+
+        # 车牌跟踪：同一辆车只上传清晰度最高的裁剪图
+        self.tracker = PlateTracker(
+            iou_threshold=config.TRACK_IOU_THRESHOLD,
+            max_missed=config.TRACK_MAX_MISSED,
+            min_hits=config.TRACK_MIN_HITS,
+            improve_ratio=config.TRACK_IMPROVE_RATIO,
+            max_uploads=config.TRACK_MAX_UPLOADS
+        ) if config.TRACKING else None
+
+        # 检测区域：只把该区域缩放到模型输入尺寸后送入 YOLO
+        self.roi = RegionOfInterest(config.DETECT_ROI, config.FRAME_WIDTH, config.FRAME_HEIGHT) \
+            if config.DETECT_ROI is not None else None
+
+        # 运动检测：车道无变化时跳过 YOLO 推理
+        self.motion = MotionDetector(
+            roi=config.MOTION_ROI or (self.roi.bounds if self.roi else None),
+            width=config.MOTION_WIDTH,
+            threshold=config.MOTION_THRESHOLD,
+            min_ratio=config.MOTION_MIN_RATIO
+        ) if config.MOTION_GATING else None
+        self.active_until = 0.0      # 运动结束后继续推理到该时刻（monotonic）
+        self.motion_onset = None     # 本次运动开始帧的采集时间，检测到车牌后统计触发延迟
+        self.gated_count = 0         # 因无运动跳过推理的帧数
+        self.awaiting_reply = False  # 最近一次回复为等待投票或车道冷却（未开启跟踪时据此判断是否还有车在等结论）
+        self._cpu_mark = (time.monotonic(), time.process_time())
+
+        # 4. 流水线缓冲区
+        self.latest_frame = LatestFrame()
+        self.upload_queue = DropOldestQueue(config.UPLOAD_QUEUE_SIZE)
+        self.stop_event = threading.Event()
 
         logger.info("初始化完成，开始检测循环")
 
@@ -114,120 +185,424 @@ class PlateDetector:
             frame = self.cap.capture_array()
             return True, frame
 
-    def detect_plate(self, frame):
+    def detect_boxes(self, frame):
         """
         使用YOLO检测车牌
-        返回: (是否检测到, 车牌区域裁剪图列表)
+        返回: 车牌框列表 [(x1, y1, x2, y2), ...]，坐标已限制在图像范围内
         """
-        # YOLO推理
-        results = self.model(frame, conf=config.CONFIDENCE_THRESHOLD)
+        # 只保留检测区域，缩放到模型输入尺寸由检测后端完成
+        region = self.roi.crop(frame) if self.roi else frame
 
-        plates = []
-        if len(results) > 0 and results[0].boxes is not None:
-            boxes = results[0].boxes.xyxy.cpu().numpy()
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box[:4])
-                # 确保坐标在图像范围内
-                x1, y1 = max(0, x1), max(0, y1)
-                x2, y2 = min(frame.shape[1], x2), min(frame.shape[0], y2)
+        # YOLO推理
+        dets = self.detector.detect(region, config.CONFIDENCE_THRESHOLD)
+
+        boxes = []
+        for det in dets:
+            # 检测区域坐标 -> 原图坐标
+            x1, y1, x2, y2 = map(int, det[:4])
+            if self.roi:
+                x1, y1 = self.roi.to_frame(x1, y1)
+                x2, y2 = self.roi.to_frame(x2, y2)
+            # 确保坐标在图像范围内
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(frame.shape[1], x2), min(frame.shape[0], y2)
+
+            if x2 > x1 and y2 > y1:
+                boxes.append((x1, y1, x2, y2))
 
-                if x2 > x1 and y2 > y1:
-                    plate_crop = frame[y1:y2, x1:x2]
-                    plates.append(plate_crop)
+                if config.DEBUG:
+                    logger.debug(f"检测到车牌区域: ({x1},{y1})-({x2},{y2})")
 
-                    if config.DEBUG:
-                        logger.debug(f"检测到车牌区域: ({x1},{y1})-({x2},{y2})")
+        return boxes
 
+    def detect_plate(self, frame):
+        """
+        使用YOLO检测车牌
+        返回: (是否检测到, 车牌区域裁剪图列表)
+        """
+        plates = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in self.detect_boxes(frame)]
         return len(plates) > 0, plates
 
-    def upload_plate(self, plate_img):
+    def _frame_headers(self, plate_imgs):
         """
-        上传车牌图片到门卫电脑
-        返回: (是否成功, 响应数据)
+        请求头携带车道编号和各图片的 dHash，门卫电脑可在读取图片前拒绝冷却中或重复的请求
         """
-        # 将图片编码为JPEG
-        _, img_encoded = cv2.imencode('.jpg', plate_img, [cv2.IMWRITE_JPEG_QUALITY, 90])
-        img_bytes = img_encoded.tobytes()
+        return {
+            'X-Lane-Id': config.LANE_ID,
+            'X-Frame-Hash': ','.join(format(dhash(img), 'x') for img in plate_imgs)
+        }
 
-        try:
-            # 发送HTTP POST请求
-            files = {'image': ('plate.jpg', img_bytes, 'image/jpeg')}
-            response = requests.post(config.PC_URL, files=files, timeout=5)
+    def _post(self, url, files, headers, data=None):
+        """
+        发送 multipart 请求到门卫电脑
+        - 复用长连接会话；网络错误和 429/503 按带抖动的指数退避重试
+        - 连续失败达到阈值后熔断，熔断期间直接放弃上传，不再每帧报错
+        返回: (是否成功, 响应数据)；门卫电脑明确拒绝（如 400、413）时响应数据为 {'status': 状态码}，
+              不可达、繁忙或熔断中为 None（这类失败的图片会暂存到离线队列）
+        """
+        if not self.breaker.allow():
+            self.breaker_skips += 1
+            return False, None
+
+        retry_after = None
+        for attempt in range(config.UPLOAD_RETRIES + 1):
+            if attempt > 0:
+                time.sleep(backoff_delay(attempt - 1, config.UPLOAD_BACKOFF_BASE,
+                                         config.UPLOAD_BACKOFF_MAX))
+            start = time.perf_counter()
+            try:
+                # 发送HTTP POST请求
+                response = self.session.post(url, files=files, data=data, headers=headers,
+                                             timeout=config.UPLOAD_TIMEOUT)
+            except requests.exceptions.ConnectionError:
+                logger.warning(f"无法连接到门卫电脑: {url}")
+                continue
+            except requests.exceptions.Timeout:
+                logger.warning("连接超时")
+                continue
+            except Exception as e:
+                logger.error(f"上传异常: {e}")
+                break
+            finally:
+                self.upload_latency.observe(time.perf_counter() - start)
 
             if response.status_code == 200:
-                result = response.json()
+                if self.breaker.record_success():
+                    logger.info("门卫电脑恢复连接，继续上传")
+                try:
+                    result = response.json()
+                except ValueError:
+                    # 响应不是 JSON（如被代理替换成错误页），按明确拒绝处理，不再重试
+                    logger.warning("门卫电脑返回的响应不是有效的 JSON")
+                    return False, {'status': response.status_code}
                 if config.DEBUG:
                     logger.debug(f"上传成功: {result}")
                 return True, result
+            elif response.status_code in (429, 503):
+                # 429：识别队列已满；503：模型加载中或识别超时
+                retry_after = response.headers.get('Retry-After')
+                logger.warning(f"门卫电脑识别服务繁忙（HTTP {response.status_code}），"
+                               f"建议 {retry_after or '?'} 秒后重试")
             else:
+                # 其他状态码（如 400、413）重试也无济于事，且说明连接正常
                 logger.warning(f"上传失败，HTTP状态码: {response.status_code}")
-                return False, None
+                self.breaker.record_success()
+                return False, {'status': response.status_code}
 
-        except requests.exceptions.ConnectionError:
-            logger.error(f"无法连接到门卫电脑: {config.PC_URL}")
-            return False, None
-        except requests.exceptions.Timeout:
-            logger.error("连接超时")
-            return False, None
-        except Exception as e:
-            logger.error(f"上传异常: {e}")
-            return False, None
+        # 重试用尽：计入熔断器；服务端给出 Retry-After 时按其暂停
+        open_for = float(retry_after) if retry_after and retry_after.isdigit() else None
+        if self.breaker.record_failure(open_for=open_for):
+            logger.error(f"上传连续失败，暂停上传 {open_for or self.breaker.reset_timeout} 秒")
+        return False, None
+
+    def encode_plate(self, plate_img):
+        """将车牌图片缩小并编码为JPEG，返回编码缓冲区的 memoryview（不复制）"""
+        return self.encoder.encode(self.encoder.resize(plate_img))
+
+    def upload_plate(self, plate_img, img_bytes=None):
+        """
+        上传车牌图片到门卫电脑
+        :param img_bytes: 已编码的JPEG数据（bytes 或 memoryview），未提供时现场编码
+        返回: (是否成功, 响应数据)
+        """
+        if img_bytes is None:
+            img_bytes = self.encode_plate(plate_img)
+
+        files = {'image': ('plate.jpg', img_bytes, 'image/jpeg')}
+        return self._post(config.PC_URL, files, self._frame_headers([plate_img]))
+
+    def upload_plates(self, plate_imgs, encoded=None):
+        """
+        将同一帧的多张车牌图片合并为一次请求上传
+        :param encoded: 与 plate_imgs 对应的已编码JPEG数据列表，未提供时现场编码
+        返回: (是否成功, 响应数据)，响应中 results 与 plate_imgs 顺序一致
+        """
+        if encoded is None:
+            encoded = [self.encode_plate(img) for img in plate_imgs]
+        files = [('images', (f'plate_{i}.jpg', img_bytes, 'image/jpeg'))
+                 for i, img_bytes in enumerate(encoded)]
+        return self._post(config.PC_BATCH_URL, files, self._frame_headers(plate_imgs))
+
+    def _log_result(self, result, track_id=None):
+        """
+        打印单个车牌的通行判断：放行或刚刚放行过的轨迹不再上传；
+        等待投票的轨迹尽快上传新画面，车道冷却中的轨迹在冷却结束后重新上传（这两种都不计入上传次数）
+        """
+        tracked = track_id is not None and self.tracker
+        self.awaiting_reply = bool(result.get('pending')) or \
+            (bool(result.get('cooldown')) and result.get('plate') is None)
+        if result.get('allowed'):
+            if tracked:
+                self.tracker.mark_done(track_id)
+            logger.info(f"✅ 允许通行 - 车牌: {result.get('plate', 'unknown')}")
+        elif result.get('pending'):
+            if tracked:
+                self.tracker.request_more(track_id)
+            logger.info(f"⏳ 等待更多画面 - 车牌: {result.get('plate', 'unknown')}")
+        elif result.get('cooldown') and result.get('plate') is None:
+            # 车道冷却（另一辆车刚放行）：还没有识别这辆车，不是禁止通行
+            retry_after = result.get('retry_after') or 0.0
+            if tracked:
+                self.tracker.request_more(track_id, delay=retry_after)
+            logger.info(f"⏸ 车道冷却中，{retry_after} 秒后重新上传")
+        elif result.get('cooldown'):
+            # 该车辆刚刚放行过
+            if tracked:
+                self.tracker.mark_done(track_id)
+            logger.info(f"✅ 刚刚放行过 - 车牌: {result.get('plate')}")
+        else:
+            logger.info(f"❌ 禁止通行 - 车牌: {result.get('plate', 'unknown')}")
+
+    def _capture_loop(self):
+        """采集线程：持续读取摄像头，始终只保留最新一帧"""
+        while not self.stop_event.is_set():
+            with self.timer.time('采集'):
+                ret, frame = self.read_frame()
+            if not ret:
+                logger.warning("读取摄像头失败")
+                time.sleep(0.1)
+                continue
+            self.frame_count += 1
+            self.latest_frame.put((time.time(), frame))
+
+    def _upload_loop(self):
+        """上传线程：从上传队列取出检测结果并发送到门卫电脑，网络慢不会阻塞采集和检测"""
+        while not self.stop_event.is_set():
+            item = self.upload_queue.get(timeout=0.5)
+            if item is None:
+                continue
+            captured_at, plates, track_ids = item
+            try:
+                with self.timer.time('上传'):
+                    self._process_plates(plates, captured_at, track_ids)
+            except Exception:
+                # 单次上传出错不能让上传线程退出
+                logger.exception("处理上传结果失败")
+
+    def _drain_loop(self):
+        """
+        补传线程：门卫电脑可达时把离线队列中的图片按批次补传，附带各自的采集时间。
+        实时上传优先：上传队列非空时暂不补传。
+        """
+        while not self.stop_event.is_set():
+            if self.breaker.is_open or len(self.upload_queue) or not len(self.offline_queue):
+                self.stop_event.wait(config.OFFLINE_DRAIN_INTERVAL)
+                continue
+
+            try:
+                self._drain_batch()
+            except Exception:
+                # 单批补传出错不能让补传线程退出
+                logger.exception("补传离线图片失败")
+                self.stop_event.wait(config.OFFLINE_DRAIN_INTERVAL)
+
+    def _drain_batch(self):
+        """补传离线队列中最早的一批图片"""
+        rows = self.offline_queue.peek(config.OFFLINE_DRAIN_BATCH)
+        if not rows:
+            return
+        files = [('images', (f'offline_{row_id}.jpg', image, 'image/jpeg'))
+                 for row_id, _, image in rows]
+        data = {'captured_at': [f'{captured_at:.3f}' for _, captured_at, _ in rows]}
+        headers = {'X-Lane-Id': config.LANE_ID, 'X-Replay': '1'}
+        with self.timer.time('补传'):
+            success, result = self._post(config.PC_BATCH_URL, files, headers, data=data)
+
+        if success:
+            self.offline_queue.remove([row_id for row_id, _, _ in rows])
+            logger.info(f"补传 {len(rows)} 张离线图片，剩余 {len(self.offline_queue)} 张")
+        elif result is not None:
+            # 门卫电脑明确拒绝（如图片损坏），重试也不会成功，直接丢弃避免堵住队列
+            logger.warning(f"门卫电脑拒绝补传（HTTP {result['status']}），丢弃 {len(rows)} 张离线图片")
+            self.offline_queue.remove([row_id for row_id, _, _ in rows], delivered=False)
+        else:
+            self.stop_event.wait(config.OFFLINE_DRAIN_INTERVAL)
+
+    def _process_plates(self, plates, captured_at, track_ids=None):
+        """
+        保存（可选）并上传同一帧检测到的车牌，门卫电脑不可达时存入离线队列
+        :param captured_at: 帧的采集时间（Unix 时间戳）
+        :param track_ids: 与 plates 对应的轨迹编号，放行后该轨迹不再上传
+        """
+        track_ids = track_ids or [None] * len(plates)
+        # 每张图只编码一次，上传、保存和离线暂存共用同一块缓冲区
+        plates = [self.encoder.resize(img) for img in plates]
+        with self.timer.time('编码'):
+            encoded = [self.encoder.encode(img) for img in plates]
+
+        # 可选：保存裁剪的图片（调试用）
+        if config.SAVE_CROPS:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            for i, img_bytes in enumerate(encoded):
+                filename = f"{config.SAVE_PATH}/plate_{timestamp}_{i}.jpg"
+                with open(filename, 'wb') as f:
+                    f.write(img_bytes)
+                logger.debug(f"保存裁剪图片: {filename}")
+
+        failed = []
+        if config.BATCH_UPLOAD:
+            # 整帧一次上传到门卫电脑
+            success, result = self.upload_plates(plates, encoded)
+            if success:
+                self.upload_count += 1
+                # 车道冷却时 results 为空，每张图都按整体的冷却响应处理
+                items = result.get('results') or [result] * len(track_ids)
+                for item, track_id in zip(items, track_ids):
+                    self._log_result(item, track_id)
+            elif result is None:
+                failed = encoded
+        else:
+            # 对每个检测到的车牌逐张上传
+            for plate_img, img_bytes, track_id in zip(plates, encoded, track_ids):
+                success, result = self.upload_plate(plate_img, img_bytes)
+                if success:
+                    self.upload_count += 1
+                    self._log_result(result, track_id)
+                elif result is None:
+                    failed.append(img_bytes)
+
+        if failed:
+            self.offline_queue.put(failed, captured_at)
+            if not self.breaker.is_open:
+                logger.warning(f"上传失败，已暂存 {len(failed)} 张图片，离线队列 {len(self.offline_queue)} 张")
+
+    def _drain_rate(self):
+        """距上次统计以来的补传速率（张/秒）"""
+        now, drained = time.monotonic(), self.offline_queue.drained
+        last_time, last_drained = self._drain_mark
+        self._drain_mark = (now, drained)
+        return (drained - last_drained) / max(now - last_time, 1e-6)
+
+    def _cpu_usage(self):
+        """距上次统计以来本进程的 CPU 占用（单核百分比）"""
+        now, cpu = time.monotonic(), time.process_time()
+        last_time, last_cpu = self._cpu_mark
+        self._cpu_mark = (now, cpu)
+        return (cpu - last_cpu) / max(now - last_time, 1e-6) * 100
+
+    @property
+    def active(self):
+        """当前是否处于活动状态（有运动或运动结束不久）"""
+        return self.motion is None or time.monotonic() < self.active_until
+
+    @property
+    def awaiting_verdict(self):
+        """是否还有车辆在等门卫电脑的结论：有尚未放行且还能上传的轨迹，未开启跟踪时看最近一次回复"""
+        if self.tracker:
+            return self.tracker.open_tracks > 0
+        return self.awaiting_reply
+
+    def _should_detect(self, frame, captured_at):
+        """
+        运动门控：ROI 内有运动时进入活动状态并持续 MOTION_HOLD 秒，活动期间才运行 YOLO。
+        停下的车几秒后就被背景吸收、不再触发运动，空闲状态下仍有车辆在等结论时照常运行 YOLO
+        （帧率按空闲状态），直到放行、禁止通行或车辆离开
+        """
+        if self.motion is None:
+            return True
+        with self.timer.time('运动检测'):
+            moving = self.motion.update(frame)
+        if moving:
+            if not self.active:
+                self.motion_onset = captured_at
+                logger.info(f"检测到运动（变化像素 {self.motion.ratio:.1%}），开始推理")
+            self.active_until = time.monotonic() + config.MOTION_HOLD
+        elif not self.active:
+            self.motion_onset = None
+            return self.awaiting_verdict
+        return self.active
+
+    def _log_stats(self):
+        """打印统计信息：各阶段平均耗时、丢弃计数、CPU 占用和离线队列状态"""
+        logger.info(f"统计: 总帧数={self.frame_count}, "
+                    f"检测次数={self.detect_count}, "
+                    f"上传成功={self.upload_count}, "
+                    f"未检测帧={self.latest_frame.dropped}, "
+                    f"上传队列丢弃={self.upload_queue.dropped}, "
+                    f"熔断跳过={self.breaker_skips}, "
+                    f"无运动跳过={self.gated_count}, "
+                    f"状态={'活动' if self.active else '等待结论' if self.awaiting_verdict else '空闲'}, CPU={self._cpu_usage():.0f}%, "
+                    f"{self.tracker.stats() + ', ' if self.tracker else ''}"
+                    f"离线队列={len(self.offline_queue)}(已补传={self.offline_queue.drained}, "
+                    f"速率={self._drain_rate():.1f}张/秒, 淘汰={self.offline_queue.evicted}), "
+                    f"编码: {self.encoder.stats()}, "
+                    f"阶段耗时: {self.timer.summary()}, "
+                    f"上传延迟: {self.upload_latency.summary()}")
 
     def run(self):
-        """主循环"""
+        """
+        主循环：采集、检测、上传三级流水线
+        - 采集线程只保留最新一帧，检测总是处理最新画面
+        - 检测在主线程中进行，检测结果放入有界上传队列（满时丢弃最旧的）
+        - 上传线程独立发送请求，门卫电脑响应慢不会卡住采集和检测
+        - 开启运动门控时，空闲状态按 MOTION_IDLE_FRAME_SKIP 跳帧只做运动检测（仍有车辆在等结论时也运行 YOLO），
+          活动状态按 MOTION_ACTIVE_FRAME_SKIP 跳帧运行 YOLO
+        """
         logger.info("开始主循环...")
+        threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._upload_loop, name='upload', daemon=True),
+            threading.Thread(target=self._drain_loop, name='drain', daemon=True),
+        ]
+        for t in threads:
+            t.start()
 
         try:
+            seq = 0
+            next_stats = time.monotonic() + config.STATS_INTERVAL
             while True:
-                # 读取一帧
-                ret, frame = self.read_frame()
-                if not ret:
-                    logger.warning("读取摄像头失败")
-                    time.sleep(0.1)
+                # 显示调试信息
+                if config.DEBUG and time.monotonic() >= next_stats:
+                    next_stats = time.monotonic() + config.STATS_INTERVAL
+                    self._log_stats()
+
+                # 跳帧处理：等待至少 frame_skip 个新帧后取最新一帧
+                if self.motion is None:
+                    frame_skip = config.FRAME_SKIP
+                elif self.active:
+                    frame_skip = config.MOTION_ACTIVE_FRAME_SKIP
+                else:
+                    frame_skip = config.MOTION_IDLE_FRAME_SKIP
+                new_seq, item = self.latest_frame.get(after=seq + frame_skip - 1, timeout=1.0)
+                if item is None:
                     continue
+                seq = new_seq
+                captured_at, frame = item
 
-                self.frame_count += 1
-
-                # 跳帧处理
-                if self.frame_count % config.FRAME_SKIP != 0:
+                if not self._should_detect(frame, captured_at):
+                    self.gated_count += 1
                     continue
 
                 # YOLO检测
-                detected, plates = self.detect_plate(frame)
+                with self.timer.time('检测'):
+                    boxes = self.detect_boxes(frame)
+                plates = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+                if not plates:
+                    self.awaiting_reply = False   # 车辆已离开
 
-                if detected:
+                if plates:
                     self.detect_count += 1
                     logger.info(f"检测到 {len(plates)} 个车牌")
-
-                    # 对每个检测到的车牌进行处理
-                    for i, plate_img in enumerate(plates):
-                        # 可选：保存裁剪的图片（调试用）
-                        if config.SAVE_CROPS:
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                            filename = f"{config.SAVE_PATH}/plate_{timestamp}_{i}.jpg"
-                            cv2.imwrite(filename, plate_img)
-                            logger.debug(f"保存裁剪图片: {filename}")
-
-                        # 上传到门卫电脑
-                        success, result = self.upload_plate(plate_img)
-                        if success:
-                            self.upload_count += 1
-                            if result.get('allowed'):
-                                logger.info(f"✅ 允许通行 - 车牌: {result.get('plate', 'unknown')}")
-                            else:
-                                logger.info(f"❌ 禁止通行 - 车牌: {result.get('plate', 'unknown')}")
-                        else:
-                            logger.warning("上传失败")
-
-                # 显示调试信息
-                if config.DEBUG and self.frame_count % 30 == 0:
-                    logger.info(f"统计: 总帧数={self.frame_count}, "
-                                f"检测次数={self.detect_count}, "
-                                f"上传成功={self.upload_count}")
+                    if self.motion_onset is not None:
+                        # 从出现运动的那一帧被采集，到首次检测出车牌的耗时
+                        self.timer.record('运动触发', time.time() - self.motion_onset)
+                        self.motion_onset = None
+
+                if self.tracker:
+                    # 每帧都要更新跟踪器（包括未检测到的帧），轨迹才能按时结束
+                    uploads = self.tracker.update(boxes, plates)
+                    if uploads:
+                        track_ids, crops = zip(*uploads)
+                        self.upload_queue.put((captured_at, list(crops), list(track_ids)))
+                elif plates:
+                    self.upload_queue.put((captured_at, plates, None))
 
         except KeyboardInterrupt:
             logger.info("用户中断程序")
         finally:
+            self.stop_event.set()
+            for t in threads:
+                t.join(timeout=2)
             self.cleanup()
 
     def cleanup(self):
@@ -237,7 +612,16 @@ class PlateDetector:
             self.cap.release()
         logger.info(f"最终统计: 总帧数={self.frame_count}, "
                     f"检测次数={self.detect_count}, "
-                    f"上传成功={self.upload_count}")
+                    f"上传成功={self.upload_count}, "
+                    f"未检测帧={self.latest_frame.dropped}, "
+                    f"上传队列丢弃={self.upload_queue.dropped}, "
+                    f"熔断跳过={self.breaker_skips}, "
+                    f"无运动跳过={self.gated_count}, "
+                    f"{self.tracker.stats() + ', ' if self.tracker else ''}"
+                    f"离线队列={len(self.offline_queue)}(已补传={self.offline_queue.drained}), "
+                    f"上传延迟: {self.upload_latency.summary()}")
+        self.session.close()
+        self.offline_queue.close()
         logger.info("程序退出")
 
 
@@ -0,0 +1,25 @@
+"""
+车牌检测后端：ultralytics（PyTorch）、ONNX Runtime、OpenCV DNN
+各后端提供相同的接口 detect(image, conf_threshold) -> (N, 5) 的 x1, y1, x2, y2, score
+"""
+
+BACKENDS = ('ultralytics', 'onnxruntime', 'opencv')
+
+
+def create_detector(backend, model_path, input_size=320, iou_threshold=0.45, threads=None):
+    """
+    按名称创建检测后端；只导入所选后端需要的库
+    :param backend: 'ultralytics'、'onnxruntime' 或 'opencv'
+    :param model_path: ultralytics 使用 .pt 模型，其余使用导出的 .onnx 模型
+    """
+    if backend == 'ultralytics':
+        from .ultralytics_backend import UltralyticsDetector
+        return UltralyticsDetector(model_path, input_size=input_size)
+    if backend in ('onnxruntime', 'opencv'):
+        from .onnx_backend import OnnxDetector
+        return OnnxDetector(model_path, runtime=backend, input_size=input_size or 320,
+                            iou_threshold=iou_threshold, threads=threads)
+    raise ValueError(f"未知的检测后端: {backend}，可选 {', '.join(BACKENDS)}")
+
+
+__all__ = ['BACKENDS', 'create_detector']
@@ -0,0 +1,90 @@
+"""
+导出的 ONNX 模型检测后端：ONNX Runtime 或 OpenCV DNN 推理，不依赖 PyTorch
+导出方法（在 PC 上执行一次）：yolo export model=yolov8n.pt format=onnx imgsz=320
+"""
+import cv2
+import numpy as np
+
+from .postprocess import decode_yolov8
+
+
+class OnnxDetector:
+    """
+    运行导出的 YOLOv8 ONNX 模型
+    - 固定的正方形输入，画布和输入张量在初始化时分配一次，每帧原地写入
+    - 后处理（解码、NMS）为 NumPy 向量化实现
+    """
+
+    def __init__(self, model_path, runtime='onnxruntime', input_size=320,
+                 iou_threshold=0.45, threads=None):
+        """
+        :param model_path: .onnx 模型路径
+        :param runtime: 'onnxruntime' 或 'opencv'
+        :param input_size: 模型输入边长；模型的输入形状固定时以模型为准
+        :param iou_threshold: NMS 的交并比阈值
+        :param threads: 推理线程数，None 表示由推理库决定
+        """
+        self.name = runtime
+        self.iou_threshold = iou_threshold
+
+        if runtime == 'onnxruntime':
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+            self._session = ort.InferenceSession(model_path, options,
+                                                 providers=['CPUExecutionProvider'])
+            model_input = self._session.get_inputs()[0]
+            self._input_name = model_input.name
+            if isinstance(model_input.shape[-1], int):
+                input_size = model_input.shape[-1]
+        elif runtime == 'opencv':
+            if threads:
+                cv2.setNumThreads(threads)
+            self._net = cv2.dnn.readNetFromONNX(model_path)
+        else:
+            raise ValueError(f"未知的推理库: {runtime}")
+
+        self.input_size = input_size
+        self._canvas = np.full((input_size, input_size, 3), 114, dtype=np.uint8)
+        self._input = np.empty((1, 3, input_size, input_size), dtype=np.float32)
+        self._geometry = None   # 上一帧的 (缩放后宽, 高, 左补边, 上补边)
+
+    def _preprocess(self, image):
+        """
+        letterbox 到正方形画布并归一化写入输入张量（BGR -> RGB，HWC -> CHW）
+        :return: (缩放比例, 左补边, 上补边)
+        """
+        size = self.input_size
+        h, w = image.shape[:2]
+        scale = min(size / w, size / h)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+        geometry = (new_w, new_h, pad_x, pad_y)
+        if geometry != self._geometry:
+            # 输入尺寸变化时才需要重新填充补边区域
+            self._canvas[:] = 114
+            self._geometry = geometry
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        self._canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = \
+            cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+
+        np.multiply(self._canvas.transpose(2, 0, 1)[::-1], 1 / 255.0, out=self._input[0])
+        return scale, pad_x, pad_y
+
+    def detect(self, image, conf_threshold):
+        """
+        检测车牌
+        :return: (N, 5) 的 x1, y1, x2, y2, score（image 坐标）
+        """
+        scale, pad_x, pad_y = self._preprocess(image)
+        if self.name == 'onnxruntime':
+            output = self._session.run(None, {self._input_name: self._input})[0]
+        else:
+            self._net.setInput(self._input)
+            output = self._net.forward()
+
+        dets = decode_yolov8(output, conf_threshold, self.iou_threshold)
+        dets[:, :4] = (dets[:, :4] - (pad_x, pad_y, pad_x, pad_y)) / scale
+        return dets
@@ -0,0 +1,48 @@
+"""
+YOLOv8 导出模型的后处理：解码输出张量并做非极大值抑制（纯 NumPy 向量化实现）
+"""
+import numpy as np
+
+
+def nms(boxes, scores, iou_threshold):
+    """
+    非极大值抑制
+    :param boxes: (N, 4) 的 x1, y1, x2, y2
+    :param scores: (N,) 置信度
+    :return: 保留的下标数组，按置信度从高到低
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        # 当前框与其余所有框的交并比一次算出
+        w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        overlap = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[overlap <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def decode_yolov8(output, conf_threshold, iou_threshold):
+    """
+    解码 YOLOv8 导出模型的输出
+    :param output: (1, 4 + 类别数, 锚点数) 的张量，前 4 行为中心点和宽高
+    :return: (N, 5) 的 x1, y1, x2, y2, score（模型输入坐标）
+    """
+    preds = output[0]
+    class_scores = preds[4:]
+    scores = class_scores.max(axis=0)
+    mask = scores > conf_threshold
+    if not mask.any():
+        return np.zeros((0, 5), dtype=np.float32)
+
+    cx, cy, w, h = preds[:4, mask]
+    scores = scores[mask]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    keep = nms(boxes, scores, iou_threshold)
+    return np.concatenate([boxes[keep], scores[keep, None]], axis=1).astype(np.float32)
@@ -0,0 +1,40 @@
+"""
+ultralytics（PyTorch）检测后端
+"""
+import numpy as np
+
+from utils.image_utils import letterbox
+
+
+class UltralyticsDetector:
+    """直接加载 .pt 模型，导入 torch 较慢，适合在 PC 上调试"""
+
+    name = 'ultralytics'
+
+    def __init__(self, model_path, input_size=None):
+        """
+        :param model_path: .pt 模型路径
+        :param input_size: 推理输入长边；None 表示交给 ultralytics 自行缩放
+        """
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.input_size = input_size
+
+    def detect(self, image, conf_threshold):
+        """
+        检测车牌
+        :return: (N, 5) 的 x1, y1, x2, y2, score（image 坐标）
+        """
+        if self.input_size:
+            # 等比缩放并补边到 32 的倍数，imgsz 与之相同，ultralytics 不会再次缩放
+            inp, scale, (pad_x, pad_y) = letterbox(image, self.input_size)
+            results = self.model(inp, conf=conf_threshold, imgsz=inp.shape[:2])
+        else:
+            scale, pad_x, pad_y = 1.0, 0, 0
+            results = self.model(image, conf=conf_threshold)
+
+        if not results or results[0].boxes is None:
+            return np.zeros((0, 5), dtype=np.float32)
+        dets = results[0].boxes.data.cpu().numpy()[:, :5].astype(np.float32)
+        dets[:, :4] = (dets[:, :4] - (pad_x, pad_y, pad_x, pad_y)) / scale
+        return dets
@@ -0,0 +1,88 @@
+"""
+车牌裁剪图编码：缩小到识别所需的高度，按字节预算自适应选择 JPEG 质量
+"""
+import threading
+
+import cv2
+
+
+class AdaptiveJpegEncoder:
+    """
+    自适应 JPEG 编码器
+    - 高于 max_height 的裁剪图等比缩小（门卫电脑的识别模型只用到约 64 像素高的文字行）
+    - 从上次选定的质量开始编码，超出 byte_budget 则逐级降低质量（不低于 min_quality）；
+      连续明显低于预算时逐级回升，通常每张图只需编码一次
+    - 返回 imencode 输出缓冲区的 memoryview，上传、保存和离线暂存共用，不再复制
+    """
+
+    def __init__(self, max_height=96, byte_budget=12 * 1024, quality=90, min_quality=50, step=10):
+        """
+        :param max_height: 缩放后的最大高度（像素），None 表示不缩放
+        :param byte_budget: 单张图片的目标字节数，None 表示固定使用 quality
+        :param quality: 最高（初始）JPEG 质量
+        :param min_quality: 最低 JPEG 质量
+        :param step: 每次调整的质量步长
+        """
+        self.max_height = max_height
+        self.byte_budget = byte_budget
+        self.max_quality = quality
+        self.min_quality = min_quality
+        self.step = step
+        self._quality = quality
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.count = 0
+        self.total_bytes = 0
+        self.total_encodes = 0
+
+    def resize(self, image):
+        """按 max_height 等比缩小（不放大）"""
+        h, w = image.shape[:2]
+        if not self.max_height or h <= self.max_height:
+            return image
+        scale = self.max_height / h
+        return cv2.resize(image, (max(1, int(round(w * scale))), self.max_height),
+                          interpolation=cv2.INTER_AREA)
+
+    def _encode(self, image, quality):
+        ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG 编码失败")
+        return memoryview(buf.reshape(-1))
+
+    def encode(self, image):
+        """
+        编码一张（已缩放的）裁剪图
+        :return: JPEG 数据的 memoryview
+        """
+        with self._lock:
+            quality = self._quality
+        encodes = 1
+        data = self._encode(image, quality)
+
+        if self.byte_budget:
+            while data.nbytes > self.byte_budget and quality > self.min_quality:
+                quality = max(self.min_quality, quality - self.step)
+                data = self._encode(image, quality)
+                encodes += 1
+            with self._lock:
+                if data.nbytes < self.byte_budget * 0.6 and quality < self.max_quality:
+                    # 余量充足，下次尝试更高的质量
+                    self._quality = min(self.max_quality, quality + self.step)
+                else:
+                    self._quality = quality
+
+        with self._lock:
+            self.count += 1
+            self.total_bytes += data.nbytes
+            self.total_encodes += encodes
+        return data
+
+    def stats(self):
+        """返回 '平均大小 / 当前质量 / 平均编码次数' 摘要"""
+        with self._lock:
+            if not self.count:
+                return "无数据"
+            return (f"平均={self.total_bytes / self.count / 1024:.1f}KB, 质量={self._quality}, "
+                    f"编码次数={self.total_encodes / self.count:.2f}")
@@ -0,0 +1,130 @@
+"""
+HTTP 上传工具：长连接会话、带抖动的指数退避、熔断器、延迟直方图
+"""
+import bisect
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size=4):
+    """
+    创建复用 TCP 连接的 requests.Session。
+    重试由调用方控制（见 backoff_delay），这里关闭 urllib3 自带的重试。
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def backoff_delay(attempt, base, cap):
+    """
+    第 attempt 次重试（从 0 开始）前的等待时间：全抖动指数退避，
+    在 [0, min(cap, base * 2^attempt)] 内均匀取值，避免多台设备同时重试。
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败 failure_threshold 次后断开 reset_timeout 秒，期间直接拒绝上传；
+    到期后进入半开状态，放行一次试探请求，成功则恢复，失败则再次断开。
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=15):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._half_open = False
+        self.trips = 0
+
+    @property
+    def is_open(self):
+        """是否处于断开状态"""
+        return time.monotonic() < self._open_until
+
+    def allow(self):
+        """当前是否允许发送请求（半开状态下只放行一个试探请求）"""
+        with self._lock:
+            if time.monotonic() < self._open_until:
+                return False
+            if self._failures >= self.failure_threshold:
+                if self._half_open:
+                    return False
+                self._half_open = True
+            return True
+
+    def record_success(self):
+        """请求成功：清零失败计数并关闭熔断器，返回是否从断开状态恢复"""
+        with self._lock:
+            recovered = self._failures >= self.failure_threshold
+            self._failures = 0
+            self._half_open = False
+            self._open_until = 0.0
+            return recovered
+
+    def record_failure(self, open_for=None):
+        """
+        请求失败：累计失败次数，达到阈值时断开。
+        :param open_for: 服务端给出的重试间隔（秒），有则按此断开
+        :return: 本次是否触发了断开
+        """
+        with self._lock:
+            self._failures += 1
+            self._half_open = False
+            if self._failures < self.failure_threshold and open_for is None:
+                return False
+            self._failures = max(self._failures, self.failure_threshold)
+            self._open_until = time.monotonic() + (open_for or self.reset_timeout)
+            self.trips += 1
+            return True
+
+
+class LatencyHistogram:
+    """上传延迟直方图：按固定的毫秒分桶计数"""
+
+    BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        """记录一次耗时"""
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, p):
+        """按分桶估算第 p 百分位（返回桶的上界，毫秒；超出最大桶返回 inf）"""
+        with self._lock:
+            if not self.count:
+                return 0
+            target = self.count * p / 100
+            seen = 0
+            for i, n in enumerate(self._counts):
+                seen += n
+                if seen >= target:
+                    return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else float('inf')
+        return float('inf')
+
+    def summary(self):
+        """返回 '平均 / p50 / p99 / 各桶计数' 的摘要字符串"""
+        with self._lock:
+            if not self.count:
+                return "无数据"
+            avg = self.total / self.count * 1000
+            labels = [f"≤{b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+            buckets = ' '.join(f"{label}:{n}" for label, n in zip(labels, self._counts) if n)
+        return f"平均={avg:.0f}ms p50≤{self.percentile(50)}ms p99≤{self.percentile(99)}ms [{buckets}]"
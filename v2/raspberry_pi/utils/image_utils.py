@@ -1,29 +1,29 @@
 """
 图像处理工具函数（可选）
 """
+import threading
+
 import cv2
 import numpy as np
 
+from .preprocess import PlatePreprocessor, SHARPEN_BOX
+
+# 每个线程一个预处理器（CLAHE 实例和缓冲区不能跨线程共享）
+_local = threading.local()
+
 
 def enhance_plate(image):
     """
-    对车牌图像进行增强处理（可选）
-    可在上传前调用，提高识别率
+    对车牌图像进行增强处理（可选）：灰度 → CLAHE → 锐化
+    可在上传前调用，提高识别率。返回新的灰度图。
     """
-    # 转为灰度
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-    # CLAHE 增强对比度
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
-
-    # 锐化
-    kernel = np.array([[-1, -1, -1],
-                       [-1, 9, -1],
-                       [-1, -1, -1]])
-    sharpened = cv2.filter2D(enhanced, -1, kernel)
-
-    return sharpened
+    preprocessor = getattr(_local, 'preprocessor', None)
+    if preprocessor is None:
+        preprocessor = _local.preprocessor = PlatePreprocessor(
+            clip_limit=2.0, tile_grid_size=(8, 8), kernel=SHARPEN_BOX
+        )
+    # 调用方可能保留返回值，拷贝出内部缓冲区
+    return preprocessor.process(image).copy()
 
 
 def rotate_plate(image, angle):
@@ -34,4 +34,86 @@ def rotate_plate(image, angle):
     center = (w // 2, h // 2)
     matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
     rotated = cv2.warpAffine(image, matrix, (w, h))
-    return rotated
\ No newline at end of file
+    return rotated
+
+
+def dhash(image, hash_size=16):
+    """
+    计算图像的差值哈希（dHash），与门卫电脑端 utils/result_cache.dhash 保持一致。
+    上传时放在 X-Frame-Hash 请求头中，门卫电脑据此在读取图片前识别重复画面。
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def letterbox(image, size, stride=32, square=False, color=(114, 114, 114)):
+    """
+    等比缩放到长边为 size，再用灰边补齐（YOLO 的 letterbox 预处理）
+    :param size: 目标长边（模型输入尺寸）
+    :param stride: square=False 时短边只补齐到 stride 的整数倍，减少无效像素
+    :param square: 是否补齐为 size x size 的正方形（固定输入尺寸的模型需要）
+    :return: (补边后的图像, 缩放比例, (左侧补边, 上方补边))
+    """
+    h, w = image.shape[:2]
+    scale = min(size / w, size / h)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    if (new_w, new_h) != (w, h):
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        image = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+
+    if square:
+        out_w = out_h = size
+    else:
+        out_w = -(-new_w // stride) * stride
+        out_h = -(-new_h // stride) * stride
+    pad_x, pad_y = (out_w - new_w) // 2, (out_h - new_h) // 2
+    padded = cv2.copyMakeBorder(image, pad_y, out_h - new_h - pad_y, pad_x, out_w - new_w - pad_x,
+                                cv2.BORDER_CONSTANT, value=color)
+    return padded, scale, (pad_x, pad_y)
+
+
+class RegionOfInterest:
+    """
+    检测区域：矩形 (x1, y1, x2, y2) 或多边形 [(x, y), ...]，原图像素坐标。
+    crop() 裁出外接矩形（多边形外的像素填灰色），to_frame() 把裁剪图中的坐标映射回原图。
+    """
+
+    def __init__(self, roi, frame_width, frame_height):
+        if len(roi) == 4 and all(np.isscalar(v) for v in roi):
+            x1, y1, x2, y2 = roi
+            polygon = None
+        else:
+            polygon = np.array(roi, dtype=np.int32)
+            x1, y1 = polygon.min(axis=0)
+            x2, y2 = polygon.max(axis=0) + 1
+        self.x1, self.y1 = max(0, int(x1)), max(0, int(y1))
+        self.x2, self.y2 = min(frame_width, int(x2)), min(frame_height, int(y2))
+        if self.x2 <= self.x1 or self.y2 <= self.y1:
+            raise ValueError(f"检测区域超出画面范围: {roi}")
+
+        # 多边形外的像素在裁剪图中的掩码（预先计算一次）
+        self._outside = None
+        if polygon is not None:
+            mask = np.zeros((self.y2 - self.y1, self.x2 - self.x1), dtype=np.uint8)
+            cv2.fillPoly(mask, [polygon - (self.x1, self.y1)], 255)
+            self._outside = mask == 0
+
+    @property
+    def bounds(self):
+        """外接矩形 (x1, y1, x2, y2)"""
+        return self.x1, self.y1, self.x2, self.y2
+
+    def crop(self, frame):
+        """裁出检测区域"""
+        region = frame[self.y1:self.y2, self.x1:self.x2]
+        if self._outside is not None:
+            region = region.copy()
+            region[self._outside] = 114
+        return region
+
+    def to_frame(self, x, y):
+        """裁剪图坐标 -> 原图坐标"""
+        return x + self.x1, y + self.y1
@@ -0,0 +1,61 @@
+"""
+运动检测：在缩小的灰度图上做背景差分，车道无变化时跳过 YOLO 推理
+"""
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    """
+    基于滑动平均背景的帧差运动检测
+    - 帧先缩小到 width 像素宽并转灰度、模糊，计算量只有原图的几十分之一
+    - 与背景（accumulateWeighted 滑动平均）的差值超过 threshold 的像素视为变化
+    - ROI 内变化像素占比达到 min_ratio 即认为有运动
+    """
+
+    def __init__(self, roi=None, width=160, threshold=25, min_ratio=0.01, alpha=0.05):
+        """
+        :param roi: 关注区域 (x1, y1, x2, y2)，原图像素坐标；None 表示整幅画面
+        :param width: 缩小后的宽度
+        :param threshold: 灰度差阈值（0-255）
+        :param min_ratio: ROI 内变化像素占比阈值
+        :param alpha: 背景更新速率，越大越快适应光照变化
+        """
+        self.roi = roi
+        self.width = width
+        self.threshold = threshold
+        self.min_ratio = min_ratio
+        self.alpha = alpha
+        self._background = None   # float32 背景
+        self._scale = None
+        self._roi_slice = None
+        self.ratio = 0.0          # 最近一帧的变化像素占比
+
+    def _prepare(self, frame):
+        """缩小、灰度化并模糊"""
+        if self._scale is None:
+            self._scale = self.width / frame.shape[1]
+            if self.roi is not None:
+                x1, y1, x2, y2 = (int(round(v * self._scale)) for v in self.roi)
+                self._roi_slice = (slice(y1, max(y2, y1 + 1)), slice(x1, max(x2, x1 + 1)))
+        small = cv2.resize(frame, None, fx=self._scale, fy=self._scale,
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        if self._roi_slice is not None:
+            small = small[self._roi_slice]
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def update(self, frame):
+        """
+        输入一帧，返回 ROI 内是否有运动；同时更新背景
+        """
+        gray = self._prepare(frame)
+        if self._background is None:
+            self._background = gray.astype(np.float32)
+            return False
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        self.ratio = np.count_nonzero(diff > self.threshold) / diff.size
+        cv2.accumulateWeighted(gray, self._background, self.alpha)
+        return self.ratio >= self.min_ratio
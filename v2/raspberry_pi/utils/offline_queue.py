@@ -0,0 +1,107 @@
+"""
+离线暂存队列：门卫电脑不可达时把车牌图片存入本地 SQLite，恢复后按批次补传
+"""
+import os
+import sqlite3
+import threading
+import time
+
+
+class OfflineQueue:
+    """
+    基于 SQLite 的先进先出磁盘队列，每行一张车牌图片（JPEG 字节）及其采集时间。
+    超过 max_items 时淘汰最旧的记录，超过 max_age 秒的记录直接丢弃。
+    """
+
+    def __init__(self, path, max_items=2000, max_age=86400):
+        """
+        :param path: 队列数据库文件路径
+        :param max_items: 最多保存的图片数
+        :param max_age: 图片最长保存时间（秒）
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.max_items = max_items
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pending (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                captured_at REAL NOT NULL,   -- 采集时间（Unix 时间戳）
+                image BLOB NOT NULL          -- JPEG 编码的车牌图片
+            )
+        ''')
+        self._conn.commit()
+
+        # 统计信息
+        self.enqueued = 0
+        self.drained = 0
+        self.evicted = 0
+
+    def put(self, images, captured_at):
+        """
+        存入同一帧的若干张图片
+        :param images: JPEG 字节（bytes 或 memoryview）列表
+        :param captured_at: 采集时间（Unix 时间戳）
+        """
+        with self._lock:
+            self._conn.executemany(
+                'INSERT INTO pending (captured_at, image) VALUES (?, ?)',
+                [(captured_at, image) for image in images]
+            )
+            self.enqueued += len(images)
+            self._enforce_limits()
+            self._conn.commit()
+
+    def _enforce_limits(self):
+        """删除过期记录和超出数量上限的最旧记录（调用方需持有锁）"""
+        cursor = self._conn.execute(
+            'DELETE FROM pending WHERE captured_at < ?',
+            (time.time() - self.max_age,)
+        )
+        evicted = cursor.rowcount
+        cursor = self._conn.execute(
+            'DELETE FROM pending WHERE id <= ('
+            '  SELECT id FROM pending ORDER BY id DESC LIMIT 1 OFFSET ?'
+            ')',
+            (self.max_items,)
+        )
+        evicted += cursor.rowcount
+        self.evicted += evicted
+
+    def peek(self, limit):
+        """
+        取出最旧的若干条记录（不删除，上传成功后再调用 remove）
+        :return: [(id, captured_at, image_bytes), ...]
+        """
+        with self._lock:
+            self._enforce_limits()
+            self._conn.commit()
+            return self._conn.execute(
+                'SELECT id, captured_at, image FROM pending ORDER BY id LIMIT ?',
+                (limit,)
+            ).fetchall()
+
+    def remove(self, ids, delivered=True):
+        """
+        删除记录
+        :param delivered: True 表示已成功补传（计入 drained），False 表示被丢弃（计入 evicted）
+        """
+        with self._lock:
+            self._conn.executemany('DELETE FROM pending WHERE id = ?', [(i,) for i in ids])
+            self._conn.commit()
+            if delivered:
+                self.drained += len(ids)
+            else:
+                self.evicted += len(ids)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pending').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
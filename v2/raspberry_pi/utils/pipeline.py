@@ -0,0 +1,114 @@
+"""
+流水线工具：采集、检测、上传三个阶段之间的缓冲区和耗时统计
+"""
+import threading
+import time
+from collections import deque
+
+
+class LatestFrame:
+    """
+    最新帧槽：采集线程不断覆盖，检测线程总是取到最新的一帧。
+    检测来不及处理的帧直接被覆盖并计入 dropped，不会堆积延迟。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0          # 已写入的帧序号
+        self._consumed = 0     # 最近一次被取走的帧序号
+        self.dropped = 0
+
+    def put(self, frame):
+        """写入一帧，覆盖尚未被取走的旧帧"""
+        with self._cond:
+            if self._seq > self._consumed:
+                self.dropped += 1
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, after=0, timeout=None):
+        """
+        等待序号大于 after 的新帧
+        返回: (帧序号, 帧)，超时返回 (after, None)
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after, timeout=timeout):
+                return after, None
+            self._consumed = self._seq
+            return self._seq, self._frame
+
+
+class DropOldestQueue:
+    """有界队列：满时丢弃最旧的元素，保证下游处理的总是较新的数据"""
+
+    def __init__(self, maxsize):
+        self._cond = threading.Condition()
+        self._items = deque()
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def put(self, item):
+        """放入元素，队列满时丢弃最旧的一个"""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """取出最旧的元素，超时返回 None"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout=timeout):
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageTimer:
+    """各阶段耗时统计：记录次数和累计耗时，定期输出平均值后清零"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}    # 阶段名 -> [次数, 累计秒数]
+
+    def record(self, stage, seconds):
+        """记录某阶段一次处理的耗时"""
+        with self._lock:
+            entry = self._totals.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def time(self, stage):
+        """上下文管理器：统计 with 块的耗时"""
+        return _Timing(self, stage)
+
+    def summary(self, reset=True):
+        """返回 '阶段=平均耗时ms(次数)' 形式的摘要"""
+        with self._lock:
+            parts = [
+                f"{stage}={total / count * 1000:.1f}ms({count})"
+                for stage, (count, total) in self._totals.items() if count
+            ]
+            if reset:
+                self._totals.clear()
+        return ', '.join(parts)
+
+
+class _Timing:
+    def __init__(self, timer, stage):
+        self._timer = timer
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timer.record(self._stage, time.perf_counter() - self._start)
+        return False
@@ -0,0 +1,39 @@
+import os
+import time
+import tempfile
+
+from offline_queue import OfflineQueue
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        queue = OfflineQueue(os.path.join(directory, 'offline.db'), max_items=3, max_age=60)
+
+        # 先进先出，超过 max_items 时淘汰最旧的
+        now = time.time()
+        queue.put([b'a', b'b'], now)
+        queue.put([memoryview(b'c'), b'd'], now + 1)
+        rows = queue.peek(10)
+        print("队列中:", [(row_id, image) for row_id, _, image in rows])  # [(2, b'b'), (3, b'c'), (4, b'd')]
+        assert [image for _, _, image in rows] == [b'b', b'c', b'd']
+        assert queue.evicted == 1
+
+        # peek 不删除，补传成功后 remove
+        queue.remove([row_id for row_id, _, _ in rows[:2]])
+        assert len(queue) == 1 and queue.drained == 2
+        queue.remove([rows[2][0]], delivered=False)
+        assert len(queue) == 0 and queue.evicted == 2
+
+        # 超过 max_age 的记录直接丢弃
+        queue.put([b'old'], now - 120)
+        queue.put([b'new'], now)
+        rows = queue.peek(10)
+        print("过期后:", [image for _, _, image in rows])  # [b'new']
+        assert [image for _, _, image in rows] == [b'new']
+
+        queue.close()
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
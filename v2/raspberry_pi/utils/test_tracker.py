@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+from tracker import PlateTracker, crop_quality
+
+
+def main():
+    rng = np.random.default_rng(0)
+    sharp = rng.integers(0, 256, (40, 120, 3), dtype=np.uint8)
+    sharper = rng.integers(0, 256, (80, 240, 3), dtype=np.uint8)
+    flat = np.full((40, 120, 3), 128, dtype=np.uint8)
+    print("清晰度评分:", round(crop_quality(flat)), round(crop_quality(sharp)), round(crop_quality(sharper)))
+    assert crop_quality(flat) == 0 < crop_quality(sharp) < crop_quality(sharper)
+
+    # 连续 min_hits 帧后上传一次，画质没有明显提升不再上传
+    tracker = PlateTracker(min_hits=2, improve_ratio=1.5, max_uploads=3)
+    assert tracker.update([(100, 100, 220, 140)], [sharp]) == []
+    uploads = tracker.update([(104, 100, 224, 140)], [sharp])
+    print("第 2 帧上传:", [track_id for track_id, _ in uploads])  # [1]
+    assert len(uploads) == 1 and uploads[0][1] is sharp
+    assert tracker.update([(108, 100, 228, 140)], [sharp]) == []
+    # 画质明显提升时再次上传
+    uploads = tracker.update([(112, 100, 232, 140)], [sharper])
+    assert len(uploads) == 1 and uploads[0][1] is sharper
+
+    # 门卫电脑要求更多画面后，下一张裁剪图即上传；放行后不再上传
+    tracker.request_more(1)
+    uploads = tracker.update([(116, 100, 236, 140)], [sharp])
+    assert len(uploads) == 1 and uploads[0][1] is sharp
+    tracker.mark_done(1)
+    assert tracker.update([(120, 100, 240, 140)], [sharper]) == []
+
+    # 停着不动的车：画质不再提升，门卫电脑回复等待投票或车道冷却时仍要继续上传，且不占用上传次数
+    tracker = PlateTracker(min_hits=1, max_uploads=2)
+    box = (100, 100, 220, 140)
+    assert len(tracker.update([box], [sharp])) == 1
+    for _ in range(4):
+        tracker.request_more(1)
+        assert len(tracker.update([box], [sharp])) == 1
+    # 车道冷却：冷却结束前不上传，结束后再上传同样的画面
+    tracker.request_more(1, delay=0.2)
+    assert tracker.update([box], [sharp]) == []
+    time.sleep(0.25)
+    uploads = tracker.update([box], [sharp])
+    print("冷却结束后上传:", [track_id for track_id, _ in uploads])  # [1]
+    assert len(uploads) == 1 and uploads[0][1] is sharp
+    # 门卫电脑给出结论后才计入上传次数；上传次数用完的轨迹不再等待结论
+    assert tracker.open_tracks == 1
+    assert tracker.update([box], [sharper]) and tracker.update([box], [sharper]) == []
+    assert tracker.open_tracks == 0
+
+    # 第一张裁剪图得分为 0 时也要保留，不能上传 None
+    tracker = PlateTracker(min_hits=1)
+    uploads = tracker.update([(0, 0, 120, 40)], [flat])
+    print("得分为 0 的裁剪图:", [(track_id, crop is flat) for track_id, crop in uploads])  # [(1, True)]
+    assert len(uploads) == 1 and uploads[0][1] is flat
+
+    # 未达到 min_hits 就消失的轨迹结束时补传一次
+    tracker = PlateTracker(min_hits=3, max_missed=2)
+    tracker.update([(0, 0, 120, 40)], [sharp])
+    flushed = []
+    for _ in range(4):
+        flushed += tracker.update([], [])
+    print("轨迹结束补传:", len(flushed), "剩余轨迹:", tracker.active_tracks)  # 1 0
+    assert len(flushed) == 1 and flushed[0][1] is sharp and tracker.active_tracks == 0
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
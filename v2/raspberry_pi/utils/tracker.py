@@ -0,0 +1,203 @@
+"""
+车牌跟踪：把相邻帧中的检测框关联为同一辆车（基于 IoU 的简化 SORT），
+每条轨迹只上传清晰度最高的裁剪图，画质明显提升时才再次上传
+"""
+import math
+import threading
+import time
+
+import cv2
+
+
+def iou(a, b):
+    """两个 (x1, y1, x2, y2) 框的交并比"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+def crop_quality(crop):
+    """
+    裁剪图质量评分：拉普拉斯方差（清晰度）乘以边长尺度（面积的平方根）。
+    模糊或过小的车牌得分低，OCR 也更容易出错。
+    """
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    return sharpness * math.sqrt(gray.shape[0] * gray.shape[1])
+
+
+class Track:
+    """一条车牌轨迹"""
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = box
+        self.velocity = (0.0, 0.0)   # 框中心每帧的位移，用于预测下一帧位置
+        self.hits = 0                # 匹配到检测框的帧数
+        self.missed = 0              # 连续未匹配的帧数
+        self.best_crop = None
+        self.best_score = 0.0
+        self.uploaded_score = 0.0    # 最近一次上传的裁剪图得分，0 表示尚未上传
+        self.uploads = 0
+        self.retry_at = 0.0          # 门卫电脑要求稍后再传时，此时刻（time.monotonic()）之前不上传
+        self.done = False            # 门卫电脑已放行，不再上传
+
+    def predict(self):
+        """按匀速假设预测本帧的框位置"""
+        dx, dy = self.velocity
+        x1, y1, x2, y2 = self.box
+        return (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+
+    def update(self, box, crop, score):
+        """用匹配到的检测框更新轨迹，记录得分最高的裁剪图"""
+        old_cx, old_cy = (self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2
+        new_cx, new_cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        if self.hits:
+            self.velocity = (new_cx - old_cx, new_cy - old_cy)
+        self.box = box
+        self.hits += 1
+        self.missed = 0
+        if self.best_crop is None or score > self.best_score:
+            self.best_score = score
+            self.best_crop = crop
+
+
+class PlateTracker:
+    """
+    多目标车牌跟踪器
+    - 检测框与轨迹预测位置按 IoU 从大到小贪心匹配
+    - 轨迹连续匹配 min_hits 帧后上传其最佳裁剪图；之后只有得分超过上次上传的
+      improve_ratio 倍才再次上传，每条轨迹最多上传 max_uploads 次（门卫电脑回复等待投票或冷却中的不计入）
+    - 轨迹连续 max_missed 帧未匹配即结束；结束时尚未上传过的轨迹补传一次，避免漏车
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=5, min_hits=2,
+                 improve_ratio=1.5, max_uploads=3):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.min_hits = min_hits
+        self.improve_ratio = improve_ratio
+        self.max_uploads = max_uploads
+        self._tracks = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.crops_seen = 0
+        self.crops_uploaded = 0
+
+    def update(self, boxes, crops):
+        """
+        处理一帧的检测结果
+        :param boxes: [(x1, y1, x2, y2), ...]
+        :param crops: 与 boxes 对应的裁剪图
+        :return: 需要上传的 [(track_id, crop), ...]
+        """
+        with self._lock:
+            self.crops_seen += len(crops)
+            predicted = [track.predict() for track in self._tracks]
+            pairs = sorted(
+                ((iou(p, box), t, d) for t, p in enumerate(predicted) for d, box in enumerate(boxes)),
+                reverse=True
+            )
+
+            matched_tracks, matched_dets = set(), set()
+            for overlap, t, d in pairs:
+                if overlap < self.iou_threshold:
+                    break
+                if t in matched_tracks or d in matched_dets:
+                    continue
+                matched_tracks.add(t)
+                matched_dets.add(d)
+                self._tracks[t].update(boxes[d], crops[d], crop_quality(crops[d]))
+
+            for t, track in enumerate(self._tracks):
+                if t not in matched_tracks:
+                    track.missed += 1
+
+            for d, box in enumerate(boxes):
+                if d not in matched_dets:
+                    track = Track(self._next_id, box)
+                    self._next_id += 1
+                    track.update(box, crops[d], crop_quality(crops[d]))
+                    self._tracks.append(track)
+
+            uploads = []
+            alive = []
+            for track in self._tracks:
+                if track.missed > self.max_missed:
+                    # 轨迹结束：从未上传过的补传一次
+                    if not track.uploads and not track.done and track.best_crop is not None:
+                        uploads.append(self._take(track))
+                    continue
+                alive.append(track)
+                if self._should_upload(track):
+                    uploads.append(self._take(track))
+            self._tracks = alive
+            return uploads
+
+    def _should_upload(self, track):
+        """轨迹当前的最佳裁剪图是否需要上传（调用方需持有锁）"""
+        if track.done or track.best_crop is None or track.hits < self.min_hits \
+                or track.uploads >= self.max_uploads:
+            return False
+        if track.retry_at and time.monotonic() < track.retry_at:
+            return False
+        if not track.uploads:
+            return True
+        return track.best_score > track.uploaded_score * self.improve_ratio
+
+    def _take(self, track):
+        """记录一次上传，返回 (track_id, crop)（调用方需持有锁）"""
+        track.uploads += 1
+        track.uploaded_score = track.best_score
+        self.crops_uploaded += 1
+        return track.id, track.best_crop
+
+    def mark_done(self, track_id):
+        """门卫电脑已放行该轨迹的车辆，之后不再上传"""
+        with self._lock:
+            for track in self._tracks:
+                if track.id == track_id:
+                    track.done = True
+                    break
+
+    def request_more(self, track_id, delay=0.0):
+        """
+        门卫电脑还没有给出结论（等待更多画面投票，或车道冷却中）：丢弃已上传的最佳裁剪图，
+        退还这次上传的次数，delay 秒后匹配到的新裁剪图即可上传。
+        停着不动的车清晰度不会再提升，不这样做就再也不会上传。
+        """
+        with self._lock:
+            for track in self._tracks:
+                if track.id == track_id:
+                    track.best_crop = None
+                    track.best_score = 0.0
+                    track.uploaded_score = 0.0
+                    track.uploads = max(track.uploads - 1, 0)
+                    track.retry_at = time.monotonic() + delay if delay > 0 else 0.0
+                    break
+
+    @property
+    def active_tracks(self):
+        with self._lock:
+            return len(self._tracks)
+
+    @property
+    def open_tracks(self):
+        """尚未放行、还能继续上传的轨迹数"""
+        with self._lock:
+            return sum(1 for track in self._tracks
+                       if not track.done and track.uploads < self.max_uploads)
+
+    def stats(self):
+        """返回 '轨迹数 / 检测到的裁剪图数 / 实际上传数 / 节省比例' 摘要"""
+        with self._lock:
+            saved = 1 - self.crops_uploaded / self.crops_seen if self.crops_seen else 0.0
+            return (f"轨迹={len(self._tracks)}(累计{self._next_id - 1}), "
+                    f"裁剪图={self.crops_seen}, 上传={self.crops_uploaded}, 节省={saved:.0%}")
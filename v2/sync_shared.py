@@ -0,0 +1,51 @@
+"""
+同步门卫电脑端与树莓派端共用的源文件。
+门卫电脑端的文件是唯一的源文件，树莓派端的副本由本脚本复制生成（两端分开部署，树莓派端不依赖门卫电脑端的包）。
+用法：
+    python sync_shared.py           把源文件复制到树莓派端
+    python sync_shared.py --check   只检查两端是否一致，不一致时返回非零退出码（提交前或部署前运行）
+"""
+import os
+import sys
+import shutil
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# (源文件, 副本)，路径相对于 v2 目录
+SHARED_FILES = [
+    ('windows_pc/recognition/preprocess.py', 'raspberry_pi/utils/preprocess.py'),
+]
+
+
+def read_bytes(path):
+    """读取文件内容，不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def main():
+    check = '--check' in sys.argv[1:]
+    stale = []
+    for source, copy in SHARED_FILES:
+        source_path = os.path.join(ROOT, source)
+        copy_path = os.path.join(ROOT, copy)
+        if read_bytes(source_path) == read_bytes(copy_path):
+            continue
+        if check:
+            stale.append(copy)
+        else:
+            shutil.copyfile(source_path, copy_path)
+            print(f"已更新 {copy}（来自 {source}）")
+
+    if stale:
+        for copy in stale:
+            print(f"{copy} 与源文件不一致，请运行 python sync_shared.py")
+        sys.exit(1)
+    if check:
+        print(f"{len(SHARED_FILES)} 个共用文件一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,26 @@
 import sys
 import os
+import io
 import time
+
+# 进程启动时刻，用于统计端口绑定和首次识别的耗时
+START_TIME = time.perf_counter()
+
+import csv
+import json
+import zlib
+import queue
+import logging
+import itertools
 import threading
 from functools import wraps
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
+from werkzeug.serving import make_server
 from datetime import datetime
-from collections import deque
+from collections import deque, Counter, OrderedDict
+
+import cv2
+import numpy as np
 
 # 将当前目录加入 sys.path，以便导入同级模块
 sys.path.append(os.path.dirname(__file__))
@@ -13,43 +28,295 @@ sys.path.append(os.path.dirname(__file__))
 # 导入配置文件
 import config
 
-# 导入识别模块和数据库模块（假设从 v1 复制过来，结构保持不变）
-from recognition import EasyOCRPlateRecognizer
+# 导入数据库模块（假设从 v1 复制过来，结构保持不变）
+# 识别模块依赖 torch，导入和加载模型都很慢，放到后台线程中进行
 from database import Database
+from utils.worker_pool import RecognitionPool, PoolBusyError, PoolTimeoutError
+from utils.result_cache import PlateResultCache, dhash
+from utils.cooldown import CooldownManager
+from utils.plate_grammar import PLATE_GRAMMAR
+from utils.fusion import PlateFusion
+from utils.broadcaster import Broadcaster, TooManySubscribers, sse_message
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
 
 # 初始化 Flask 应用
 app = Flask(__name__)
+# 请求体总上限，超出时 Flask 返回 413（不会读取完整请求体）；
+# 按白名单导入设置，识别接口更小的 MAX_UPLOAD_BYTES 由 reject_early 检查
+app.config['MAX_CONTENT_LENGTH'] = max(config.IMPORT_MAX_BYTES, config.MAX_UPLOAD_BYTES)
 
 # 可选：启用跨域支持（如需局域网访问）
 if config.CORS_ENABLED:
     from flask_cors import CORS
     CORS(app)
 
-# 初始化识别器和数据库（全局单例）
-recognizer = EasyOCRPlateRecognizer(
-    gpu=config.RECOGNITION['gpu'],
-    lang_list=config.RECOGNITION['lang_list']
+# 初始化数据库（全局单例）
+db = Database(
+    db_path=config.DB_PATH,
+    fuzzy_distance=config.FUZZY_MAX_DISTANCE if config.FUZZY_MATCH else 0
 )
-db = Database(db_path=config.DB_PATH)
 
-# 冷却控制
-last_pass_time = 0
-cooldown_lock = threading.Lock()
+# 识别工作池：每个工作线程在后台加载并预热自己的识别器，任一完成即就绪
+first_recognition_done = False
+
+def create_recognizer():
+    """在工作线程中加载 EasyOCR 模型，并用合成图片预热一次推理"""
+    t0 = time.perf_counter()
+    from recognition import EasyOCRPlateRecognizer
+    if config.RECOGNITION_TORCH_THREADS:
+        import torch
+        torch.set_num_threads(config.RECOGNITION_TORCH_THREADS)
+    instance = EasyOCRPlateRecognizer(
+        gpu=config.RECOGNITION['gpu'],
+        lang_list=config.RECOGNITION['lang_list'],
+        two_pass=config.RECOGNITION_TWO_PASS,
+        escalate_below=config.RECOGNITION_ESCALATE_CONFIDENCE
+    )
+    t1 = time.perf_counter()
+    instance.warm_up()
+    t2 = time.perf_counter()
+    logger.info(f"识别器就绪（{threading.current_thread().name}）：加载 {t1 - t0:.2f}s，"
+                f"预热 {t2 - t1:.2f}s，距进程启动 {t2 - START_TIME:.2f}s")
+    return instance
+
+pool = RecognitionPool(
+    create_recognizer,
+    workers=config.RECOGNITION_WORKERS,
+    max_queue=config.RECOGNITION_QUEUE_SIZE
+)
+pool.start()
+
+# 识别结果缓存：近似重复的裁剪图（车辆停在道闸前）直接复用上次的识别结果
+result_cache = PlateResultCache(
+    max_size=config.RESULT_CACHE_SIZE,
+    ttl=config.RESULT_CACHE_TTL,
+    max_distance=config.RESULT_CACHE_MAX_DISTANCE
+)
+
+def require_recognizer(view):
+    """
+    识别接口装饰器：模型未就绪时最多等待 MODEL_WAIT_SECONDS 秒，
+    仍未就绪则返回 503 和 Retry-After，让树莓派稍后重试。
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        global first_recognition_done
+        if not pool.ready.wait(timeout=config.MODEL_WAIT_SECONDS):
+            response = jsonify({
+                'plate': None,
+                'allowed': False,
+                'message': '识别模型加载中，请稍后重试',
+                'cooldown': False,
+                'retry_after': config.MODEL_RETRY_AFTER
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = str(config.MODEL_RETRY_AFTER)
+            return response
+
+        response = view(*args, **kwargs)
+        if not first_recognition_done:
+            first_recognition_done = True
+            logger.info(f"首次识别请求完成，距进程启动 {time.perf_counter() - START_TIME:.2f}s")
+        return response
+    return wrapper
+
+@app.errorhandler(413)
+def handle_too_large(e):
+    """上传超过 MAX_UPLOAD_BYTES（识别接口）或 IMPORT_MAX_BYTES（其他请求）"""
+    return jsonify({'error': 'Upload too large'}), 413
+
+@app.errorhandler(PoolBusyError)
+def handle_pool_busy(e):
+    """识别队列已满：返回 429 和当前队列深度，避免请求无限排队"""
+    response = jsonify({
+        'plate': None,
+        'allowed': False,
+        'message': '识别队列已满，请稍后重试',
+        'cooldown': False,
+        'queue_depth': e.queue_depth,
+        'retry_after': 1
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.errorhandler(PoolTimeoutError)
+def handle_pool_timeout(e):
+    """识别超时：返回 503"""
+    response = jsonify({
+        'plate': None,
+        'allowed': False,
+        'message': '识别超时，请稍后重试',
+        'cooldown': False,
+        'queue_depth': pool.queue_depth,
+        'retry_after': 1
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+# 冷却控制：按车道和车牌分别计时，多车道互不阻塞
+cooldowns = CooldownManager(
+    lane_seconds=config.COOLDOWN_SECONDS,
+    plate_seconds=config.PLATE_COOLDOWN_SECONDS
+)
+
+# 多帧投票融合：按车道累积低置信度的识别结果
+fusion = PlateFusion(
+    window=config.FUSION_WINDOW,
+    min_weight=config.FUSION_MIN_WEIGHT,
+    consensus=config.FUSION_CONSENSUS
+)
+if config.FUSION_ENABLED and config.FUSION_WINDOW <= config.RESULT_CACHE_TTL + config.DUPLICATE_WINDOW:
+    logger.warning(f"FUSION_WINDOW（{config.FUSION_WINDOW} 秒）不长于 RESULT_CACHE_TTL + DUPLICATE_WINDOW"
+                   f"（{config.RESULT_CACHE_TTL + config.DUPLICATE_WINDOW} 秒），停着不动的车可能一直等待投票")
 
 # 存储最近识别记录（最多保留20条）
 recent_records = deque(maxlen=20)
+# 识别记录序号：推送和快照可能包含同一条记录，页面据此去重
+record_ids = itertools.count(1)
+
+# 实时推送：每条新识别记录经 /api/stream（Server-Sent Events）推送给打开的监控页面
+broadcaster = Broadcaster(
+    max_subscribers=config.STREAM_MAX_CLIENTS,
+    max_queue=config.STREAM_QUEUE_SIZE
+)
+
+def get_lane():
+    """从请求头 X-Lane-Id 读取车道编号，未提供时视为默认车道"""
+    return request.headers.get('X-Lane-Id', 'default')
+
+def is_replay():
+    """请求头 X-Replay: 1 表示树莓派补传的离线记录（车辆早已离开，只需记录）"""
+    return request.headers.get('X-Replay') == '1'
+
+def lane_cooldown_response(lane, remaining, **extra):
+    """车道冷却中的响应（在读取和解码图片之前返回）"""
+    return jsonify({
+        'plate': None,
+        'allowed': False,
+        'message': '系统冷却中，请稍后',
+        'cooldown': True,
+        'lane': lane,
+        'retry_after': round(remaining, 1),
+        **extra
+    })
+
+# 重复画面过滤：每个车道记住最近几帧的哈希（树莓派通过 X-Frame-Hash 请求头提供）及其识别结果
+duplicate_filters = OrderedDict()   # 车道 -> PlateResultCache，按最近使用排序，最多 MAX_LANES 个
+duplicate_filters_lock = threading.Lock()
+early_rejects = Counter()
+early_rejects_lock = threading.Lock()
 
-def check_cooldown():
-    """检查是否处于冷却期"""
-    global last_pass_time
-    with cooldown_lock:
-        return time.time() - last_pass_time < config.COOLDOWN_SECONDS
+def count_early_reject(reason):
+    """统计提前拒绝的请求数"""
+    with early_rejects_lock:
+        early_rejects[reason] += 1
 
-def set_pass_time():
-    """记录放行时间"""
-    global last_pass_time
-    with cooldown_lock:
-        last_pass_time = time.time()
+def get_frame_hashes():
+    """
+    解析请求头 X-Frame-Hash：逗号分隔的十六进制 dHash，与上传的图片一一对应。
+    未提供或格式错误时返回 None。
+    """
+    header = request.headers.get('X-Frame-Hash')
+    if not header:
+        return None
+    try:
+        return [int(h, 16) for h in header.split(',')]
+    except ValueError:
+        return None
+
+def duplicate_filter(lane):
+    """获取车道对应的重复画面过滤器，车道数超过 MAX_LANES 时淘汰最久未使用的车道"""
+    with duplicate_filters_lock:
+        frames = duplicate_filters.get(lane)
+        if frames is not None:
+            duplicate_filters.move_to_end(lane)
+            return frames
+        frames = PlateResultCache(
+            max_size=32,
+            ttl=config.DUPLICATE_WINDOW,
+            max_distance=config.DUPLICATE_MAX_DISTANCE
+        )
+        duplicate_filters[lane] = frames
+        if len(duplicate_filters) > config.MAX_LANES:
+            duplicate_filters.popitem(last=False)
+        return frames
+
+def remember_frames(lane, hashes, results):
+    """
+    记录本次请求各图片的哈希和识别结果，供后续重复画面直接复用。
+    等待投票的结果也记下 pending，重复画面的响应同样返回 pending，树莓派会继续上传新的画面。
+    """
+    if not hashes or len(hashes) != len(results):
+        return
+    frames = duplicate_filter(lane)
+    for key, result in zip(hashes, results):
+        frames.put(key, {
+            'plate': result['plate'],
+            'confidence': result['confidence'],
+            'pending': result['pending']
+        })
+
+def reject_early(batch=False):
+    """
+    识别接口的前置检查，只看请求头，不读取请求体：
+    1. Content-Length 超过 MAX_UPLOAD_BYTES 返回 413
+    2. 配置了 LANE_IDS 时，未登记的车道返回 400
+    3. 车道冷却中返回冷却响应
+    4. X-Frame-Hash 中的每张图都与本车道最近的画面近似重复时，沿用上次结果
+    补传的离线记录只做第 1、2 项检查，不受冷却和重复画面影响。
+    :param batch: 是否为批量接口（响应中的结果为列表）
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            length = request.content_length
+            if length is not None and length > config.MAX_UPLOAD_BYTES:
+                count_early_reject('too_large')
+                return jsonify({'error': 'Upload too large'}), 413
+            lane = get_lane()
+            if config.LANE_IDS and lane not in config.LANE_IDS:
+                count_early_reject('unknown_lane')
+                return jsonify({'error': f'Unknown lane: {lane}'}), 400
+            if is_replay():
+                return view(*args, **kwargs)
+
+            remaining = cooldowns.lane_remaining(lane)
+            if remaining > 0:
+                count_early_reject('cooldown')
+                extra = {'results': []} if batch else {}
+                return lane_cooldown_response(lane, remaining, **extra)
+
+            hashes = get_frame_hashes()
+            if hashes:
+                frames = duplicate_filter(lane)
+                previous = [frames.get(key) for key in hashes]
+                if all(p is not None for p in previous):
+                    count_early_reject('duplicate')
+                    results = [dict(p, allowed=False, cooldown=False) for p in previous]
+                    pending = any(r['pending'] for r in results)
+                    body = {
+                        'allowed': False,
+                        'message': '识别中，等待更多画面' if pending else '画面重复，沿用上次结果',
+                        'cooldown': False,
+                        'pending': pending,
+                        'duplicate': True
+                    }
+                    if batch:
+                        body['results'] = results
+                    else:
+                        body.update(plate=results[0]['plate'], confidence=results[0]['confidence'])
+                    return jsonify(body)
+
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
 
 # ---------- 路由 ----------
 @app.route('/')
@@ -62,20 +329,167 @@ def manage():
     """车牌管理页面"""
     return render_template('manage.html')
 
+def decode_upload(file):
+    """将上传的图片文件解码为 OpenCV 图像（BGR），失败返回 None"""
+    img_bytes = file.read()
+    np_arr = np.frombuffer(img_bytes, np.uint8)
+    return cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+
+def recognize_images(images):
+    """
+    识别一组裁剪图：先查结果缓存，未命中的图片一次性交给识别工作池。
+    树莓派上传的是 YOLO 裁出的车牌，开启 RECOGNITION_CROPPED_MODE 时跳过文字检测。
+    :return: (results, fresh)：results 与 images 顺序一致，每个元素同 recognizer.recognize() 的返回值；
+             fresh[i] 为 True 表示第 i 张是本次新识别的，False 表示来自结果缓存
+    """
+    cropped = config.RECOGNITION_CROPPED_MODE
+    keys = [dhash(img) for img in images]
+    results = [result_cache.get(key) for key in keys]
+    missing = [i for i, plates in enumerate(results) if plates is None]
+    fresh_flags = [plates is None for plates in results]
+    if len(missing) == 1:
+        fresh = [pool.run('recognize', images[missing[0]], cropped,
+                          timeout=config.RECOGNITION_TIMEOUT)]
+    elif missing:
+        fresh = pool.run('recognize_batch', [images[i] for i in missing], cropped,
+                         timeout=config.RECOGNITION_TIMEOUT)
+    else:
+        fresh = []
+    for i, plates in zip(missing, fresh):
+        results[i] = plates
+        result_cache.put(keys[i], plates)
+    return results, fresh_flags
+
+def fuzzy_match(candidates):
+    """
+    精确比对都未命中时的模糊匹配：依次为每个候选查找编辑距离不超过 FUZZY_MAX_DISTANCE 的白名单车牌。
+    只有距离最近的白名单车牌唯一，且 候选得分 × FUZZY_DISTANCE_PENALTY^距离 不低于 FUZZY_MIN_SCORE 时才接受。
+    已符合车牌版式且得分不低于 PLATE_SWAP_BELOW 的候选视为识别可信，不做模糊匹配（与 PLATE_GRAMMAR.rank 一致）。
+    :param candidates: [(车牌号, 得分), ...]，按得分降序
+    :return: (白名单车牌号, 综合得分, 距离)，没有可接受的匹配时返回 None
+    """
+    for candidate, score in candidates:
+        if score >= config.PLATE_SWAP_BELOW and PLATE_GRAMMAR.is_valid(candidate):
+            continue
+        similar = db.find_similar(candidate, config.FUZZY_MAX_DISTANCE, config.PLATE_MATCH_ANY_PROVINCE)
+        if not similar:
+            continue
+        plate, distance = similar[0]
+        if len(similar) > 1 and similar[1][1] == distance:
+            continue  # 多个白名单车牌同样接近，无法判断是哪一辆
+        combined = score * config.FUZZY_DISTANCE_PENALTY ** distance
+        if combined >= config.FUZZY_MIN_SCORE:
+            return plate, combined, distance
+    return None
+
+def match_whitelist(candidates, raw_plate):
+    """
+    把候选车牌与白名单比对：先一次性精确比对全部候选，都未命中且开启 FUZZY_MATCH 时再模糊匹配。
+    :param candidates: [(车牌号, 得分), ...]，按得分降序
+    :param raw_plate: 识别器的原始结果（用于日志）
+    :return: (plate, confidence, allowed, fuzzy)；命中时 plate 为白名单中的车牌号，fuzzy 表示是否为模糊匹配
+    """
+    matched = db.check_any([p for p, _ in candidates], any_province=config.PLATE_MATCH_ANY_PROVINCE)
+    if matched is not None:
+        index, plate = matched
+        if plate != raw_plate:
+            logger.info(f"识别结果 {raw_plate} 匹配白名单车牌 {plate}（候选第 {index + 1} 位）")
+        return plate, candidates[index][1], True, False
+    fuzzy = fuzzy_match(candidates) if config.FUZZY_MATCH else None
+    if fuzzy is not None:
+        plate, confidence, distance = fuzzy
+        logger.info(f"识别结果 {raw_plate} 模糊匹配白名单车牌 {plate}（编辑距离 {distance}，"
+                    f"综合得分 {confidence:.2f}）")
+        return plate, confidence, True, True
+    plate, confidence = candidates[0]
+    return plate, confidence, False, False
+
+def judge(plates, lane, captured_at=None, vote=True):
+    """
+    根据识别结果判断是否放行，并记录到最近识别记录；放行时车道和车牌进入冷却。
+    开启 PLATE_CORRECTION 时，先按车牌版式纠正易混字符（O/0、I/1、B/8 等；最佳结果已符合版式且置信度不低于
+    PLATE_SWAP_BELOW 时不纠正），再把得分最高的 PLATE_CANDIDATES 个候选（得分不低于 PLATE_MIN_SCORE）与白名单比对（见 match_whitelist）。
+    开启 FUSION_ENABLED 时，只有得分不低于 FUSION_EARLY_CONFIDENCE 且命中白名单的单帧结果立即放行，
+    其余结果进入本车道的多帧投票，达成共识后再用融合结果判定，之前返回 pending。
+    :param plates: recognizer.recognize() 的返回值
+    :param lane: 车道编号
+    :param captured_at: 补传的离线记录的采集时间（Unix 时间戳）；
+                        给出时按该时间记录，不检查也不改变冷却状态，也不参与投票
+    :param vote: 是否参与多帧投票；结果缓存命中的画面与之前某次识别是同一份证据，不重复投票，直接返回 pending
+    :return: (plate, confidence, allowed, cooling, pending)，未识别到车牌时 plate 为 None；
+             cooling 为 True 表示该车牌刚刚放行过，本次不重复放行也不记录；
+             pending 为 True 表示正在等待更多画面投票，本次不记录
+    """
+    if not plates:
+        return None, None, False, False, False
+
+    raw_plate, confidence = plates[0]  # 识别器的最佳结果
+    candidates = []
+    if config.PLATE_CORRECTION:
+        ranked = PLATE_GRAMMAR.rank(plates, config.PLATE_CANDIDATES, config.PLATE_SWAP_BELOW)
+        candidates = [(p, score) for p, score in ranked if score >= config.PLATE_MIN_SCORE]
+    if not candidates:
+        # 不符合任何车牌版式（或未开启纠正），按原样比对
+        candidates = [(raw_plate, confidence)]
+    plate, confidence, allowed, fuzzy = match_whitelist(candidates, raw_plate)
+
+    replay = captured_at is not None
+    if not replay and cooldowns.plate_remaining(plate) > 0:
+        return plate, confidence, False, True, False
+
+    votes = None
+    if config.FUSION_ENABLED and not replay:
+        best, score = candidates[0]
+        if allowed and confidence >= config.FUSION_EARLY_CONFIDENCE:
+            # 单帧高置信度命中白名单，提前放行
+            fusion.discard(lane, best)
+        else:
+            fused = fusion.add(lane, best, score) if vote else None
+            if fused is None:
+                return plate, confidence, False, False, True
+            fused_plate, agreement, votes = fused
+            plate, confidence, allowed, fuzzy = match_whitelist([(fused_plate, agreement)], fused_plate)
+            logger.info(f"车道 {lane} 融合 {votes} 次识别结果为 {fused_plate}（共识 {agreement:.0%}），"
+                        f"{'允许' if allowed else '禁止'}通行")
+            if allowed and cooldowns.plate_remaining(plate) > 0:
+                return plate, confidence, False, True, False
+
+    # 记录本次识别结果
+    record = {
+        'id': next(record_ids),
+        'plate': plate,
+        'confidence': round(confidence, 2),
+        'allowed': allowed,
+        'time': datetime.fromtimestamp(captured_at or time.time()).strftime('%Y-%m-%d %H:%M:%S')
+    }
+    if fuzzy:
+        record['fuzzy'] = True
+    if votes is not None:
+        record['votes'] = votes
+    if replay:
+        record['replay'] = True
+        logger.info(f"离线补传记录：车道 {lane} 车牌 {plate} {'允许' if allowed else '禁止'}通行，"
+                    f"采集于 {record['time']}")
+    recent_records.appendleft(record)
+    broadcaster.publish('record', record)
+
+    # 如果允许通行，车道和车牌进入冷却
+    if allowed and not replay:
+        cooldowns.record_pass(lane, plate)
+    return plate, confidence, allowed, False, False
+
 @app.route('/api/recognize', methods=['POST'])
+@reject_early()
+@require_recognizer
 def recognize():
     """
     树莓派调用此接口上传图片。
-    请求格式：multipart/form-data，字段名为 'image'
-    返回 JSON：{"plate": str, "allowed": bool, "message": str, "cooldown": bool}
+    请求格式：multipart/form-data，字段名为 'image'；
+    请求头 X-Lane-Id 为车道编号、X-Frame-Hash 为图片的 dHash（均可选）
+    返回 JSON：{"plate": str, "allowed": bool, "message": str, "cooldown": bool, "pending": bool（仅等待投票时）}
+    车道冷却、重复画面等情况已由 reject_early 在读取图片前处理。
     """
-    if check_cooldown():
-        return jsonify({
-            'plate': None,
-            'allowed': False,
-            'message': '系统冷却中，请稍后',
-            'cooldown': True
-        })
+    lane = get_lane()
 
     # 获取上传的图片
     if 'image' not in request.files:
@@ -85,47 +499,171 @@ def recognize():
         return jsonify({'error': 'Empty filename'}), 400
 
     # 读取图片（OpenCV 格式）
-    import cv2
-    import numpy as np
-    img_bytes = file.read()
-    np_arr = np.frombuffer(img_bytes, np.uint8)
-    img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    img = decode_upload(file)
     if img is None:
         return jsonify({'error': 'Invalid image'}), 400
 
     # 调用识别模块
-    plates = recognizer.recognize(img)
-    if not plates:
+    results, fresh = recognize_images([img])
+    plate, confidence, allowed, cooling, pending = judge(results[0], lane, vote=fresh[0])
+    remember_frames(lane, get_frame_hashes(), [{
+        'plate': plate,
+        'confidence': round(confidence, 2) if confidence is not None else None,
+        'pending': pending
+    }])
+    if plate is None:
         return jsonify({
             'plate': None,
             'allowed': False,
             'message': '未识别到车牌',
             'cooldown': False
         })
+    if cooling:
+        return jsonify({
+            'plate': plate,
+            'confidence': round(confidence, 2),
+            'allowed': False,
+            'message': '该车辆刚刚放行',
+            'cooldown': True
+        })
+    if pending:
+        return jsonify({
+            'plate': plate,
+            'confidence': round(confidence, 2),
+            'allowed': False,
+            'message': '识别中，等待更多画面',
+            'cooldown': False,
+            'pending': True
+        })
 
-    plate, confidence = plates[0]  # 取最佳结果
-    allowed = db.check_vehicle(plate)
+    # 可选：允许通行时在此处添加向树莓派发送指令的逻辑，或由树莓派自己决定
+    # 例如：通过串口或网络通知闸机抬杆，但这里我们只返回结果
 
-    # 记录本次识别结果
-    recent_records.appendleft({
+    return jsonify({
         'plate': plate,
         'confidence': round(confidence, 2),
         'allowed': allowed,
-        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        'message': '允许通行' if allowed else '禁止通行',
+        'cooldown': False
     })
 
-    # 如果允许通行，记录放行时间（进入冷却）
+@app.route('/api/recognize_batch', methods=['POST'])
+@reject_early(batch=True)
+@require_recognizer
+def recognize_batch():
+    """
+    树莓派一次上传同一帧中检测到的所有车牌裁剪图，服务端批量识别。
+    请求格式：multipart/form-data，字段名为 'images'（可重复多次）；
+    请求头 X-Lane-Id 为车道编号、X-Frame-Hash 为逗号分隔的各图片 dHash（均可选）
+    补传离线记录时带请求头 X-Replay: 1，并用表单字段 'captured_at'（与图片一一对应）给出采集时间
+    返回 JSON：{"results": [{"plate": str, "confidence": float, "allowed": bool, "cooldown": bool,
+                            "pending": bool}, ...],
+               "allowed": bool, "message": str, "cooldown": bool, "pending": bool}
+    results 与上传顺序一一对应；任意一张允许通行则整体 allowed 为 true。
+    """
+    lane = get_lane()
+
+    files = request.files.getlist('images')
+    if not files:
+        return jsonify({'error': 'No image provided'}), 400
+
+    captured = [None] * len(files)
+    if is_replay():
+        try:
+            captured = [float(t) for t in request.form.getlist('captured_at')]
+        except ValueError:
+            return jsonify({'error': 'Invalid captured_at'}), 400
+        if len(captured) != len(files):
+            return jsonify({'error': 'captured_at must match images'}), 400
+
+    images = []
+    for i, file in enumerate(files):
+        img = decode_upload(file)
+        if img is None:
+            return jsonify({'error': f'Invalid image at index {i}'}), 400
+        images.append(img)
+
+    # 一次批量识别（缓存未命中的部分），减少逐张调用的开销
+    results = []
+    recognized, fresh = recognize_images(images)
+    for plates, captured_at, vote in zip(recognized, captured, fresh):
+        plate, confidence, allowed, cooling, pending = judge(plates, lane, captured_at, vote)
+        results.append({
+            'plate': plate,
+            'confidence': round(confidence, 2) if confidence is not None else None,
+            'allowed': allowed,
+            'cooldown': cooling,
+            'pending': pending
+        })
+
+    remember_frames(lane, get_frame_hashes(), results)
+
+    allowed = any(r['allowed'] for r in results)
     if allowed:
-        set_pass_time()
-        # 可选：在此处添加向树莓派发送指令的逻辑，或由树莓派自己决定
-        # 例如：通过串口或网络通知闸机抬杆，但这里我们只返回结果
+        message = '允许通行'
+    elif any(r['cooldown'] for r in results):
+        message = '该车辆刚刚放行'
+    elif any(r['pending'] for r in results):
+        message = '识别中，等待更多画面'
+    elif any(r['plate'] for r in results):
+        message = '禁止通行'
+    else:
+        message = '未识别到车牌'
 
     return jsonify({
-        'plate': plate,
-        'confidence': round(confidence, 2),
+        'results': results,
         'allowed': allowed,
-        'message': '允许通行' if allowed else '禁止通行',
-        'cooldown': False
+        'message': message,
+        'cooldown': not allowed and any(r['cooldown'] for r in results),
+        'pending': not allowed and any(r['pending'] for r in results)
+    })
+
+# ---------- 健康检查 ----------
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """存活检查：进程能响应即返回 200"""
+    return jsonify({'status': 'ok', 'uptime': round(time.perf_counter() - START_TIME, 1)})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """就绪检查：识别模型加载并预热完成后返回 200，否则返回 503"""
+    if pool.ready.is_set():
+        return jsonify({'status': 'ready'})
+    body = {'status': 'failed' if pool.error else 'loading'}
+    if pool.error:
+        body['error'] = pool.error
+    response = jsonify(body)
+    response.status_code = 503
+    response.headers['Retry-After'] = str(config.MODEL_RETRY_AFTER)
+    return response
+
+def decoder_stats():
+    """汇总各工作线程识别器的两级解码统计"""
+    decoded = escalated = 0
+    for recognizer in pool.instances:
+        stats = recognizer.decode_stats()
+        decoded += stats['decoded']
+        escalated += stats['escalated']
+    return {
+        'two_pass': config.RECOGNITION_TWO_PASS,
+        'decoded': decoded,
+        'escalated': escalated,
+        'escalation_rate': round(escalated / decoded, 3) if decoded else 0.0
+    }
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """运行指标：识别队列深度、工作线程利用率、结果缓存命中率等"""
+    with early_rejects_lock:
+        rejects = dict(early_rejects)
+    return jsonify({
+        'recognition': pool.metrics(),
+        'decoder': decoder_stats(),
+        'cache': result_cache.stats(),
+        'cooldown': cooldowns.stats(),
+        'fusion': fusion.stats(),
+        'stream': broadcaster.stats(),
+        'early_rejects': rejects
     })
 
 # ---------- 获取最近记录 API ----------
@@ -141,14 +679,76 @@ def latest():
 def recent():
     """返回最近识别记录，可选参数 limit 控制数量"""
     limit = request.args.get('limit', default=10, type=int)
-    return jsonify(list(recent_records)[:limit])
+    return jsonify(list(itertools.islice(recent_records, max(limit, 0))))
+
+@app.route('/api/stream', methods=['GET'])
+def stream():
+    """
+    识别记录实时推送（Server-Sent Events）。
+    连接建立时先发送 snapshot 事件（最近记录列表），之后每条新记录发送一个 record 事件；
+    空闲时每隔 STREAM_KEEPALIVE 秒发送注释行保活，同时发现已断开的连接。
+    连接数达到 STREAM_MAX_CLIENTS 时返回 503，页面退回轮询。
+    """
+    try:
+        subscriber = broadcaster.subscribe()
+    except TooManySubscribers:
+        response = jsonify({'error': 'Too many stream clients'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(config.STREAM_KEEPALIVE)
+        return response
+
+    def events():
+        # 先订阅再取快照，快照之后的新记录不会漏掉（重复的由页面按 id 去重）
+        yield sse_message('snapshot', list(recent_records))
+        while True:
+            try:
+                yield subscriber.get(timeout=config.STREAM_KEEPALIVE)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+
+    response = Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # 客户端断开后服务器关闭响应时取消订阅（包括生成器尚未开始执行的情况）
+    response.call_on_close(lambda: broadcaster.unsubscribe(subscriber))
+    return response
 
 # ---------- 数据库管理 API ----------
 @app.route('/api/vehicles', methods=['GET'])
 def list_vehicles():
-    """列出所有白名单车牌"""
-    vehicles = db.list_all()
-    return jsonify([{'plate': p, 'note': n} for p, n in vehicles])
+    """
+    列出白名单车牌。
+    不带参数时返回全部车牌的列表（兼容旧接口）；
+    带 limit / after / q 任一参数时按车牌号分页：
+      after: 上一页最后一个车牌号；limit: 每页条数（1-500，默认 50）
+      q: 搜索关键字；match: prefix（默认，前缀）或 contains（子串）
+    分页响应带 ETag，未变化时返回 304。
+    """
+    args = request.args
+    if not any(key in args for key in ('limit', 'after', 'q')):
+        vehicles = db.list_all()
+        return jsonify([{'plate': p, 'note': n} for p, n in vehicles])
+
+    limit = max(1, min(args.get('limit', default=50, type=int), 500))
+    after = args.get('after') or None
+    query = args.get('q', '').strip() or None
+    mode = 'contains' if args.get('match') == 'contains' else 'prefix'
+
+    # 白名单版本号 + 查询参数决定页面内容，先比较 ETag，命中则不查询数据库
+    etag = f'{db.version:x}-{zlib.crc32(request.query_string):08x}'
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        rows, total = db.list_page(after=after, limit=limit, query=query, mode=mode)
+        response = jsonify({
+            'items': [{'plate': p, 'note': n} for p, n in rows],
+            'total': total,
+            'next_after': rows[-1][0] if len(rows) == limit else None
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/vehicles', methods=['POST'])
 def add_vehicle():
@@ -164,6 +764,140 @@ def add_vehicle():
     else:
         return jsonify({'error': '车牌已存在'}), 409
 
+@app.route('/api/vehicles', methods=['DELETE'])
+def delete_vehicles():
+    """批量删除车牌，请求 JSON 格式：{"plates": ["xxx", "yyy"]}"""
+    data = request.get_json()
+    if not data or not isinstance(data.get('plates'), list):
+        return jsonify({'error': 'Missing plates'}), 400
+    removed = db.remove_many(str(p).strip() for p in data['plates'])
+    return jsonify({'message': '删除成功', 'removed': removed})
+
+def _import_format(file):
+    """根据 format 参数、文件名或 Content-Type 判断导入格式：csv / json / jsonl"""
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt.lower()
+    name = (file.filename if file is not None else '') or ''
+    ext = os.path.splitext(name)[1].lower().lstrip('.')
+    if ext in ('csv', 'json', 'jsonl'):
+        return ext
+    content_type = request.mimetype or ''
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'jsonl'
+    if 'json' in content_type:
+        return 'json'
+    return 'csv'
+
+def _iter_csv(stream):
+    """逐行解析 CSV（plate,note），跳过表头和空行"""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for row in reader:
+        if not row or not row[0].strip():
+            continue
+        plate = row[0].strip()
+        if plate.lower() == 'plate' or plate == '车牌号':
+            continue
+        note = row[1].strip() if len(row) > 1 else ''
+        yield plate, note
+
+def _iter_jsonl(stream):
+    """逐行解析 JSON Lines，每行一个 {"plate": "xxx", "note": "xxx"}"""
+    for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        plate = str(item.get('plate', '')).strip()
+        if plate:
+            yield plate, str(item.get('note') or '').strip()
+
+def _iter_json(stream):
+    """解析 JSON 数组 [{"plate": "xxx", "note": "xxx"}, ...]（需整体载入，大批量建议用 jsonl）"""
+    for item in json.load(io.TextIOWrapper(stream, encoding='utf-8-sig')):
+        plate = str(item.get('plate', '')).strip()
+        if plate:
+            yield plate, str(item.get('note') or '').strip()
+
+@app.route('/api/vehicles/import', methods=['POST'])
+def import_vehicles():
+    """
+    批量导入白名单，整批在一个事务中写入，已存在的车牌被跳过。
+    请求体：原始 CSV / JSON / JSON Lines 数据，或 multipart/form-data 的 'file' 字段
+    可选参数 format=csv|json|jsonl，缺省时根据文件名或 Content-Type 判断
+    """
+    file = request.files.get('file')
+    stream = file.stream if file is not None else request.stream
+    fmt = _import_format(file)
+    parsers = {'csv': _iter_csv, 'json': _iter_json, 'jsonl': _iter_jsonl}
+    if fmt not in parsers:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+
+    total = 0
+
+    def rows():
+        nonlocal total
+        for row in parsers[fmt](stream):
+            total += 1
+            yield row
+
+    try:
+        added = db.add_many(rows())
+    except (ValueError, UnicodeDecodeError, AttributeError, TypeError) as e:
+        return jsonify({'error': f'Invalid {fmt} data: {e}'}), 400
+    return jsonify({'message': '导入完成', 'added': added, 'skipped': total - added})
+
+class _Echo:
+    """csv.writer 的伪文件对象：write 直接返回写入的字符串"""
+    def write(self, value):
+        return value
+
+def _chunked(pieces, size=500):
+    """将逐行生成的字符串合并成块输出，减少流式响应的分块次数"""
+    buffer = []
+    for piece in pieces:
+        buffer.append(piece)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer.clear()
+    if buffer:
+        yield ''.join(buffer)
+
+@app.route('/api/vehicles/export', methods=['GET'])
+def export_vehicles():
+    """
+    流式导出白名单，不在内存中构建完整列表。
+    可选参数 format=csv（默认）|json|jsonl
+    """
+    fmt = request.args.get('format', 'csv').lower()
+
+    if fmt == 'csv':
+        def lines():
+            writer = csv.writer(_Echo())
+            yield writer.writerow(['plate', 'note'])
+            for row in db.iter_all():
+                yield writer.writerow(row)
+        mimetype = 'text/csv'
+    elif fmt == 'json':
+        def lines():
+            yield '['
+            for i, (plate, note) in enumerate(db.iter_all()):
+                prefix = ',' if i else ''
+                yield prefix + json.dumps({'plate': plate, 'note': note}, ensure_ascii=False)
+            yield ']'
+        mimetype = 'application/json'
+    elif fmt == 'jsonl':
+        def lines():
+            for plate, note in db.iter_all():
+                yield json.dumps({'plate': plate, 'note': note}, ensure_ascii=False) + '\n'
+        mimetype = 'application/x-ndjson'
+    else:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+
+    return Response(_chunked(lines()), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=vehicles.{fmt}'
+    })
+
 @app.route('/api/vehicles/<plate>', methods=['DELETE'])
 def delete_vehicle(plate):
     """删除车牌"""
@@ -182,11 +916,25 @@ def send_static(path):
 if __name__ == '__main__':
     # 确保数据库初始化（Database 类已自动创建表）
     print(f"数据库路径: {config.DB_PATH}")
-    print(f"冷却时间: {config.COOLDOWN_SECONDS} 秒")
+    print(f"冷却时间: 车道 {config.COOLDOWN_SECONDS} 秒，车牌 {config.PLATE_COOLDOWN_SECONDS} 秒")
     print(f"启动 Flask 服务: http://{config.FLASK_HOST}:{config.FLASK_PORT}")
-    app.run(
-        host=config.FLASK_HOST,
-        port=config.FLASK_PORT,
-        debug=config.FLASK_DEBUG,
-        threaded=True
-    )
\ No newline at end of file
+    # 先绑定端口再开始服务，便于记录启动耗时；模型在后台线程中继续加载
+    app.debug = config.FLASK_DEBUG
+    try:
+        # waitress 支持 HTTP/1.1 长连接，树莓派的会话可以复用同一个 TCP 连接
+        from waitress.server import create_server
+    except ImportError:
+        create_server = None
+    if create_server is not None:
+        server = create_server(app, host=config.FLASK_HOST, port=config.FLASK_PORT,
+                               threads=config.SERVER_THREADS,
+                               channel_timeout=config.SERVER_KEEPALIVE_TIMEOUT)
+        logger.info(f"端口已绑定（waitress，{config.SERVER_THREADS} 个线程），"
+                    f"距进程启动 {time.perf_counter() - START_TIME:.2f}s")
+        server.run()
+    else:
+        # Werkzeug 自带服务器每个响应后都关闭连接，树莓派每次上传都要重新建立 TCP 连接
+        logger.warning("未安装 waitress，使用 Werkzeug 服务器（不支持长连接）")
+        server = make_server(config.FLASK_HOST, config.FLASK_PORT, app, threaded=True)
+        logger.info(f"端口已绑定，距进程启动 {time.perf_counter() - START_TIME:.2f}s")
+        server.serve_forever()
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+识别接口延迟基准：比较提前拒绝路径（车道冷却、重复画面）与完整识别路径的 p50 / p99。
+使用 Flask 测试客户端直接调用，不经过网络；会加载真实的识别模型。
+用法：python bench_api.py [车牌图片路径] [请求次数]
+"""
+import io
+import sys
+import time
+import itertools
+
+import cv2
+import numpy as np
+
+import app as server
+from utils.result_cache import dhash
+
+
+def percentile(samples, p):
+    """返回样本的第 p 百分位（样本已排序）"""
+    index = min(len(samples) - 1, int(len(samples) * p / 100))
+    return samples[index]
+
+
+def measure(name, send, n):
+    """调用 send() n 次，打印 p50 / p99 延迟（毫秒）"""
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        send()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    print(f"{name:<12} p50={percentile(samples, 50):8.2f}ms  p99={percentile(samples, 99):8.2f}ms")
+
+
+def main():
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    if len(sys.argv) > 1:
+        image = cv2.imread(sys.argv[1])
+    else:
+        image = np.full((60, 200, 3), 255, dtype=np.uint8)
+        cv2.putText(image, 'A12345', (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (0, 0, 0), 3)
+    jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    frame_hash = format(dhash(image), 'x')
+
+    print("等待识别模型就绪...")
+    server.pool.ready.wait()
+    client = server.app.test_client()
+
+    def post(lane, with_hash=True):
+        headers = {'X-Lane-Id': lane}
+        if with_hash:
+            headers['X-Frame-Hash'] = frame_hash
+        return client.post('/api/recognize', headers=headers,
+                           data={'image': (io.BytesIO(jpeg), 'plate.jpg')})
+
+    # 完整路径：关闭结果缓存，不带哈希，每次换一个车道，保证每次都解码并识别
+    server.result_cache.max_distance = -1
+    lanes = itertools.count()
+    measure("完整识别", lambda: post(f'bench-full-{next(lanes)}', with_hash=False), n)
+
+    # 车道冷却：只看请求头即返回
+    server.cooldowns.record_pass('bench-cooldown', 'BENCH')
+    measure("车道冷却", lambda: post('bench-cooldown'), n)
+
+    # 重复画面：先完整识别一次记录哈希，之后相同画面直接沿用结果
+    post('bench-duplicate')
+    measure("重复画面", lambda: post('bench-duplicate'), n)
+
+
+if __name__ == '__main__':
+    main()
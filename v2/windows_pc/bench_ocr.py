@@ -0,0 +1,94 @@
+"""
+识别路径基准：比较完整流程（CRAFT 文字检测 + 识别）与裁剪图模式（跳过检测）的耗时和准确率，
+以及贪心解码、beamsearch 和两级解码的差别。
+用法：python bench_ocr.py 裁剪图目录 [重复次数]
+裁剪图文件名以车牌号开头，下划线后为任意后缀，例如 京A12345_001.jpg；
+比较时只看字母和数字（识别器会去掉汉字）。
+"""
+import os
+import re
+import sys
+import glob
+import time
+
+import cv2
+
+from recognition import EasyOCRPlateRecognizer
+
+
+def normalize(plate):
+    """只保留大写字母和数字"""
+    return re.sub(r'[^A-Z0-9]', '', (plate or '').upper())
+
+
+def load_crops(directory):
+    """读取裁剪图及其标注（文件名中第一个下划线之前的部分）"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png'))):
+        image = cv2.imread(path)
+        if image is not None:
+            label = os.path.splitext(os.path.basename(path))[0].split('_')[0]
+            samples.append((image, normalize(label)))
+    return samples
+
+
+def percentile(samples, p):
+    """返回样本的第 p 百分位（样本已排序）"""
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def measure(name, recognize, samples, repeat):
+    """逐张识别，打印 平均 / p50 / p99 耗时和准确率"""
+    times = []
+    correct = 0
+    for _ in range(repeat):
+        for image, label in samples:
+            start = time.perf_counter()
+            plates = recognize(image)
+            times.append((time.perf_counter() - start) * 1000)
+            correct += bool(plates) and normalize(plates[0][0]) == label
+    times.sort()
+    print(f"{name:<12} 平均={sum(times) / len(times):8.1f}ms  p50={percentile(times, 50):8.1f}ms  "
+          f"p99={percentile(times, 99):8.1f}ms  准确率={correct / len(times):6.1%}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    samples = load_crops(sys.argv[1])
+    if not samples:
+        print("目录中没有图片")
+        return
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    recognizer = EasyOCRPlateRecognizer(gpu=False)
+    recognizer.warm_up()
+    print(f"样本数: {len(samples)} x {repeat}")
+
+    measure("完整流程", lambda img: recognizer.recognize(img), samples, repeat)
+    measure("裁剪图模式", lambda img: recognizer.recognize(img, cropped=True), samples, repeat)
+    # 不回退到完整流程，单看跳过检测后的识别效果
+    measure("仅识别", lambda img: recognizer.recognize_cropped([img])[0], samples, repeat)
+
+    # 解码器对比（裁剪图模式，不回退）
+    measure("贪心解码", lambda img: recognizer.recognize_cropped([img], decoder='greedy')[0], samples, repeat)
+    measure("beamsearch", lambda img: recognizer.recognize_cropped([img], decoder='beamsearch')[0], samples, repeat)
+    before = recognizer.decode_stats()
+    measure("两级解码", lambda img: recognizer.recognize_cropped([img])[0], samples, repeat)
+    after = recognizer.decode_stats()
+    decoded = after['decoded'] - before['decoded']
+    print(f"两级解码升级比例: {(after['escalated'] - before['escalated']) / decoded:.1%}")
+
+    # 整帧批量：所有样本拼成一次调用
+    images = [img for img, _ in samples]
+    start = time.perf_counter()
+    results = recognizer.recognize_batch(images, cropped=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    correct = sum(bool(p) and normalize(p[0][0]) == label for p, (_, label) in zip(results, samples))
+    print(f"{'批量裁剪图':<12} 总计={elapsed:8.1f}ms  每张={elapsed / len(samples):8.1f}ms  "
+          f"准确率={correct / len(samples):6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+预处理基准：逐阶段比较原实现（每次新建 CLAHE / 卷积核、每阶段分配新图像）与
+PlatePreprocessor（缓存 CLAHE 和卷积核、复用缓冲区）的耗时，并校验两者输出一致。
+用法：python bench_preprocess.py [裁剪图目录] [重复次数]
+不给目录时使用随机生成的车牌尺寸图像。
+"""
+import os
+import sys
+import glob
+import time
+
+import cv2
+import numpy as np
+
+from recognition.preprocess import PlatePreprocessor, SHARPEN_CROSS
+
+
+def load_images(directory):
+    paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.png')))
+    return [img for img in (cv2.imread(p) for p in paths) if img is not None]
+
+
+def synthetic_images(count=64):
+    """随机生成宽 140-260、高 40-96 的三通道图像"""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (int(rng.integers(40, 97)), int(rng.integers(140, 261)), 3), dtype=np.uint8)
+            for _ in range(count)]
+
+
+# ---------- 原实现的各阶段 ----------
+def naive_gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def naive_equalize(gray):
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    return clahe.apply(gray)
+
+
+def naive_sharpen(gray):
+    kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
+    return cv2.filter2D(gray, -1, kernel)
+
+
+def naive_rgb(gray):
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+
+
+def naive_process(image):
+    return naive_rgb(naive_sharpen(naive_equalize(naive_gray(image))))
+
+
+def timed(func, inputs, repeat):
+    """返回每张图的平均耗时（微秒）和最后一轮的输出"""
+    outputs = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [func(x) for x in inputs]
+    return (time.perf_counter() - start) / (repeat * len(inputs)) * 1e6, outputs
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    images = load_images(directory) if directory else synthetic_images()
+    if not images:
+        print("目录中没有图片")
+        return
+
+    pre = PlatePreprocessor(clip_limit=3.0, tile_grid_size=(8, 8), kernel=SHARPEN_CROSS)
+    # 先跑一轮让缓冲区就位
+    for image in images:
+        pre.process(image, rgb=True)
+
+    # 各阶段的输入取原实现上一阶段的输出（拷贝），两种实现输入相同
+    grays = [naive_gray(img) for img in images]
+    equalized = [naive_equalize(g) for g in grays]
+    sharpened = [naive_sharpen(e) for e in equalized]
+    stages = [
+        ('灰度', naive_gray, pre.gray, images),
+        ('CLAHE', naive_equalize, pre.equalize, grays),
+        ('锐化', naive_sharpen, pre.sharpen, equalized),
+        ('转RGB', naive_rgb, pre.to_rgb, sharpened),
+        ('完整流程', naive_process, lambda img: pre.process(img, rgb=True), images),
+    ]
+
+    print(f"样本数: {len(images)} x {repeat}")
+    print(f"{'阶段':<10}{'原实现':>10}{'流水线':>10}{'加速':>8}  输出一致")
+    for name, naive, cached, inputs in stages:
+        naive_us, expected = timed(naive, inputs, repeat)
+        # 流水线的输出是复用的缓冲区，逐张比较
+        cached_us, _ = timed(cached, inputs, repeat)
+        same = all(np.array_equal(cached(x), e) for x, e in zip(inputs, expected))
+        print(f"{name:<10}{naive_us:>8.1f}us{cached_us:>8.1f}us{naive_us / cached_us:>7.2f}x  {'是' if same else '否'}")
+
+    # 批量：原实现逐张处理后 copyMakeBorder 补边，流水线直接写入补零的批量数组
+    def naive_batch(batch):
+        processed = [naive_process(img) for img in batch]
+        max_h = max(img.shape[0] for img in processed)
+        max_w = max(img.shape[1] for img in processed)
+        return [cv2.copyMakeBorder(img, 0, max_h - img.shape[0], 0, max_w - img.shape[1],
+                                   cv2.BORDER_CONSTANT, value=(0, 0, 0)) for img in processed]
+
+    batches = [images[i:i + 4] for i in range(0, len(images), 4)]
+    naive_us, expected = timed(naive_batch, batches, repeat)
+    cached_us, _ = timed(lambda b: pre.process_batch(b, rgb=True), batches, repeat)
+    same = all(np.array_equal(pre.process_batch(b, rgb=True), np.stack(e)) for b, e in zip(batches, expected))
+    print(f"{'批量(4张)':<10}{naive_us:>8.1f}us{cached_us:>8.1f}us{naive_us / cached_us:>7.2f}x  {'是' if same else '否'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,13 +13,72 @@ RECOGNITION = {
     'lang_list': ['ch_sim', 'en']
 }
 
-# 冷却时间（秒）：放行一辆车后暂停识别的时间
+# 模型加载：服务启动后在后台加载并预热识别模型
+MODEL_WAIT_SECONDS = 2       # 模型未就绪时，识别请求最多等待的时间（秒），超时返回 503
+MODEL_RETRY_AFTER = 5        # 503 响应中建议客户端重试的间隔（秒）
+
+# 识别工作池：每个工作线程持有独立的 EasyOCR 模型
+RECOGNITION_WORKERS = 2          # 工作线程数（每个约占 1GB 内存）
+RECOGNITION_QUEUE_SIZE = 8       # 最大排队请求数，超出返回 429
+RECOGNITION_TIMEOUT = 10         # 单个请求排队 + 识别的最长时间（秒），超时返回 503
+RECOGNITION_TORCH_THREADS = max(1, (os.cpu_count() or 2) // RECOGNITION_WORKERS)  # 单次推理使用的 torch 线程数，避免多个工作线程抢占 CPU；None 表示不限制
+RECOGNITION_CROPPED_MODE = True  # 上传的是紧贴车牌的裁剪图：跳过 EasyOCR 文字检测，整图直接识别（识别不出时再走完整流程）
+RECOGNITION_TWO_PASS = True      # 两级解码：先贪心解码，置信度低或不符合车牌格式时再用 beamsearch 重新解码；False 时始终 beamsearch
+RECOGNITION_ESCALATE_CONFIDENCE = 0.6  # 贪心解码置信度低于该值时升级为 beamsearch
+
+# 车牌后处理：按车牌版式纠正易混字符（O/0、I/1、B/8 等），取得分最高的若干候选与白名单比对
+PLATE_CORRECTION = True          # False 时只用识别器的最佳结果精确比对
+PLATE_CANDIDATES = 5             # 与白名单比对的候选数
+PLATE_MIN_SCORE = 0.25           # 候选得分（识别置信度 × 纠正系数）低于该值时不参与比对，避免把形近的其他车牌放行
+PLATE_SWAP_BELOW = 0.8           # 最佳结果符合车牌版式且置信度不低于该值时直接采用，不再尝试形近字符，避免把清晰识别的外来车牌换成白名单车牌
+# 识别结果不含省份简称时（识别器只输出字母数字），是否按字母数字部分匹配任意省份的白名单车牌。
+# True：白名单登记了省份也能匹配，但只有省份不同的两辆车（如登记的京A12345 与外地的粤A12345）会被当成同一辆；
+# False：只做完整车牌精确比对，白名单中带省份简称的车牌将无法与不含省份的识别结果匹配
+PLATE_MATCH_ANY_PROVINCE = True
+
+# 白名单模糊匹配：精确比对未命中时，按编辑距离查找最相近的白名单车牌
+FUZZY_MATCH = True               # False 时只做精确比对（不建编辑距离索引）
+FUZZY_MAX_DISTANCE = 1           # 最大编辑距离（索引大小随之快速增长，一般取 1 或 2）
+FUZZY_DISTANCE_PENALTY = 0.7     # 每差一个字符，候选得分乘以该系数
+FUZZY_MIN_SCORE = 0.6            # 综合得分不低于该值才放行；距离 1 时需要识别得分约 0.86 以上。符合版式且得分不低于 PLATE_SWAP_BELOW 的候选视为可信、不做模糊匹配，因此模糊匹配主要用于多字、漏字等不符合版式的结果
+
+# 多帧投票融合：单帧结果不够可靠时，按车道累积最近几次识别结果逐字符加权投票
+FUSION_ENABLED = True            # False 时每次识别结果单独判定
+FUSION_WINDOW = 10.0             # 投票窗口（秒）。停着不动的车，结果缓存和重复画面过滤命中时不投票，最多 RESULT_CACHE_TTL + DUPLICATE_WINDOW 秒才有一次新的识别，窗口必须明显长于这段时间，否则每次投票时上一票都已过期，永远达不成共识
+FUSION_EARLY_CONFIDENCE = 0.85   # 单帧得分不低于该值且命中白名单时立即放行，不等待投票
+FUSION_MIN_WEIGHT = 1.0          # 每一位胜出字符需要累计的得分（约等于两帧 0.5 的一致结果）
+FUSION_CONSENSUS = 0.6           # 每一位胜出字符的得分占总得分的最小比例
+
+# 监控页面实时推送（/api/stream，Server-Sent Events）
+STREAM_MAX_CLIENTS = 16          # 最多同时推送的页面数（每个连接占用一个服务线程），超出时页面退回轮询
+STREAM_QUEUE_SIZE = 32           # 每个页面最多积压的记录数，积压时丢弃最旧的
+STREAM_KEEPALIVE = 15            # 空闲时发送保活消息的间隔（秒）
+
+# 识别结果缓存：以裁剪图的感知哈希为键，近似重复的图片直接返回缓存结果
+RESULT_CACHE_SIZE = 256          # 最多缓存的条目数
+RESULT_CACHE_TTL = 3.0           # 缓存有效期（秒）
+RESULT_CACHE_MAX_DISTANCE = 10   # 视为同一张图的最大汉明距离（256 位哈希），设为 0 则只复用哈希完全相同的图片
+
+# 冷却时间（秒）：某车道放行一辆车后，该车道暂停识别的时间（各车道独立计时）
 COOLDOWN_SECONDS = 10
+# 车牌冷却时间（秒）：同一车牌放行后，在此时间内再次识别到不重复放行
+PLATE_COOLDOWN_SECONDS = 30
+
+# 识别请求的前置检查（只看请求头，不读取图片）
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024   # 识别接口单次上传的最大字节数，超出返回 413
+IMPORT_MAX_BYTES = 64 * 1024 * 1024  # 白名单导入的最大字节数，同时是所有请求体的总上限（识别接口另受 MAX_UPLOAD_BYTES 限制）
+DUPLICATE_WINDOW = 2.0               # 重复画面判定窗口（秒）：窗口内同车道近似相同的画面沿用上次结果
+DUPLICATE_MAX_DISTANCE = 10          # 树莓派上报的 dHash 视为重复画面的最大汉明距离
+LANE_IDS = ()                        # 允许的车道编号（与各树莓派 config.LANE_ID 一致），如 ('lane1', 'lane2')，其他车道返回 400；为空时不校验
+MAX_LANES = 16                       # 最多保留的车道重复画面过滤器数，超出时淘汰最久未使用的车道（车道编号来自请求头，不校验时也不会无限增长）
 
 # Flask 服务配置
 FLASK_HOST = '0.0.0.0'      # 监听所有网卡，允许局域网其他设备访问
 FLASK_PORT = 5000
 FLASK_DEBUG = False          # 生产环境关闭调试模式
+# 安装了 waitress 时用它作为服务器（支持 HTTP/1.1 长连接），否则退回 Werkzeug 自带服务器（每个请求后断开连接）
+SERVER_THREADS = STREAM_MAX_CLIENTS + RECOGNITION_QUEUE_SIZE + RECOGNITION_WORKERS + 4  # waitress 线程数：每个实时推送连接和排队中的识别请求各占一个线程
+SERVER_KEEPALIVE_TIMEOUT = 60  # 空闲长连接保持的最长时间（秒）
 
 # 是否允许跨域（如果树莓派和其他设备需要访问 API，可以开启）
 CORS_ENABLED = True
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+白名单查询延迟微基准：
+  1. 每次查询新建 sqlite3 连接（旧实现）
+  2. 连接池复用连接执行 SELECT
+  3. 内存白名单 check_vehicle
+用法：python bench_db.py [车牌数量] [查询次数]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+from db_manager import Database
+
+
+def percentile(samples, p):
+    """返回样本的第 p 百分位（样本已排序）"""
+    index = min(len(samples) - 1, int(len(samples) * p / 100))
+    return samples[index]
+
+
+def measure(name, func, plates):
+    """对每个车牌调用一次 func，打印平均 / p50 / p99 延迟（微秒）"""
+    samples = []
+    for plate in plates:
+        start = time.perf_counter()
+        func(plate)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    avg = sum(samples) / len(samples)
+    print(f"{name:<16} avg={avg:8.1f}us  p50={percentile(samples, 50):8.1f}us  "
+          f"p99={percentile(samples, 99):8.1f}us")
+
+
+def main():
+    n_plates = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, 'bench.db')
+    db = Database(db_path=db_path)
+
+    plates = [f"A{i:05d}" for i in range(n_plates)]
+    for plate in plates:
+        db.add_vehicle(plate, 'bench')
+
+    # 一半命中、一半未命中
+    queries = [random.choice(plates) for _ in range(n_queries // 2)]
+    queries += [f"Z{i:05d}" for i in range(n_queries - len(queries))]
+    random.shuffle(queries)
+
+    def per_call_connect(plate):
+        with sqlite3.connect(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM vehicles WHERE plate = ?', (plate,))
+            return cursor.fetchone() is not None
+
+    def pooled(plate):
+        with db._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM vehicles WHERE plate = ?', (plate,))
+            return cursor.fetchone() is not None
+
+    print(f"车牌数量: {n_plates}, 查询次数: {n_queries}")
+    measure("每次新建连接", per_call_connect, queries)
+    measure("连接池", pooled, queries)
+    measure("内存白名单", db.check_vehicle, queries)
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
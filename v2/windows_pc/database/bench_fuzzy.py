@@ -0,0 +1,86 @@
+"""
+白名单模糊匹配基准：不同白名单规模下删除邻域索引的建索引耗时、变体数和查询延迟，
+与逐个计算编辑距离的线性扫描对比。
+用法：python bench_fuzzy.py [最大编辑距离] [查询次数]
+"""
+import sys
+import time
+import random
+
+from fuzzy_index import FuzzyIndex, edit_distance
+
+SIZES = (1000, 10000, 100000)
+ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ0123456789'
+
+
+def percentile(samples, p):
+    """返回样本的第 p 百分位（样本已排序）"""
+    index = min(len(samples) - 1, int(len(samples) * p / 100))
+    return samples[index]
+
+
+def random_plate(rng):
+    """随机生成普通车牌的字母数字部分"""
+    return rng.choice(ALPHABET[:24]) + ''.join(rng.choice(ALPHABET) for _ in range(5))
+
+
+def mutate(plate, rng):
+    """随机替换、删除或插入一个字符，模拟一次识别错误"""
+    i = rng.randrange(len(plate))
+    op = rng.choice('sdi')
+    if op == 's':
+        return plate[:i] + rng.choice(ALPHABET) + plate[i + 1:]
+    if op == 'd':
+        return plate[:i] + plate[i + 1:]
+    return plate[:i] + rng.choice(ALPHABET) + plate[i:]
+
+
+def measure(name, func, queries):
+    """对每个查询调用一次 func，打印平均 / p50 / p99 延迟（微秒）"""
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    avg = sum(samples) / len(samples)
+    print(f"  {name:<10} avg={avg:9.1f}us  p50={percentile(samples, 50):9.1f}us  "
+          f"p99={percentile(samples, 99):9.1f}us")
+
+
+def main():
+    max_distance = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(0)
+
+    for size in SIZES:
+        plates = list({random_plate(rng) for _ in range(size)})
+
+        start = time.perf_counter()
+        index = FuzzyIndex(max_distance, plates)
+        build = time.perf_counter() - start
+        print(f"白名单 {len(plates)} 个，最大距离 {max_distance}：建索引 {build:.2f}s，"
+              f"变体 {len(index._variants)} 个")
+
+        # 一半是白名单车牌错一个字符，一半是随机车牌
+        queries = [mutate(rng.choice(plates), rng) for _ in range(n_queries // 2)]
+        queries += [random_plate(rng) for _ in range(n_queries - len(queries))]
+        rng.shuffle(queries)
+
+        measure("删除邻域", index.lookup, queries)
+        # 线性扫描太慢，只取少量查询
+        measure("线性扫描", lambda q: [p for p in plates if edit_distance(q, p, max_distance) <= max_distance],
+                queries[:max(1, 200000 // len(plates))])
+
+        # 增量更新
+        start = time.perf_counter()
+        extra = [p for p in (random_plate(rng) for _ in range(1000)) if p not in index]
+        for plate in extra:
+            index.add(plate)
+        for plate in extra:
+            index.discard(plate)
+        print(f"  增删 {len(extra)} 个车牌：{(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,175 @@
 import sqlite3
 import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+try:
+    from .fuzzy_index import FuzzyIndex
+except ImportError:
+    # 在 database 目录下直接运行 test_db.py、bench_db.py 时
+    from fuzzy_index import FuzzyIndex
+
+def plate_serial(plate):
+    """去掉车牌开头的汉字（省份简称），得到识别器输出的字母数字部分"""
+    i = 0
+    while i < len(plate) and not plate[i].isascii():
+        i += 1
+    return plate[i:].upper()
 
 class Database:
     """
     车牌白名单数据库管理类。
     使用 SQLite，数据库文件默认位于 v1/database/vehicles.db。
     提供添加、删除、查询、列出所有车牌的功能。
+    白名单在内存中保存一份集合，查询不访问磁盘；写操作同时更新集合和 SQLite。
+    同时维护按字母数字部分的编辑距离索引，增删车牌时增量更新，供 find_similar 模糊匹配。
+    SQLite 连接放在线程安全的连接池中复用（WAL 模式），避免每次请求重新打开文件。
     """
 
-    def __init__(self, db_path=None):
+    # 每个新连接执行的 PRAGMA
+    PRAGMAS = (
+        'PRAGMA synchronous=NORMAL',     # WAL 模式下 NORMAL 已足够安全
+        'PRAGMA mmap_size=67108864',     # 64MB 内存映射读取
+        'PRAGMA cache_size=-8192',       # 8MB 页缓存
+        'PRAGMA temp_store=MEMORY',
+    )
+
+    def __init__(self, db_path=None, check_interval=1.0, pool_size=8, fuzzy_distance=1):
         """
         初始化数据库连接，如果数据库文件不存在则自动创建。
         :param db_path: 数据库文件路径，默认位于本文件所在目录的 vehicles.db
+        :param check_interval: 检查数据库文件是否被其他进程修改的最小间隔（秒）
+        :param pool_size: 连接池中最多保留的空闲连接数
+        :param fuzzy_distance: 模糊匹配索引支持的最大编辑距离，0 表示不建索引
         """
         if db_path is None:
             # 获取当前文件所在目录的路径
             base_dir = os.path.dirname(os.path.abspath(__file__))
             db_path = os.path.join(base_dir, 'vehicles.db')
         self.db_path = db_path
+        self.check_interval = check_interval
+        self.fuzzy_distance = fuzzy_distance
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._fts = False
         self._init_db()
 
+        # 内存白名单及其对应的文件签名
+        self._lock = threading.Lock()
+        self._plates = set()
+        self._serials = {}   # 字母数字部分 -> 白名单车牌集合（识别结果不含省份简称）
+        self._fuzzy = None   # 字母数字部分的编辑距离索引
+        self._signature = None
+        self._next_check = 0
+        # 白名单版本号：每次变化递增，以启动时间为初值保证重启后不重复（用于 ETag）
+        self._version = time.time_ns()
+        self._reload()
+
+    def _connect(self):
+        """创建一个新的 SQLite 连接并设置 PRAGMA"""
+        conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """从连接池借出一个连接，用完归还；池空时新建，池满时关闭多余连接"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """关闭连接池中的所有连接"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _file_signature(self):
+        """数据库文件（含 WAL 日志）的修改时间和大小，用于发现外部修改"""
+        signature = []
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _reload(self):
+        """从 SQLite 重新加载整个白名单到内存"""
+        with self._lock:
+            signature = self._file_signature()
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT plate FROM vehicles')
+                plates = {row[0] for row in cursor}
+            # 先建好索引再整体替换，查询线程不会看到一半的数据
+            serials = {}
+            for plate in plates:
+                serials.setdefault(plate_serial(plate), set()).add(plate)
+            fuzzy = FuzzyIndex(self.fuzzy_distance, serials) if self.fuzzy_distance else None
+            self._plates, self._serials, self._fuzzy = plates, serials, fuzzy
+            self._signature = signature
+            self._version += 1
+            self._next_check = time.monotonic() + self.check_interval
+
+    def _index_add(self, plate):
+        """把车牌加入字母数字部分索引和模糊匹配索引（调用方需持有 self._lock）"""
+        serial = plate_serial(plate)
+        plates = self._serials.get(serial)
+        if plates is None:
+            plates = self._serials[serial] = set()
+            if self._fuzzy is not None:
+                self._fuzzy.add(serial)
+        plates.add(plate)
+
+    def _index_discard(self, plate):
+        """从字母数字部分索引和模糊匹配索引中删除车牌（调用方需持有 self._lock）"""
+        serial = plate_serial(plate)
+        plates = self._serials.get(serial)
+        if plates is not None:
+            plates.discard(plate)
+            if not plates:
+                del self._serials[serial]
+                if self._fuzzy is not None:
+                    self._fuzzy.discard(serial)
+
+    def _mark_written(self):
+        """本进程写入后更新文件签名和版本号（调用方需持有 self._lock）"""
+        self._signature = self._file_signature()
+        self._version += 1
+
+    def _refresh_if_changed(self):
+        """
+        每隔 check_interval 秒比较一次文件签名，
+        若数据库被其他进程（如 v1 管理界面、sqlite3 命令行）修改则重新加载。
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        if self._file_signature() != self._signature:
+            self._reload()
+
     def _init_db(self):
-        """创建数据表（如果不存在）"""
-        with sqlite3.connect(self.db_path) as conn:
+        """创建数据表（如果不存在），并将数据库切换为 WAL 模式"""
+        with self._connection() as conn:
+            # WAL 模式持久保存在数据库文件中，读写互不阻塞
+            conn.execute('PRAGMA journal_mode=WAL')
             cursor = conn.cursor()
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS vehicles (
@@ -31,6 +178,42 @@ class Database:
                 )
             ''')
             conn.commit()
+        self._init_fts()
+
+    def _init_fts(self):
+        """
+        创建车牌子串搜索用的 FTS5 trigram 索引（外部内容表 + 触发器同步）。
+        SQLite 不支持 FTS5 或 trigram（需 3.34+）时退化为全表扫描。
+        """
+        with self._connection() as conn:
+            try:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'vehicles_fts'"
+                ).fetchone() is not None
+                conn.executescript('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS vehicles_fts USING fts5(
+                        plate, content='vehicles', content_rowid='rowid', tokenize='trigram'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS vehicles_fts_ai AFTER INSERT ON vehicles BEGIN
+                        INSERT INTO vehicles_fts(rowid, plate) VALUES (new.rowid, new.plate);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS vehicles_fts_ad AFTER DELETE ON vehicles BEGIN
+                        INSERT INTO vehicles_fts(vehicles_fts, rowid, plate)
+                        VALUES ('delete', old.rowid, old.plate);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS vehicles_fts_au AFTER UPDATE ON vehicles BEGIN
+                        INSERT INTO vehicles_fts(vehicles_fts, rowid, plate)
+                        VALUES ('delete', old.rowid, old.plate);
+                        INSERT INTO vehicles_fts(rowid, plate) VALUES (new.rowid, new.plate);
+                    END;
+                ''')
+                if not exists:
+                    # 首次创建时为已有数据建立索引
+                    conn.execute("INSERT INTO vehicles_fts(vehicles_fts) VALUES ('rebuild')")
+                conn.commit()
+                self._fts = True
+            except sqlite3.OperationalError:
+                self._fts = False
 
     def add_vehicle(self, plate, note=''):
         """
@@ -39,7 +222,7 @@ class Database:
         :param note: 备注（可选）
         :return: True 添加成功，False 如果车牌已存在
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -47,10 +230,14 @@ class Database:
                     (plate, note)
                 )
                 conn.commit()
-                return True
             except sqlite3.IntegrityError:
                 # 主键冲突，说明车牌已存在
                 return False
+        with self._lock:
+            self._plates.add(plate)
+            self._index_add(plate)
+            self._mark_written()
+        return True
 
     def remove_vehicle(self, plate):
         """
@@ -58,11 +245,66 @@ class Database:
         :param plate: 车牌号
         :return: True 删除成功，False 车牌不存在
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM vehicles WHERE plate = ?', (plate,))
             conn.commit()
-            return cursor.rowcount > 0
+            removed = cursor.rowcount > 0
+        with self._lock:
+            self._plates.discard(plate)
+            self._index_discard(plate)
+            self._mark_written()
+        return removed
+
+    def add_many(self, vehicles):
+        """
+        批量添加车牌，整批在同一个事务中用 executemany 写入，已存在的车牌被跳过。
+        :param vehicles: 可迭代对象，元素为 (plate, note)；可以是生成器，逐行写入而不整体载入内存
+        :return: 实际新增的车牌数量
+        """
+        seen = set()   # 导入列表中重复的车牌只记一次
+
+        def rows():
+            for plate, note in vehicles:
+                seen.add(plate)
+                yield plate, note
+
+        with self._connection() as conn:
+            # 用 rowcount 而不是 total_changes 计数：后者还包含 FTS 触发器写入的行
+            added = conn.executemany(
+                'INSERT OR IGNORE INTO vehicles (plate, note) VALUES (?, ?)',
+                rows()
+            ).rowcount
+            conn.commit()
+        with self._lock:
+            self._plates.update(seen)
+            for plate in seen:
+                self._index_add(plate)
+            self._mark_written()
+        return added
+
+    def remove_many(self, plates):
+        """
+        批量删除车牌，整批在同一个事务中完成。
+        :param plates: 车牌号的可迭代对象
+        :return: 实际删除的车牌数量
+        """
+        seen = set()
+
+        def rows():
+            for plate in plates:
+                seen.add(plate)
+                yield (plate,)
+
+        with self._connection() as conn:
+            removed = conn.executemany('DELETE FROM vehicles WHERE plate = ?', rows()).rowcount
+            conn.commit()
+        with self._lock:
+            self._plates.difference_update(seen)
+            for plate in seen:
+                self._index_discard(plate)
+            self._mark_written()
+        return removed
 
     def check_vehicle(self, plate):
         """
@@ -70,17 +312,123 @@ class Database:
         :param plate: 车牌号
         :return: True 允许通行，False 禁止通行
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT 1 FROM vehicles WHERE plate = ?', (plate,))
-            return cursor.fetchone() is not None
+        self._refresh_if_changed()
+        return plate in self._plates
+
+    def check_any(self, plates, any_province=True):
+        """
+        依次检查多个候选车牌，返回第一个在白名单中的车牌。
+        :param plates: 候选车牌号列表（按可信度降序）
+        :param any_province: 候选不含省份简称时（识别器只输出字母数字），是否按字母数字部分匹配任意省份的白名单车牌；
+                             同一字母数字部分对应多个省份的车牌时返回排序最前的一个。
+                             注意这样无法区分只有省份不同的两辆车（如白名单中的京A12345 与外地的粤A12345）
+        :return: (候选下标, 白名单中的车牌号)，都不在白名单中时返回 None
+        """
+        self._refresh_if_changed()
+        whitelist, serials = self._plates, self._serials
+        for i, plate in enumerate(plates):
+            if plate in whitelist:
+                return i, plate
+            matches = serials.get(plate_serial(plate)) if any_province and plate.isascii() else None
+            if matches:
+                return i, min(matches)
+        return None
+
+    def find_similar(self, plate, max_distance=None, any_province=True):
+        """
+        模糊查找：按字母数字部分的编辑距离查找相近的白名单车牌。
+        :param plate: 车牌号（可不含省份简称）
+        :param max_distance: 最大编辑距离，默认且最多为 fuzzy_distance
+        :param any_province: 是否返回任意省份的白名单车牌；False 时只返回省份简称与 plate 相同（都没有也算相同）的车牌
+        :return: [(白名单车牌号, 距离), ...]，按距离、车牌号排序；未建索引时为空列表
+        """
+        self._refresh_if_changed()
+        fuzzy = self._fuzzy
+        if fuzzy is None:
+            return []
+        serial = plate_serial(plate)
+        province = plate[:len(plate) - len(serial)]
+        matches = fuzzy.lookup(serial, max_distance)
+        found = []
+        with self._lock:
+            for serial, distance in matches:
+                found.extend((p, distance) for p in sorted(self._serials.get(serial, ()))
+                             if any_province or p[:len(p) - len(serial)] == province)
+        return found
 
     def list_all(self):
         """
         返回所有白名单车牌及其备注的列表。
         :return: 列表，每个元素为 (plate, note)
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT plate, note FROM vehicles')
-            return cursor.fetchall()
\ No newline at end of file
+            return cursor.fetchall()
+
+    def iter_all(self, batch_size=500):
+        """
+        按车牌号顺序逐批读取白名单，适合导出等需要流式输出的场景。
+        :param batch_size: 每次从 SQLite 取出的行数
+        :return: 生成器，每个元素为 (plate, note)
+        """
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT plate, note FROM vehicles ORDER BY plate')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    @property
+    def version(self):
+        """白名单版本号，任何增删（包括其他进程的修改）都会使其变化"""
+        self._refresh_if_changed()
+        return self._version
+
+    def count(self):
+        """返回白名单车牌总数"""
+        self._refresh_if_changed()
+        return len(self._plates)
+
+    def list_page(self, after=None, limit=50, query=None, mode='prefix'):
+        """
+        按车牌号顺序分页查询（键集分页），可按前缀或子串过滤。
+        前缀查询走主键索引的范围扫描；子串查询（3 个字符及以上）走 FTS5 trigram 索引。
+        :param after: 上一页最后一个车牌号，返回严格大于它的记录；None 表示第一页
+        :param limit: 每页条数
+        :param query: 过滤关键字，None 或空字符串表示不过滤
+        :param mode: 'prefix' 前缀匹配，'contains' 子串匹配
+        :return: (rows, total)，rows 为 (plate, note) 列表，total 为满足过滤条件的总数
+        """
+        where, params = [], []
+        if query:
+            if mode == 'prefix':
+                # plate >= q AND plate < q + U+10FFFF，可利用主键索引
+                where.append('plate >= ? AND plate < ?')
+                params += [query, query + '\U0010ffff']
+            elif self._fts and len(query) >= 3:
+                where.append('rowid IN (SELECT rowid FROM vehicles_fts WHERE vehicles_fts MATCH ?)')
+                params.append('"' + query.replace('"', '""') + '"')
+            else:
+                where.append('instr(plate, ?) > 0')
+                params.append(query)
+
+        with self._connection() as conn:
+            if query:
+                total = conn.execute(
+                    'SELECT COUNT(*) FROM vehicles WHERE ' + ' AND '.join(where), params
+                ).fetchone()[0]
+            else:
+                total = self.count()
+
+            if after is not None:
+                where.append('plate > ?')
+                params.append(after)
+            sql = 'SELECT plate, note FROM vehicles'
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            sql += ' ORDER BY plate LIMIT ?'
+            rows = conn.execute(sql, params + [limit]).fetchall()
+        return rows, total
\ No newline at end of file
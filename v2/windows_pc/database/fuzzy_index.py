@@ -0,0 +1,108 @@
+"""
+白名单模糊匹配索引（SymSpell 删除邻域）
+每个车牌预先生成删除至多 max_distance 个字符后的所有变体，查询时只生成查询串的删除变体并查表，
+候选再用编辑距离校验。查询耗时只与车牌长度有关，与白名单大小基本无关。
+"""
+import threading
+from itertools import combinations
+
+
+def edit_distance(a, b, limit=None):
+    """
+    两个字符串的编辑距离（插入、删除、替换各计 1）
+    :param limit: 给出时，距离超过 limit 即提前返回 limit + 1
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def deletes(word, max_distance):
+    """word 删除 0 到 max_distance 个字符后得到的所有字符串（含 word 本身）"""
+    variants = {word}
+    for n in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), n):
+            variants.add(''.join(c for i, c in enumerate(word) if i not in positions))
+    return variants
+
+
+class FuzzyIndex:
+    """
+    删除邻域索引：变体 -> 生成该变体的车牌集合。
+    支持增量 add / discard，查询与修改之间由内部锁保护。
+    """
+
+    def __init__(self, max_distance=1, words=()):
+        """
+        :param max_distance: 支持查询的最大编辑距离（每个车牌生成的变体数随之快速增长，一般取 1 或 2）
+        :param words: 初始车牌
+        """
+        self.max_distance = max_distance
+        self._variants = {}
+        self._words = set()
+        self._lock = threading.Lock()
+        for word in words:
+            self._add(word)
+
+    def _add(self, word):
+        if word in self._words:
+            return
+        self._words.add(word)
+        for variant in deletes(word, self.max_distance):
+            self._variants.setdefault(variant, set()).add(word)
+
+    def add(self, word):
+        """加入一个车牌"""
+        with self._lock:
+            self._add(word)
+
+    def discard(self, word):
+        """删除一个车牌（不存在时忽略）"""
+        with self._lock:
+            if word not in self._words:
+                return
+            self._words.discard(word)
+            for variant in deletes(word, self.max_distance):
+                words = self._variants.get(variant)
+                if words is not None:
+                    words.discard(word)
+                    if not words:
+                        del self._variants[variant]
+
+    def lookup(self, query, max_distance=None):
+        """
+        查找与 query 编辑距离不超过 max_distance 的车牌
+        :param max_distance: 默认为索引的 max_distance，不能超过它
+        :return: [(车牌, 距离), ...]，按距离、车牌排序
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        with self._lock:
+            candidates = set()
+            for variant in deletes(query, max_distance):
+                words = self._variants.get(variant)
+                if words:
+                    candidates.update(words)
+        found = []
+        for word in candidates:
+            distance = edit_distance(query, word, max_distance)
+            if distance <= max_distance:
+                found.append((word, distance))
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return word in self._words
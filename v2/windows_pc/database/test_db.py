@@ -12,12 +12,50 @@ def main():
     print("京A12345 存在?", db.check_vehicle('京A12345'))  # True
     print("粤C99999 存在?", db.check_vehicle('粤C99999'))  # False
 
+    # 候选车牌一次比对：识别器只输出字母数字，按字母数字部分匹配白名单
+    result = db.check_any(['A1234S', 'A12345'])
+    print("候选 A1234S、A12345:", result)  # (1, '京A12345')
+    assert result == (1, '京A12345')
+    result = db.check_any(['A12345'], any_province=False)
+    print("不匹配其他省份:", result)  # None
+    assert result is None
+    result = db.check_any(['京A12345'], any_province=False)
+    print("完整车牌:", result)  # (0, '京A12345')
+    assert result == (0, '京A12345')
+
+    # 模糊查找：按字母数字部分的编辑距离
+    result = db.find_similar('A12346')
+    print("与 A12346 相近:", result)  # [('京A12345', 1)]
+    assert result == [('京A12345', 1)]
+    result = db.find_similar('B8888')
+    print("与 B8888 相近:", result)  # [('沪B88888', 1)]
+    assert result == [('沪B88888', 1)]
+    print("与 C99999 相近:", db.find_similar('C99999'))  # []
+    assert db.find_similar('C99999') == []
+    assert db.find_similar('粤A12346', any_province=False) == []
+
+    # 批量导入、删除：返回值只计白名单表本身的变化（不含 FTS 索引触发器写入的行）
+    print("FTS 索引:", db._fts)
+    added = db.add_many([('京A12345', '重复'), ('粤C99999', '测试车3'), ('苏D66666', '测试车4'),
+                         ('粤C99999', '重复')])
+    print("批量导入:", added)  # 2
+    assert added == 2
+    removed = db.remove_many(['粤C99999', '苏D66666', '苏D66666', '浙E00000'])
+    print("批量删除:", removed)  # 2
+    assert removed == 2
+    assert not db.check_vehicle('粤C99999')
+
     # 列出所有
     print("所有车辆:", db.list_all())
 
     # 删除测试
     db.remove_vehicle('京A12345')
     print("删除后:", db.list_all())
+    print("删除后 check_any:", db.check_any(['A12345']))  # None
+    assert db.check_any(['A12345']) is None
+    print("删除后模糊查找:", db.find_similar('A12346'))  # []
+    assert db.find_similar('A12346') == []
+    db.remove_vehicle('沪B88888')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
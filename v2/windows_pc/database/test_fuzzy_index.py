@@ -0,0 +1,51 @@
+import random
+
+from fuzzy_index import FuzzyIndex, edit_distance
+
+ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ0123456789'
+
+
+def random_plate(rng):
+    return rng.choice(ALPHABET[:24]) + ''.join(rng.choice(ALPHABET) for _ in range(5))
+
+
+def main():
+    # 编辑距离
+    for a, b, distance in [('A12345', 'A12345', 0), ('A12345', 'A12346', 1), ('A12345', 'A1234', 1),
+                           ('A12345', 'AA12345', 1), ('A12345', 'B12354', 3), ('', 'AB', 2)]:
+        print(f"{a!r} / {b!r}:", edit_distance(a, b))
+        assert edit_distance(a, b) == distance
+    # 超过 limit 时提前返回 limit + 1
+    assert edit_distance('A12345', 'B99999', limit=1) == 2
+
+    rng = random.Random(0)
+    plates = list({random_plate(rng) for _ in range(2000)})
+
+    # 增量增删后的索引与直接用剩余车牌重建的索引一致
+    index = FuzzyIndex(2, plates[:1500])
+    for plate in plates[1500:]:
+        index.add(plate)
+    for plate in plates[:500]:
+        index.discard(plate)
+    index.discard('NOT-IN-INDEX')
+    rebuilt = FuzzyIndex(2, plates[500:])
+    print("增量更新后:", len(index), "个车牌,", len(index._variants), "个变体")
+    assert len(index) == len(rebuilt) == 1500
+    assert index._variants == rebuilt._variants
+    assert plates[0] not in index and plates[-1] in index
+
+    # 查询结果与线性扫描一致
+    remaining = plates[500:]
+    for _ in range(200):
+        query = rng.choice(remaining)
+        query = query[:3] + rng.choice(ALPHABET) + query[4:]
+        expected = sorted(((p, edit_distance(query, p)) for p in remaining
+                           if edit_distance(query, p) <= 1), key=lambda item: (item[1], item[0]))
+        assert index.lookup(query, 1) == expected, query
+    print("查询与线性扫描一致")
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,227 @@
 import re
+import logging
+import threading
 import easyocr
 import cv2
 import numpy as np
 
+from utils.plate_grammar import PLATE_GRAMMAR
+from .preprocess import PlatePreprocessor, SHARPEN_CROSS
+
+logger = logging.getLogger(__name__)
+
+# 文字识别（解码）参数
+RECOGNIZE_PARAMS = dict(
+    contrast_ths=0.1,
+    adjust_contrast=0.5,
+    decoder='beamsearch',
+    beamWidth=10,
+)
+
+# 第一遍解码：贪心解码，比 beamsearch 快得多，大多数清晰车牌已足够
+GREEDY_PARAMS = dict(RECOGNIZE_PARAMS, decoder='greedy')
+
+# recognize_cropped(decoder=...) 可指定的单一解码器
+DECODER_PARAMS = {
+    'greedy': GREEDY_PARAMS,
+    'beamsearch': RECOGNIZE_PARAMS,
+}
+
+# 文字检测参数（低阈值，适合车牌小图）
+DETECT_PARAMS = dict(
+    text_threshold=0.2,
+    low_text=0.1,
+    link_threshold=0.2,
+    canvas_size=2560,
+)
+
+# EasyOCR 检测 + 识别参数
+OCR_PARAMS = dict(DETECT_PARAMS, **RECOGNIZE_PARAMS)
+
+# 每解码多少张图输出一次升级比例
+STATS_LOG_INTERVAL = 200
+
+
 class EasyOCRPlateRecognizer:
     """使用 EasyOCR 检测并识别车牌，提取字母数字部分作为车牌号"""
 
-    def __init__(self, lang_list=None, gpu=False):
+    def __init__(self, lang_list=None, gpu=False, two_pass=True, escalate_below=0.6):
         """
         :param lang_list: 语言列表，默认 ['ch_sim', 'en']
         :param gpu: 是否使用 GPU
+        :param two_pass: 是否先用贪心解码，只对不可靠的结果再用 beamsearch；False 时始终使用 beamsearch
+        :param escalate_below: 贪心结果的置信度低于该值时升级为 beamsearch
         """
         if lang_list is None:
             lang_list = ['ch_sim', 'en']
         self.reader = easyocr.Reader(lang_list, gpu=gpu)
+        # CLAHE + 锐化（缓冲区按尺寸复用，每个识别器实例只在所属工作线程中使用）
+        self._preprocessor = PlatePreprocessor(clip_limit=3.0, tile_grid_size=(8, 8), kernel=SHARPEN_CROSS)
+        self.two_pass = two_pass
+        self.escalate_below = escalate_below
+
+        # 解码统计
+        self._stats_lock = threading.Lock()
+        self.decoded = 0
+        self.escalated = 0
+
+    def warm_up(self):
+        """用合成的车牌图片跑一次完整识别，提前完成模型的首次推理初始化"""
+        image = np.full((60, 200, 3), 255, dtype=np.uint8)
+        cv2.putText(image, 'A12345', (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (0, 0, 0), 3)
+        # 两种解码器都跑一次
+        self._recognize_cropped([image], GREEDY_PARAMS)
+        self._recognize_cropped([image], RECOGNIZE_PARAMS)
+        return self._readtext_batched([image], RECOGNIZE_PARAMS)[0]
+
+    def _enhance(self, image):
+        """图像增强：CLAHE + 锐化，返回灰度图（预处理器的内部缓冲区）"""
+        return self._preprocessor.process(image)
 
     def _preprocess(self, image):
-        """图像预处理：CLAHE + 锐化"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        # CLAHE 自适应直方图均衡化
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        gray = clahe.apply(gray)
-        # 锐化
-        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
-        gray = cv2.filter2D(gray, -1, kernel)
-        # 转为 RGB（EasyOCR 需要）
-        processed = cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
-        return processed
-
-    def recognize(self, image):
+        """图像预处理：CLAHE + 锐化，转为 RGB（EasyOCR 需要）"""
+        return self._preprocessor.process(image, rgb=True)
+
+    # ---------- 两级解码 ----------
+    def _reliable(self, plates):
+        """识别结果是否可靠：有候选、置信度足够且符合车牌版式（utils/plate_grammar.py）"""
+        return bool(plates) and plates[0][1] >= self.escalate_below and \
+            PLATE_GRAMMAR.is_valid(plates[0][0])
+
+    @staticmethod
+    def _better(a, b):
+        """在两次解码的结果中选择更好的一个：优先符合车牌格式，其次置信度更高"""
+        if not a or not b:
+            return a or b
+        key = lambda plates: (PLATE_GRAMMAR.is_valid(plates[0][0]), plates[0][1])
+        return b if key(b) > key(a) else a
+
+    def _two_pass(self, images, run):
+        """
+        两级解码：先对全部图片贪心解码，只有不可靠的结果再用 beamsearch 批量重新解码
+        :param run: run(images, params) -> 与 images 对应的结果列表
+        """
+        if not self.two_pass:
+            return run(images, RECOGNIZE_PARAMS)
+
+        results = run(images, GREEDY_PARAMS)
+        pending = [i for i, plates in enumerate(results) if not self._reliable(plates)]
+        if pending:
+            beam = run([images[i] for i in pending], RECOGNIZE_PARAMS)
+            for i, plates in zip(pending, beam):
+                results[i] = self._better(results[i], plates)
+
+        with self._stats_lock:
+            before = self.decoded
+            self.decoded += len(images)
+            self.escalated += len(pending)
+            if self.decoded // STATS_LOG_INTERVAL != before // STATS_LOG_INTERVAL:
+                logger.info(f"已解码 {self.decoded} 张，其中 {self.escalated} 张升级为 beamsearch"
+                            f"（{self.escalated / self.decoded:.1%}）")
+        return results
+
+    def decode_stats(self):
+        """返回解码次数和升级为 beamsearch 的比例"""
+        with self._stats_lock:
+            return {
+                'decoded': self.decoded,
+                'escalated': self.escalated,
+                'escalation_rate': round(self.escalated / self.decoded, 3) if self.decoded else 0.0
+            }
+
+    # ---------- 识别 ----------
+    def recognize(self, image, cropped=False):
         """
         输入图像（BGR格式 numpy 数组），返回 (车牌号字符串, 置信度) 的列表，按置信度降序。
         车牌号仅包含字母和数字（例如 'AF0236'），忽略汉字和符号。
+        :param cropped: 图像是否已是紧贴车牌的裁剪图（树莓派上传的图片）；
+                        是则跳过文字检测，整张图直接送入识别模型，识别不出车牌时再走完整流程
+        """
+        if cropped:
+            plates = self.recognize_cropped([image])[0]
+            if plates:
+                return plates
+        return self._two_pass([image], self._readtext_batched)[0]
+
+    def recognize_cropped(self, images, decoder=None):
+        """
+        裁剪图模式：不做 CRAFT 文字检测，把每张图整体作为一个文本框交给识别模型。
+        :param images: BGR 图像列表
+        :param decoder: None 时按 two_pass 设置解码；'greedy' 或 'beamsearch' 时只用该解码器解码一遍，
+                        不升级、不计入 decode_stats（用于基准测试对比解码器）
+        :return: 与输入顺序一致的列表，每个元素同 recognize() 的返回值（可能为空）
+        """
+        if not images:
+            return []
+        if decoder is not None:
+            if decoder not in DECODER_PARAMS:
+                raise ValueError(f"不支持的解码器: {decoder}")
+            return self._recognize_cropped(images, DECODER_PARAMS[decoder])
+        return self._two_pass(images, self._recognize_cropped)
+
+    def _recognize_cropped(self, images, params):
         """
-        # 预处理
-        processed = self._preprocess(image)
-
-        # 使用优化参数进行识别
-        results = self.reader.readtext(
-            processed,
-            text_threshold=0.2,
-            low_text=0.1,
-            link_threshold=0.2,
-            canvas_size=2560,
-            contrast_ths=0.1,
-            adjust_contrast=0.5,
-            decoder='beamsearch',
-            beamWidth=10,
+        多张图纵向拼接为一张画布（画布大小即各图尺寸之和），一次 reader.recognize 批量识别
+        """
+        width = max(img.shape[1] for img in images)
+        canvas = np.zeros((sum(img.shape[0] for img in images), width), dtype=np.uint8)
+        boxes = []
+        offsets = {}
+        y = 0
+        for i, img in enumerate(images):
+            h, w = img.shape[:2]
+            # 增强结果是复用的缓冲区，立即拷入画布
+            canvas[y:y + h, :w] = self._enhance(img)
+            boxes.append([0, w, y, y + h])   # [x_min, x_max, y_min, y_max]
+            offsets[y] = i
+            y += h
+
+        results = self.reader.recognize(canvas, horizontal_list=boxes, free_list=[],
+                                        batch_size=len(boxes), **params)
+        # 结果中的文本框左上角 y 坐标即拼接时的偏移量，据此对应回输入顺序
+        grouped = [[] for _ in images]
+        for result in results:
+            index = offsets.get(int(result[0][0][1]))
+            if index is not None:
+                grouped[index].append(result)
+        return [self._extract_plates(r) for r in grouped]
+
+    def recognize_batch(self, images, cropped=False):
+        """
+        批量识别同一帧中的多张车牌裁剪图，只调用一次 EasyOCR。
+        :param images: BGR 图像列表
+        :param cropped: 同 recognize()；裁剪图模式下未识别出车牌的图片再逐张走完整流程
+        :return: 与输入顺序一致的列表，每个元素同 recognize() 的返回值
+        """
+        if not images:
+            return []
+        if cropped:
+            results = self.recognize_cropped(images)
+            for i, plates in enumerate(results):
+                if not plates:
+                    results[i] = self.recognize(images[i])
+            return results
+        return self._two_pass(images, self._readtext_batched)
+
+    def _readtext_batched(self, images, params):
+        """完整流程（文字检测 + 识别），多张图时一次 readtext_batched"""
+        if len(images) == 1:
+            results = self.reader.readtext(self._preprocess(images[0]), **DETECT_PARAMS, **params)
+            return [self._extract_plates(results)]
+
+        # readtext_batched 要求尺寸一致：向右下方补边到最大尺寸，避免缩放导致字符变形
+        padded = list(self._preprocessor.process_batch(images, rgb=True))
+
+        batch_results = self.reader.readtext_batched(
+            padded,
+            batch_size=len(padded),
+            **DETECT_PARAMS,
+            **params
         )
+        return [self._extract_plates(results) for results in batch_results]
 
+    def _extract_plates(self, results):
+        """从 EasyOCR 原始结果中提取车牌候选，按置信度降序"""
         found_plates = []
         for (bbox, text, confidence) in results:
             # 提取所有 ASCII 字母数字字符
@@ -68,9 +241,9 @@ class EasyOCRPlateRecognizer:
         found_plates.sort(key=lambda x: x[1], reverse=True)
         return found_plates
 
-    def recognize_best(self, image):
+    def recognize_best(self, image, cropped=False):
         """返回最佳车牌号字符串，若无返回 None"""
-        plates = self.recognize(image)
+        plates = self.recognize(image, cropped=cropped)
         return plates[0][0] if plates else None
 
 
@@ -95,17 +268,7 @@ if __name__ == "__main__":
     recognizer = EasyOCRPlateRecognizer(gpu=False)
 
     # 打印原始识别结果（使用与 recognize 相同的低阈值参数）
-    raw_results_low = recognizer.reader.readtext(
-        img,
-        text_threshold=0.2,
-        low_text=0.1,
-        link_threshold=0.2,
-        canvas_size=2560,
-        contrast_ths=0.1,
-        adjust_contrast=0.5,
-        decoder='beamsearch',
-        beamWidth=10,
-    )
+    raw_results_low = recognizer.reader.readtext(img, **OCR_PARAMS)
     print("EasyOCR 原始识别结果（低阈值）：")
     for (bbox, text, conf) in raw_results_low:
         print(f"  文本: '{text}', 置信度: {conf:.4f}")
@@ -0,0 +1,99 @@
+"""
+车牌图像预处理流水线：灰度 → CLAHE → 锐化（→ RGB）
+CLAHE 实例和锐化卷积核只创建一次，各阶段的输出写入预分配的缓冲区
+（每个阶段一块，按所需尺寸取视图，不够大时才重新分配），避免每张图都重新分配中间图像。
+源文件为门卫电脑端 recognition/preprocess.py；树莓派端 utils/preprocess.py 是由 v2/sync_shared.py 复制生成的副本（两端分开部署），
+只修改源文件，改完运行 python sync_shared.py，python sync_shared.py --check 可检查两端是否一致。
+"""
+import cv2
+import numpy as np
+
+# 十字形锐化核（门卫电脑识别前使用）
+SHARPEN_CROSS = np.array([[0, -1, 0],
+                          [-1, 5, -1],
+                          [0, -1, 0]], dtype=np.float32)
+
+# 八邻域锐化核（树莓派 enhance_plate 使用，锐化更强）
+SHARPEN_BOX = np.array([[-1, -1, -1],
+                        [-1, 9, -1],
+                        [-1, -1, -1]], dtype=np.float32)
+
+
+class PlatePreprocessor:
+    """
+    可复用的车牌预处理流水线。
+    返回的图像是内部缓冲区，下一次处理同尺寸图像时会被覆盖，需要保留时请自行 copy()。
+    缓冲区和 CLAHE 实例不是线程安全的，每个线程应使用自己的实例。
+    """
+
+    def __init__(self, clip_limit=3.0, tile_grid_size=(8, 8), kernel=SHARPEN_CROSS):
+        """
+        :param clip_limit: CLAHE 对比度限制
+        :param tile_grid_size: CLAHE 分块数
+        :param kernel: 锐化卷积核，None 表示不锐化
+        """
+        self._clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+        self._kernel = None if kernel is None else np.asarray(kernel, dtype=np.float32)
+        self._buffers = {}
+
+    def _buffer(self, stage, shape):
+        """
+        取出 stage 阶段指定尺寸的缓冲区。
+        每个阶段只保留一块连续内存，返回其前部按 shape 重排的视图；
+        车牌裁剪图尺寸各不相同，这样不会因尺寸变化反复分配。
+        """
+        size = int(np.prod(shape))
+        backing = self._buffers.get(stage)
+        if backing is None or backing.size < size:
+            backing = self._buffers[stage] = np.empty(size, dtype=np.uint8)
+        return backing[:size].reshape(shape)
+
+    # ---------- 各阶段（基准测试可单独计时）----------
+    def gray(self, image):
+        """BGR 转灰度；已是灰度图时原样返回"""
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self._buffer('gray', image.shape[:2]))
+
+    def equalize(self, gray):
+        """CLAHE 自适应直方图均衡化"""
+        return self._clahe.apply(gray, dst=self._buffer('clahe', gray.shape))
+
+    def sharpen(self, gray):
+        """锐化"""
+        if self._kernel is None:
+            return gray
+        return cv2.filter2D(gray, -1, self._kernel, dst=self._buffer('sharpen', gray.shape))
+
+    def to_rgb(self, gray):
+        """灰度转三通道"""
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB, dst=self._buffer('rgb', gray.shape + (3,)))
+
+    # ---------- 完整流程 ----------
+    def process(self, image, rgb=False):
+        """
+        处理单张图
+        :param rgb: 是否输出三通道 RGB（EasyOCR 需要），否则输出灰度图
+        :return: 内部缓冲区
+        """
+        result = self.sharpen(self.equalize(self.gray(image)))
+        return self.to_rgb(result) if rgb else result
+
+    __call__ = process
+
+    def process_batch(self, images, rgb=False):
+        """
+        批量处理多张尺寸不同的图，结果向右下方补零到最大尺寸后放入同一个数组
+        :param images: BGR 或灰度图列表
+        :param rgb: 同 process()
+        :return: 形状为 (N, H, W) 或 (N, H, W, 3) 的 uint8 数组（内部缓冲区）
+        """
+        max_h = max(img.shape[0] for img in images)
+        max_w = max(img.shape[1] for img in images)
+        shape = (len(images), max_h, max_w) + ((3,) if rgb else ())
+        batch = self._buffer('batch', shape)
+        batch.fill(0)
+        for i, image in enumerate(images):
+            h, w = image.shape[:2]
+            batch[i, :h, :w] = self.process(image, rgb)
+        return batch
@@ -42,21 +42,60 @@ if (document.getElementById('vehicle-table')) {
     const vehicleTable = document.getElementById('vehicle-table');
     const addForm = document.getElementById('add-form');
 
-    // 加载所有车辆
+    const searchInput = document.getElementById('search');
+    const totalDisplay = document.getElementById('vehicle-total');
+    const sentinel = document.getElementById('load-more');
+    const PAGE_SIZE = 50;
+
+    // 分页状态：nextAfter 为下一页的起点，null 表示已加载完
+    let nextAfter = null;
+    let loading = false;
+    let loadToken = 0;
+
+    // 请求一页数据（浏览器根据 ETag 自动协商缓存，未变化时服务端返回 304）
+    async function fetchPage(after) {
+        const params = new URLSearchParams({ limit: PAGE_SIZE });
+        if (after) params.set('after', after);
+        const q = searchInput.value.trim();
+        if (q) {
+            params.set('q', q);
+            params.set('match', 'contains');
+        }
+        return apiRequest(`/api/vehicles?${params}`);
+    }
+
+    // 重新加载第一页（添加、删除、搜索后调用）
     async function loadVehicles() {
+        const token = ++loadToken;
         try {
-            const vehicles = await apiRequest('/api/vehicles');
-            renderVehicleTable(vehicles);
+            const page = await fetchPage(null);
+            if (token !== loadToken) return;  // 已有更新的请求
+            vehicleTable.querySelector('tbody').innerHTML = '';
+            appendRows(page);
         } catch (error) {
             console.error('加载车辆失败:', error);
         }
     }
 
-    // 渲染表格
-    function renderVehicleTable(vehicles) {
+    // 滚动到底部时加载下一页
+    async function loadMore() {
+        if (loading || nextAfter === null) return;
+        loading = true;
+        const token = loadToken;
+        try {
+            const page = await fetchPage(nextAfter);
+            if (token === loadToken) appendRows(page);
+        } catch (error) {
+            console.error('加载车辆失败:', error);
+        } finally {
+            loading = false;
+        }
+    }
+
+    // 追加一页到表格
+    function appendRows(page) {
         const tbody = vehicleTable.querySelector('tbody');
-        tbody.innerHTML = '';
-        vehicles.forEach(v => {
+        page.items.forEach(v => {
             const row = document.createElement('tr');
             row.innerHTML = `
                 <td>${v.plate}</td>
@@ -67,8 +106,22 @@ if (document.getElementById('vehicle-table')) {
             `;
             tbody.appendChild(row);
         });
+        nextAfter = page.next_after;
+        totalDisplay.innerText = `共 ${page.total} 条，已显示 ${tbody.children.length} 条`;
+        sentinel.style.display = nextAfter === null ? 'none' : '';
     }
 
+    new IntersectionObserver(entries => {
+        if (entries.some(e => e.isIntersecting)) loadMore();
+    }).observe(sentinel);
+
+    // 搜索（输入停止 300ms 后再请求）
+    let searchTimer = null;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(loadVehicles, 300);
+    });
+
     // 添加车辆
     addForm.addEventListener('submit', async (e) => {
         e.preventDefault();
@@ -90,6 +143,30 @@ if (document.getElementById('vehicle-table')) {
         }
     });
 
+    // 批量导入（文件以 multipart 上传，服务端流式解析）
+    const importForm = document.getElementById('import-form');
+    importForm.addEventListener('submit', async (e) => {
+        e.preventDefault();
+        const file = document.getElementById('import-file').files[0];
+        if (!file) return;
+
+        const formData = new FormData();
+        formData.append('file', file);
+        try {
+            const response = await fetch('/api/vehicles/import', { method: 'POST', body: formData });
+            const result = await response.json();
+            if (result.message) {
+                alert(`${result.message}：新增 ${result.added} 条，跳过 ${result.skipped} 条`);
+                loadVehicles();
+                importForm.reset();
+            } else if (result.error) {
+                alert(result.error);
+            }
+        } catch (error) {
+            alert('导入失败');
+        }
+    });
+
     // 删除车辆（全局函数，供按钮调用）
     window.deleteVehicle = async function(plate) {
         if (!confirm(`确定删除车牌 ${plate} 吗？`)) return;
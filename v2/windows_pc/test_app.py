@@ -0,0 +1,60 @@
+import io
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+import config
+
+config.DB_PATH = os.path.join(tempfile.mkdtemp(), 'vehicles.db')  # 不改动正式数据库
+import app as appmod
+
+
+def post(client, data, lane, frame_hash=None):
+    headers = {'X-Lane-Id': lane}
+    if frame_hash:
+        headers['X-Frame-Hash'] = frame_hash
+    response = client.post('/api/recognize', data={'image': (io.BytesIO(data), 'plate.jpg')}, headers=headers)
+    return response.get_json()
+
+
+def wait_admit(client, data, lane, frame_hash=None):
+    """每 0.5 秒上传同一张画面（停着不动的车），返回放行前经过的秒数，超时返回 None"""
+    started = time.monotonic()
+    deadline = started + 2 * (config.RESULT_CACHE_TTL + config.DUPLICATE_WINDOW) + 1
+    while time.monotonic() < deadline:
+        result = post(client, data, lane, frame_hash)
+        if result['allowed']:
+            return time.monotonic() - started
+        assert result['pending'], result
+        time.sleep(0.5)
+    return None
+
+
+def main():
+    assert appmod.pool.ready.wait(config.MODEL_WAIT_SECONDS), appmod.pool.error
+    client = appmod.app.test_client()
+    rng = np.random.default_rng(0)
+
+    # 白名单车辆停在道闸前，每次识别得分都只有 0.7（低于 FUSION_EARLY_CONFIDENCE），需要多帧投票
+    reads = {}
+    appmod.pool.run = lambda method, image, *args, timeout=10: [reads[image.shape]]
+    for plate, shape, lane, frame_hash in [('A12345', (40, 120, 3), 'test1', None),
+                                           ('B67890', (48, 144, 3), 'test2', 'abc')]:
+        appmod.db.add_vehicle('京' + plate, '测试车')
+        reads[shape] = (plate, 0.7)
+        data = cv2.imencode('.jpg', rng.integers(0, 256, shape, dtype=np.uint8))[1].tobytes()
+
+        # 结果缓存和重复画面过滤命中时不投票，过期后的新识别仍要与上一票在同一窗口内
+        elapsed = wait_admit(client, data, lane, frame_hash)
+        print(f"{plate} 重复画面{'（带 X-Frame-Hash）' if frame_hash else ''}放行用时:",
+              None if elapsed is None else round(elapsed, 1))
+        assert elapsed is not None
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
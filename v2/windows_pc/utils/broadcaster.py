@@ -0,0 +1,76 @@
+import json
+import queue
+import threading
+
+
+class TooManySubscribers(Exception):
+    """订阅者数量已达上限"""
+
+
+def sse_message(event, data):
+    """编码为一条 Server-Sent Events 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class Broadcaster:
+    """
+    进程内发布/订阅：每个订阅者（一个 SSE 连接）持有一个有界队列。
+    发布时消息只编码一次；某个订阅者读取太慢、队列满时丢弃它最旧的消息，不阻塞发布方。
+    """
+
+    def __init__(self, max_subscribers=16, max_queue=32):
+        """
+        :param max_subscribers: 最多同时订阅的连接数（每个 SSE 连接占用一个服务线程）
+        :param max_queue: 每个订阅者最多积压的消息数
+        """
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        """
+        新增一个订阅者
+        :return: 消息队列，元素为编码好的 SSE 消息
+        :raises TooManySubscribers: 订阅者已达上限
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers()
+            subscriber = queue.Queue(maxsize=self.max_queue)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        """向所有订阅者发送一条消息"""
+        message = sse_message(event, data)
+        with self._lock:
+            self.published += 1
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # 丢弃最旧的一条再放入
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                    subscriber.put_nowait(message)
+                    self.dropped += 1
+
+    def stats(self):
+        """返回当前订阅者数、已发布消息数和因积压丢弃的消息数"""
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'dropped': self.dropped
+            }
@@ -0,0 +1,88 @@
+import time
+import heapq
+import threading
+
+
+class ExpiringDict:
+    """
+    带过期时间的字典：每个键有自己的到期时刻。
+    到期时刻同时记录在最小堆中，读写时顺带弹出已过期的键，不需要后台清理线程。
+    """
+
+    def __init__(self):
+        self._data = {}     # key -> (value, expires_at)
+        self._heap = []     # (expires_at, key)
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        """删除所有已过期的键（调用方需持有锁）"""
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            entry = self._data.get(key)
+            # 键可能已被重新设置了更晚的到期时刻，此时堆中的旧记录直接丢弃
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+
+    def set(self, key, ttl, value=True):
+        """写入键，ttl 秒后过期"""
+        now = time.monotonic()
+        expires_at = now + ttl
+        with self._lock:
+            self._purge(now)
+            self._data[key] = (value, expires_at)
+            heapq.heappush(self._heap, (expires_at, key))
+
+    def get(self, key, default=None):
+        """读取未过期的值"""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._data.get(key)
+            return entry[0] if entry is not None else default
+
+    def remaining(self, key):
+        """键距离过期还剩多少秒，不存在或已过期返回 0"""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._data.get(key)
+            return entry[1] - now if entry is not None else 0.0
+
+    def __contains__(self, key):
+        return self.remaining(key) > 0
+
+    def __len__(self):
+        with self._lock:
+            self._purge(time.monotonic())
+            return len(self._data)
+
+
+class CooldownManager:
+    """
+    放行冷却：按车道和车牌分别计时，不同车道互不阻塞。
+    - 车道冷却：某车道放行后，该车道在 lane_seconds 秒内不再识别（等待车辆通过道闸）
+    - 车牌冷却：某车牌放行后，plate_seconds 秒内再次识别到同一车牌不重复放行
+    """
+
+    def __init__(self, lane_seconds, plate_seconds):
+        self.lane_seconds = lane_seconds
+        self.plate_seconds = plate_seconds
+        self._lanes = ExpiringDict()
+        self._plates = ExpiringDict()
+
+    def lane_remaining(self, lane):
+        """车道冷却剩余秒数，0 表示不在冷却期"""
+        return self._lanes.remaining(lane)
+
+    def plate_remaining(self, plate):
+        """车牌冷却剩余秒数，0 表示不在冷却期"""
+        return self._plates.remaining(plate)
+
+    def record_pass(self, lane, plate):
+        """记录一次放行，车道和车牌同时进入冷却"""
+        self._lanes.set(lane, self.lane_seconds)
+        self._plates.set(plate, self.plate_seconds)
+
+    def stats(self):
+        """返回处于冷却期的车道数和车牌数"""
+        return {'lanes': len(self._lanes), 'plates': len(self._plates)}
@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import defaultdict
+
+
+class _Cluster:
+    """同一车道上被认为是同一辆车的若干次识别结果"""
+
+    def __init__(self):
+        self.reads = []   # [(时刻, 车牌号, 得分), ...]
+
+    def vote(self):
+        """
+        逐位按得分加权投票
+        :return: (融合后的车牌号, 各位胜出得分的最小值, 总得分)
+        """
+        length = len(self.reads[0][1])
+        votes = [defaultdict(float) for _ in range(length)]
+        total = 0.0
+        for _, plate, score in self.reads:
+            total += score
+            for position, char in zip(votes, plate):
+                position[char] += score
+        winners = [max(position.items(), key=lambda item: item[1]) for position in votes]
+        return ''.join(char for char, _ in winners), min(weight for _, weight in winners), total
+
+
+class PlateFusion:
+    """
+    多帧投票融合：按车道保存最近 window 秒内的识别结果，逐字符按得分加权投票。
+    - 同一车道内长度相同、与融合结果相差不超过 max_mismatch 个字符的识别结果归为同一辆车，
+      同一帧中的多辆车各自投票，互不干扰
+    - 每一位胜出字符的得分都不低于 min_weight，且占该组总得分的比例不低于 consensus 时输出融合结果
+    单帧高置信度的结果由调用方直接判定，不必等待投票（见 discard）。
+    """
+
+    def __init__(self, window=3.0, min_weight=1.0, consensus=0.6, max_mismatch=2):
+        """
+        :param window: 投票窗口（秒），更早的识别结果不再参与投票
+        :param min_weight: 每一位胜出字符需要累计的最小得分
+        :param consensus: 每一位胜出字符的得分占总得分的最小比例
+        :param max_mismatch: 归为同一辆车时允许的最多不同字符数
+        """
+        self.window = window
+        self.min_weight = min_weight
+        self.consensus = consensus
+        self.max_mismatch = max_mismatch
+        self._lanes = {}   # 车道 -> [_Cluster, ...]
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.reads = 0
+        self.decisions = 0
+        self.fused_reads = 0   # 所有融合结果累计用到的识别次数
+        self.early_exits = 0
+
+    def _clusters(self, lane, now):
+        """取出车道的投票组，丢弃窗口外的识别结果（调用方需持有锁）"""
+        clusters = []
+        for cluster in self._lanes.get(lane, ()):
+            cluster.reads = [r for r in cluster.reads if now - r[0] <= self.window]
+            if cluster.reads:
+                clusters.append(cluster)
+        self._store(lane, clusters)
+        return clusters
+
+    def _store(self, lane, clusters):
+        """保存车道的投票组；没有投票组时删除该车道，车道编号来自请求头，不能只增不减（调用方需持有锁）"""
+        if clusters:
+            self._lanes[lane] = clusters
+        else:
+            self._lanes.pop(lane, None)
+
+    def _find(self, clusters, plate):
+        """找到 plate 所属的投票组，没有返回 None"""
+        for cluster in clusters:
+            fused = cluster.vote()[0]
+            if len(fused) == len(plate) and \
+                    sum(a != b for a, b in zip(fused, plate)) <= self.max_mismatch:
+                return cluster
+        return None
+
+    def add(self, lane, plate, score):
+        """
+        加入一次识别结果并尝试融合
+        :param plate: 车牌号（已纠正的最佳候选）
+        :param score: 该候选的得分
+        :return: 达成共识时返回 (融合后的车牌号, 共识比例, 参与投票的次数)，该组随即清空；否则返回 None
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.reads += 1
+            clusters = self._clusters(lane, now)
+            cluster = self._find(clusters, plate)
+            if cluster is None:
+                cluster = _Cluster()
+                clusters.append(cluster)
+                self._store(lane, clusters)
+            cluster.reads.append((now, plate, score))
+
+            fused, weakest, total = cluster.vote()
+            agreement = weakest / total if total else 0.0
+            if weakest < self.min_weight or agreement < self.consensus:
+                return None
+            clusters.remove(cluster)
+            self._store(lane, clusters)
+            self.decisions += 1
+            self.fused_reads += len(cluster.reads)
+            return fused, agreement, len(cluster.reads)
+
+    def discard(self, lane, plate):
+        """单帧已直接判定（提前放行）时，丢弃该车牌在车道上积累的投票"""
+        now = time.monotonic()
+        with self._lock:
+            self.early_exits += 1
+            clusters = self._clusters(lane, now)
+            cluster = self._find(clusters, plate)
+            if cluster is not None:
+                clusters.remove(cluster)
+                self._store(lane, clusters)
+
+    def stats(self):
+        """返回投票次数、融合判定次数、平均每次判定用到的识别次数和提前放行次数"""
+        with self._lock:
+            pending = sum(len(c.reads) for clusters in self._lanes.values() for c in clusters)
+            return {
+                'reads': self.reads,
+                'decisions': self.decisions,
+                'reads_per_decision': round(self.fused_reads / self.decisions, 2) if self.decisions else 0.0,
+                'early_exits': self.early_exits,
+                'pending_reads': pending
+            }
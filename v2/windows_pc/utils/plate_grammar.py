@@ -0,0 +1,163 @@
+"""
+车牌格式校验与易混字符纠正（纯 Python，不依赖识别模块）
+识别器只输出字母数字部分，这里按中国车牌的版式逐位校验，
+把位置上不合法的字符换成形近的合法字符（如数字位上的 O → 0），并给候选打分。
+"""
+import re
+
+# 省份简称（识别结果中偶尔保留的汉字前缀）
+PROVINCES = '京津沪渝冀豫云辽黑湘皖鲁新苏浙赣鄂桂甘晋蒙陕吉闽贵粤青藏川宁琼'
+
+LETTERS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+DIGITS = frozenset('0123456789')
+# 序号位：字母（不含 I、O）或数字
+SERIAL = frozenset('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789')
+ENERGY = frozenset('DF')   # 新能源车牌：D 纯电动，F 非纯电动
+
+# 车牌版式（省份简称之后的部分），每一位给出允许的字符集合
+LAYOUTS = {
+    '普通': (LETTERS,) + (SERIAL,) * 5,
+    '新能源小型': (LETTERS, ENERGY, SERIAL) + (DIGITS,) * 4,
+    '新能源大型': (LETTERS,) + (DIGITS,) * 5 + (ENERGY,),
+}
+
+# 形近字符：OCR 常把左边的字符误认成右边列出的字符（越靠前越常见）
+CONFUSABLE = {
+    '0': 'DOQ', 'O': '0DQ', 'D': '0O', 'Q': '0O',
+    '1': 'ILT', 'I': '1L', 'L': '1', 'T': '17',
+    '2': 'Z', 'Z': '2',
+    '4': 'A', 'A': '4',
+    '5': 'S', 'S': '5',
+    '6': 'G', 'G': '6',
+    '7': 'T',
+    '8': 'B', 'B': '8',
+    'U': 'V', 'V': 'U',
+}
+
+FORCED_PENALTY = 0.8   # 字符在该位不合法、必须替换时的得分系数
+SWAP_PENALTY = 0.3     # 字符合法、但尝试换成形近字符时的得分系数
+RANK_DECAY = 0.75      # 形近字符每靠后一位，系数再乘以该值
+
+_NOT_ALNUM = re.compile(r'[^A-Z0-9]')
+
+
+class PlateGrammar:
+    """
+    车牌版式引擎。构造时为每个版式的每一位预先算好「输入字符 → [(输出字符, 系数)]」表，
+    纠正时按位查表，用宽度为 beam_width 的集束保留得分最高的组合。
+    """
+
+    def __init__(self, layouts=None, max_swaps=1, beam_width=16):
+        """
+        :param layouts: {名称: 每一位允许的字符集合}，默认 LAYOUTS
+        :param max_swaps: 合法字符最多尝试替换的位数（不合法字符的替换不计入）
+        :param beam_width: 纠正过程中每一步保留的候选数
+        """
+        self.max_swaps = max_swaps
+        self.beam_width = beam_width
+        tables = {}
+        self._layouts = []
+        for name, positions in (layouts or LAYOUTS).items():
+            compiled = []
+            for allowed in positions:
+                if allowed not in tables:
+                    tables[allowed] = self._compile_position(allowed)
+                compiled.append(tables[allowed])
+            self._layouts.append((name, compiled))
+
+    @staticmethod
+    def _compile_position(allowed):
+        """
+        生成一位的查表：{输入字符: (必选项列表, 可选替换列表)}
+        合法字符的必选项是它本身；不合法字符的必选项是形近的合法字符，没有则不出现在表中。
+        """
+        table = {}
+        for char in LETTERS | DIGITS:
+            similar = [c for c in CONFUSABLE.get(char, '') if c in allowed]
+            decay = [RANK_DECAY ** i for i in range(len(similar))]
+            if char in allowed:
+                table[char] = ([(char, 1.0)], [(c, SWAP_PENALTY * d) for c, d in zip(similar, decay)])
+            elif similar:
+                table[char] = ([(c, FORCED_PENALTY * d) for c, d in zip(similar, decay)], [])
+        return table
+
+    @staticmethod
+    def split(text):
+        """拆出省份简称（没有则为空串）和规整后的字母数字部分"""
+        text = (text or '').strip()
+        province = text[0] if text and text[0] in PROVINCES else ''
+        return province, _NOT_ALNUM.sub('', text.upper())
+
+    def layout_of(self, text):
+        """返回完全符合的版式名称（不做纠正），不符合任何版式时返回 None"""
+        _, body = self.split(text)
+        for name, compiled in self._layouts:
+            if len(compiled) == len(body) and all(
+                    ch in table and table[ch][0][0][0] == ch for ch, table in zip(body, compiled)):
+                return name
+        return None
+
+    def is_valid(self, text):
+        """是否完全符合某个车牌版式"""
+        return self.layout_of(text) is not None
+
+    def correct(self, text, confidence=1.0, k=5, swap_below=None):
+        """
+        按各版式逐位纠正，返回得分最高的 k 个合法车牌
+        :param text: 识别结果（可带省份简称）
+        :param confidence: 识别置信度，作为得分的初值
+        :param swap_below: 识别结果已符合版式且置信度不低于该值时原样返回，不再尝试形近字符；
+                           None 表示总是尝试
+        :return: [(车牌号, 得分), ...]，按得分降序；无法纠正为任何版式时为空列表
+        """
+        province, body = self.split(text)
+        if swap_below is not None and confidence >= swap_below and self.is_valid(body):
+            return [(province + body, confidence)]
+        found = {}
+        for _, compiled in self._layouts:
+            if len(compiled) != len(body):
+                continue
+            beam = [('', confidence, 0)]   # (已纠正部分, 得分, 已用替换次数)
+            for ch, table in zip(body, compiled):
+                options = table.get(ch)
+                if options is None:
+                    beam = []
+                    break
+                required, swaps = options
+                extended = []
+                for prefix, score, used in beam:
+                    for out, factor in required:
+                        extended.append((prefix + out, score * factor, used))
+                    if used < self.max_swaps:
+                        for out, factor in swaps:
+                            extended.append((prefix + out, score * factor, used + 1))
+                extended.sort(key=lambda item: item[1], reverse=True)
+                beam = extended[:self.beam_width]
+            for plate, score, _ in beam:
+                plate = province + plate
+                if score > found.get(plate, 0.0):
+                    found[plate] = score
+        return sorted(found.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def rank(self, plates, k=5, swap_below=None):
+        """
+        合并识别器给出的多个候选，纠正后取得分最高的 k 个（同一车牌取最高分）
+        :param plates: recognizer.recognize() 的返回值 [(车牌号, 置信度), ...]，按置信度降序
+        :param swap_below: 最佳结果已符合版式且置信度不低于该值时只返回它本身，
+                           不再纠正、也不合并其余候选（见 correct）；None 表示总是纠正
+        :return: [(车牌号, 得分), ...]，按得分降序
+        """
+        if plates and swap_below is not None:
+            text, confidence = plates[0]
+            if confidence >= swap_below and self.is_valid(text):
+                return self.correct(text, confidence, k, swap_below)
+        merged = {}
+        for text, confidence in plates:
+            for plate, score in self.correct(text, confidence, k, swap_below):
+                if score > merged.get(plate, 0.0):
+                    merged[plate] = score
+        return sorted(merged.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+# 默认实例（构造时预计算查表，全局共享，只读）
+PLATE_GRAMMAR = PlateGrammar()
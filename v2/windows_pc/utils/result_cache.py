@@ -0,0 +1,89 @@
+import time
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def dhash(image, hash_size=16):
+    """
+    计算图像的差值哈希（dHash）：缩放为 (hash_size+1) x hash_size 的灰度图，
+    比较每行相邻像素的明暗，得到 hash_size*hash_size 位整数。
+    默认 16x16=256 位，比常见的 8x8 保留更多字符轮廓，降低不同车牌误判为同一张的概率。
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+class PlateResultCache:
+    """
+    车牌识别结果缓存：LRU + TTL，以裁剪图的 dHash 为键。
+    汉明距离不超过 max_distance 的近似重复图直接返回缓存结果，不再跑 OCR。
+    车辆停在道闸前时，连续多帧的裁剪图几乎相同，可以省去大部分重复识别。
+    """
+
+    def __init__(self, max_size=256, ttl=3.0, max_distance=10):
+        """
+        :param max_size: 最多缓存的条目数，超出时淘汰最久未使用的
+        :param ttl: 条目有效期（秒）
+        :param max_distance: 视为同一张图的最大汉明距离（256 位哈希）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries = OrderedDict()   # hash -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        查找与 key 最接近且未过期的条目。
+        :param key: dhash() 的返回值
+        :return: 缓存的识别结果，未命中返回 None
+        """
+        now = time.monotonic()
+        with self._lock:
+            best_key, best_distance = None, self.max_distance + 1
+            expired = []
+            for cached_key, (value, expires_at) in self._entries.items():
+                if expires_at < now:
+                    expired.append(cached_key)
+                    continue
+                distance = (cached_key ^ key).bit_count()
+                if distance < best_distance:
+                    best_key, best_distance = cached_key, distance
+                    if distance == 0:
+                        break
+            for cached_key in expired:
+                del self._entries[cached_key]
+
+            if best_key is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][0]
+
+    def put(self, key, value):
+        """写入一条识别结果"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """返回命中 / 未命中计数和命中率"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,37 @@
+import time
+
+from cooldown import CooldownManager, ExpiringDict
+
+
+def main():
+    # 键各自过期，重新设置后以新的到期时刻为准
+    expiring = ExpiringDict()
+    expiring.set('a', 0.05)
+    expiring.set('b', 10)
+    expiring.set('a', 0.2)
+    time.sleep(0.1)
+    print("a 仍有效:", 'a' in expiring, "b 仍有效:", 'b' in expiring)  # True True
+    assert 'a' in expiring and 'b' in expiring
+    time.sleep(0.15)
+    print("a 已过期:", 'a' not in expiring, "剩余键数:", len(expiring))  # True 1
+    assert 'a' not in expiring and len(expiring) == 1
+    assert expiring.get('a') is None and expiring.get('b') is True
+
+    # 车道冷却互不影响，车牌冷却跨车道生效
+    cooldowns = CooldownManager(lane_seconds=0.1, plate_seconds=0.3)
+    cooldowns.record_pass('lane1', '京A12345')
+    print("lane1 冷却:", round(cooldowns.lane_remaining('lane1'), 2))  # 0.1
+    assert cooldowns.lane_remaining('lane1') > 0
+    assert cooldowns.lane_remaining('lane2') == 0
+    assert cooldowns.plate_remaining('京A12345') > 0
+    time.sleep(0.15)
+    print("车道冷却结束后:", cooldowns.stats())  # {'lanes': 0, 'plates': 1}
+    assert cooldowns.lane_remaining('lane1') == 0
+    assert cooldowns.plate_remaining('京A12345') > 0
+    assert cooldowns.stats() == {'lanes': 0, 'plates': 1}
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import time
+
+from fusion import PlateFusion
+
+
+def main():
+    # 单次识别不足以达成共识
+    fusion = PlateFusion(window=3.0, min_weight=1.0, consensus=0.6)
+    result = fusion.add('lane1', 'A12345', 0.55)
+    print("单次识别:", result)  # None
+    assert result is None
+
+    # 两次独立识别结果一致，达成共识后该组清空，车道不再保留
+    result = fusion.add('lane1', 'A12345', 0.55)
+    print("两次识别:", result)  # ('A12345', 1.0, 2)
+    assert result == ('A12345', 1.0, 2)
+    assert 'lane1' not in fusion._lanes
+
+    # 某一位有分歧时逐位加权投票
+    assert fusion.add('lane1', 'A12345', 0.6) is None
+    assert fusion.add('lane1', 'A12845', 0.5) is None
+    plate, agreement, votes = fusion.add('lane1', 'A12345', 0.6)
+    print("有分歧的三次识别:", plate, round(agreement, 2), votes)  # A12345 0.71 3
+    assert plate == 'A12345' and votes == 3
+
+    # 不同车道、同一车道中差别较大的车牌各自投票
+    assert fusion.add('lane1', 'A12345', 0.55) is None
+    assert fusion.add('lane2', 'A12345', 0.55) is None
+    assert fusion.add('lane1', 'C77777', 0.55) is None
+    print("待投票:", fusion.stats()['pending_reads'])  # 3
+    assert fusion.stats()['pending_reads'] == 3
+
+    # 提前放行时丢弃该车牌的投票
+    fusion.discard('lane2', 'A12345')
+    assert 'lane2' not in fusion._lanes
+
+    # 窗口外的识别结果不参与投票，车道随之删除
+    fusion = PlateFusion(window=0.05)
+    assert fusion.add('lane1', 'A12345', 0.55) is None
+    time.sleep(0.1)
+    result = fusion.add('lane1', 'A12345', 0.55)
+    print("超出窗口:", result)  # None
+    assert result is None
+    time.sleep(0.1)
+    fusion.discard('lane1', 'A12345')
+    assert fusion._lanes == {}
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
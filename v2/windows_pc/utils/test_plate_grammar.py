@@ -0,0 +1,48 @@
+from plate_grammar import PLATE_GRAMMAR
+
+
+def main():
+    grammar = PLATE_GRAMMAR
+
+    # 版式校验
+    for text, layout in [('A12345', '普通'), ('AD12345', '新能源小型'), ('A12345D', '新能源大型'),
+                         ('京A12345', '普通'), ('A1234O', None), ('A1234', None)]:
+        print(f"{text} 版式:", grammar.layout_of(text))
+        assert grammar.layout_of(text) == layout
+
+    # 序号位不允许 O，必须换成 0
+    result = grammar.correct('A1234O', 0.9)
+    print("A1234O 纠正:", result[:2])  # [('A12340', 0.72), ('A1234D', 0.54)]
+    assert result[0][0] == 'A12340' and abs(result[0][1] - 0.9 * 0.8) < 1e-9
+
+    # 省份简称保留
+    result = grammar.correct('京A1234O', 0.9)
+    print("京A1234O 纠正:", result[0])  # ('京A12340', 0.72)
+    assert result[0][0] == '京A12340'
+
+    # 新能源车牌：数字位上的 S 换成 5
+    result = grammar.correct('AD1234S', 0.9)
+    print("AD1234S 纠正:", result[0])  # ('AD12345', 0.72)
+    assert result[0][0] == 'AD12345'
+    result = grammar.correct('A1234SD', 0.9)
+    print("A1234SD 纠正:", result[0])  # ('A12345D', 0.72)
+    assert result[0][0] == 'A12345D'
+
+    # 符合版式且置信度高的结果不再尝试形近字符
+    result = grammar.rank([('A12345', 0.95), ('A1234S', 0.5)], swap_below=0.8)
+    print("A12345 (0.95):", result)  # [('A12345', 0.95)]
+    assert result == [('A12345', 0.95)]
+    # 置信度低时仍尝试形近字符，但原样结果得分最高
+    result = grammar.correct('A12345', 0.5, swap_below=0.8)
+    print("A12345 (0.5):", result)
+    assert result[0] == ('A12345', 0.5) and len(result) > 1
+
+    # 长度不符合任何版式
+    print("A1234 纠正:", grammar.correct('A1234'))  # []
+    assert grammar.correct('A1234') == []
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
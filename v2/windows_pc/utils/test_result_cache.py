@@ -0,0 +1,41 @@
+import time
+
+import numpy as np
+
+from result_cache import PlateResultCache, dhash
+
+
+def main():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (40, 120, 3), dtype=np.uint8)
+    noisy = np.clip(image.astype(np.int16) + rng.integers(-3, 4, image.shape), 0, 255).astype(np.uint8)
+    other = rng.integers(0, 256, (40, 120, 3), dtype=np.uint8)
+
+    # 轻微噪声的哈希相近，不同图片的哈希相差很多
+    near = (dhash(image) ^ dhash(noisy)).bit_count()
+    far = (dhash(image) ^ dhash(other)).bit_count()
+    print("近似图片汉明距离:", near, "不同图片:", far)
+    assert near <= 10 < far
+
+    cache = PlateResultCache(max_size=2, ttl=0.2, max_distance=10)
+    cache.put(dhash(image), [('A12345', 0.9)])
+    print("近似图片命中:", cache.get(dhash(noisy)))  # [('A12345', 0.9)]
+    assert cache.get(dhash(noisy)) == [('A12345', 0.9)]
+    assert cache.get(dhash(other)) is None
+
+    # 超出容量时淘汰最久未使用的
+    cache.put(1, 'one')
+    cache.put(2, 'two')
+    assert cache.get(dhash(image)) is None and cache.get(2) == 'two'
+
+    # 过期后不再命中
+    time.sleep(0.25)
+    assert cache.get(2) is None
+    print("统计:", cache.stats())
+    assert cache.stats()['size'] == 0
+
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
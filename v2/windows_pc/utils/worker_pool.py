@@ -0,0 +1,160 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBusyError(Exception):
+    """识别队列已满，请求被拒绝"""
+
+    def __init__(self, queue_depth):
+        super().__init__(f'识别队列已满（{queue_depth}）')
+        self.queue_depth = queue_depth
+
+
+class PoolTimeoutError(Exception):
+    """请求在队列中等待或识别耗时超过期限"""
+
+
+class RecognitionPool:
+    """
+    识别工作池：N 个工作线程各自持有独立的识别器实例（EasyOCR Reader 不共享），
+    请求经有界队列分发。队列满时立即拒绝，而不是让延迟无限增长。
+    EasyOCR 的推理在 torch 中释放 GIL，因此使用线程而非进程。
+    """
+
+    def __init__(self, factory, workers=2, max_queue=8):
+        """
+        :param factory: 无参函数，在工作线程中调用以创建识别器（可包含预热）
+        :param workers: 工作线程数
+        :param max_queue: 等待队列的最大长度
+        """
+        self._factory = factory
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+
+        # 任一工作线程完成模型加载即视为就绪；全部加载失败时记录错误
+        self.ready = threading.Event()
+        self.error = None
+        self._ready_workers = 0
+        self._failed_workers = 0
+        self._instances = []
+
+        # 统计信息
+        self._busy = 0
+        self._busy_time = 0.0
+        self._started_at = time.monotonic()
+        self.processed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def start(self):
+        """启动全部工作线程（模型在各线程中加载）"""
+        for i in range(self.workers):
+            threading.Thread(
+                target=self._worker, args=(i,), name=f'recognition-{i}', daemon=True
+            ).start()
+
+    def _worker(self, index):
+        """工作线程：创建识别器后循环处理队列中的任务"""
+        try:
+            recognizer = self._factory()
+        except Exception as e:
+            logger.exception(f"识别工作线程 {index} 初始化失败")
+            with self._lock:
+                self._failed_workers += 1
+                if self._failed_workers == self.workers:
+                    self.error = str(e)
+            return
+
+        with self._lock:
+            self._ready_workers += 1
+            self._instances.append(recognizer)
+        self.ready.set()
+
+        while True:
+            future, method, args, deadline = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue  # 调用方已放弃
+            if time.monotonic() > deadline:
+                future.set_exception(PoolTimeoutError('排队超时'))
+                continue
+
+            with self._lock:
+                self._busy += 1
+            start = time.perf_counter()
+            try:
+                future.set_result(getattr(recognizer, method)(*args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._busy -= 1
+                    self._busy_time += elapsed
+                    self.processed += 1
+
+    def submit(self, method, *args, timeout=10):
+        """
+        提交一个识别任务，不等待结果。
+        :param method: 识别器的方法名，如 'recognize'、'recognize_batch'
+        :param timeout: 从提交起的最长期限（秒），排队超过期限的任务不再执行
+        :return: concurrent.futures.Future
+        :raises PoolBusyError: 队列已满
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((future, method, args, time.monotonic() + timeout))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusyError(self._queue.qsize())
+        return future
+
+    def run(self, method, *args, timeout=10):
+        """
+        提交任务并等待结果。
+        :raises PoolBusyError: 队列已满
+        :raises PoolTimeoutError: 超过 timeout 秒仍未完成
+        """
+        future = self.submit(method, *args, timeout=timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeoutError('识别超时')
+
+    @property
+    def instances(self):
+        """已就绪的识别器实例（只用于读取统计信息，识别请通过 run/submit）"""
+        with self._lock:
+            return list(self._instances)
+
+    @property
+    def queue_depth(self):
+        """当前排队的任务数"""
+        return self._queue.qsize()
+
+    def metrics(self):
+        """返回队列深度、工作线程利用率等统计信息"""
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at
+            ready = max(self._ready_workers, 1)
+            return {
+                'workers': self.workers,
+                'ready_workers': self._ready_workers,
+                'busy_workers': self._busy,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'utilization': round(self._busy_time / (elapsed * ready), 3) if elapsed else 0.0,
+                'processed': self.processed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+            }